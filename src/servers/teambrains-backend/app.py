@@ -8,7 +8,7 @@ from routes.projects import projects
 from routes.cv import cv_bp
 from dotenv import load_dotenv
 import os
-from extensions import bcrypt, mail
+from extensions import bcrypt, mail, password_hasher
 from flask_jwt_extended import JWTManager
 from routes.contact import contact_bp
 from routes.chat import chat_bp
@@ -24,7 +24,9 @@ from routes.search import search_bp
 from routes.subtasks import subtasks_bp
 from routes.skills import skills_bp
 from routes.visibility import visibility_bp
+from routes.events import events_bp
 from models import School, Task, SubTask, TaskValidation, SubTaskValidation, CVProject, project_members
+from services import init_user_loader, init_project_access, init_skill_index, init_skill_stats, recompute_progress, backfill_sprints, snapshot_sprints, backfill_validation_summaries, backfill_completion_dates, rebuild_stale_cv_documents, backfill_technologies
 from datetime import datetime, timedelta
 
 
@@ -62,6 +64,7 @@ app.register_blueprint(search_bp, url_prefix='/search')
 app.register_blueprint(subtasks_bp)
 app.register_blueprint(skills_bp)
 app.register_blueprint(visibility_bp)
+app.register_blueprint(events_bp)
 
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('SQLALCHEMY_DATABASE_URI')
 app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY')
@@ -72,16 +75,46 @@ app.config['MAIL_USE_SSL'] = False
 app.config['UPLOAD_FOLDER'] = os.path.join(os.getcwd(), 'uploads')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # Limite la taille des fichiers à 16 Mo
 
+# Hachage des mots de passe (pool de processus dédié, voir services/passwords.py)
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+app.config['PASSWORD_HASH_QUEUE_SIZE'] = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 32))
+
+# Cache des utilisateurs connectés (current_user), voir services/user_cache.py
+app.config['USER_CACHE_TTL'] = int(os.environ.get('USER_CACHE_TTL', 30))
+
+# Cache des accès aux projets (membre ou créateur), voir services/project_access.py
+app.config['PROJECT_ACCESS_CACHE_TTL'] = int(os.environ.get('PROJECT_ACCESS_CACHE_TTL', 30))
+
+# Index des compétences pour /skills/search-users, voir services/skill_index.py
+app.config['SKILL_INDEX_TTL'] = int(os.environ.get('SKILL_INDEX_TTL', 300))
+
+# Statistiques globales des compétences (/skills/stats), voir services/skill_stats.py
+app.config['SKILL_STATS_TTL'] = int(os.environ.get('SKILL_STATS_TTL', 300))
+
+# Recherche globale : sous-recherches parallèles, voir services/search.py
+app.config['SEARCH_WORKERS'] = int(os.environ.get('SEARCH_WORKERS', 4))
+app.config['SEARCH_SUBQUERY_TIMEOUT_MS'] = int(os.environ.get('SEARCH_SUBQUERY_TIMEOUT_MS', 2000))
+
+# Cache HTTP des endpoints publics (s-maxage pour un reverse proxy), voir decorators.py
+app.config['HTTP_CACHE_MAX_AGE'] = int(os.environ.get('HTTP_CACHE_MAX_AGE', 30))
+
 db.init_app(app)
 
 # Initialiser Flask-Migrate
 migrate = Migrate(app, db)
 
 jwt = JWTManager(app)
+init_user_loader(app, jwt)
+init_project_access(app)
+init_skill_index(app)
+init_skill_stats(app)
 
 mail.init_app(app)
 
-CORS(app, resources={r"/*": {"origins": "http://localhost:5173"}}, supports_credentials=True)
+password_hasher.init_app(app)
+
+CORS(app, resources={r"/*": {"origins": "http://localhost:5173"}}, supports_credentials=True, expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"])
 
 with app.app_context():
     db.create_all()
@@ -333,5 +366,59 @@ with app.app_context():
     insert_test_data()
 
 
+# Commandes de maintenance (flask <commande>)
+@app.cli.command('backfill-progress')
+def backfill_progress():
+    """Recalculer la progression de tous les projets depuis leurs tâches"""
+    updated = recompute_progress(db.session.connection())
+    db.session.commit()
+    print(f"✅ Progression recalculée pour {updated} projet(s)")
+
+
+@app.cli.command('backfill-sprints')
+def backfill_sprints_command():
+    """Créer les sprints depuis les noms existants et relier les tâches"""
+    linked = backfill_sprints(db.session.connection())
+    db.session.commit()
+    print(f"✅ {linked} tâche(s) reliée(s) à leur sprint")
+
+
+@app.cli.command('backfill-technologies')
+def backfill_technologies_command():
+    """Relier les technologies des profils existants au catalogue des compétences"""
+    processed = backfill_technologies(db.session.connection())
+    db.session.commit()
+    print(f"✅ Technologies reliées pour {processed} utilisateur(s)")
+
+
+# Lancée chaque nuit par le service scheduler (scheduler.sh) et au démarrage (postgres.sh)
+@app.cli.command('snapshot-sprints')
+def snapshot_sprints_command():
+    """Enregistrer l'avancement du jour de chaque sprint (burndown)"""
+    recorded = snapshot_sprints(db.session.connection())
+    db.session.commit()
+    print(f"✅ Avancement enregistré pour {recorded} sprint(s)")
+
+
+@app.cli.command('backfill-validations')
+def backfill_validations_command():
+    """Recalculer la dernière validation et le nombre de validations des tâches"""
+    tasks, subtasks = backfill_validation_summaries(db.session.connection())
+    # Les dates de fin s'appuient sur les dates de validation ci-dessus
+    completed = backfill_completion_dates(db.session.connection())
+    db.session.commit()
+    print(f"✅ Validations résumées pour {tasks} tâche(s) et {subtasks} sous-tâche(s)")
+    print(f"✅ Date de fin renseignée pour {completed} élément(s) terminé(s)")
+
+
+# Remplissage initial, puis filet de sécurité (cron) pour les reconstructions
+# perdues lors d'un redémarrage de worker
+@app.cli.command('rebuild-cvs')
+def rebuild_cvs_command():
+    """Reconstruire les CV pré-calculés manquants ou périmés"""
+    rebuilt = rebuild_stale_cv_documents()
+    print(f"✅ {rebuilt} CV reconstruit(s)")
+
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5001, debug=True)
@@ -1,7 +1,10 @@
 # decorators.py
 from functools import wraps
-from flask import jsonify
+from hashlib import sha1
+from flask import jsonify, request, current_app, make_response
 from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from werkzeug.http import is_resource_modified
+from services.cache_versions import get_versions
 
 def role_required(role):
     def decorator(fn):
@@ -15,3 +18,47 @@ def role_required(role):
             return fn(*args, **kwargs)
         return wrapper
     return decorator
+
+def conditional_response(etag, last_modified, produce, cache_control):
+    """304 si le client possède déjà cette version, sinon la réponse de produce()
+
+    ETag, Last-Modified et Cache-Control sont ajoutés aux réponses 200 et 304 ;
+    les autres statuts (erreurs) sont retournés tels quels.
+    """
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = make_response('', 304)
+    else:
+        response = make_response(produce())
+        if response.status_code != 200:
+            return response
+    
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def http_cache(*scopes, max_age=None):
+    """Cache HTTP (ETag / Last-Modified / 304) d'un endpoint public en lecture
+
+    L'ETag dépend de l'URL complète et des versions des familles de données
+    dont la réponse dépend (scopes) : tant qu'aucune n'a changé, la requête
+    conditionnelle reçoit un 304 sans exécuter la vue. Cache-Control laisse
+    un reverse proxy servir la réponse pendant max_age secondes.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            versions = get_versions(scopes)
+            stamp = request.full_path + '|' + '|'.join(f"{scope}:{versions[scope][0]}" for scope in scopes)
+            etag = sha1(stamp.encode('utf-8')).hexdigest()
+            dates = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+            last_modified = max(dates) if dates else None
+            
+            shared_max_age = max_age if max_age is not None else current_app.config.get('HTTP_CACHE_MAX_AGE', 30)
+            cache_control = f"public, max-age=0, s-maxage={shared_max_age}, must-revalidate"
+            
+            return conditional_response(etag, last_modified, lambda: fn(*args, **kwargs), cache_control)
+        return wrapper
+    return decorator
+
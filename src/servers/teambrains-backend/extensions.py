@@ -1,5 +1,7 @@
 from flask_bcrypt import Bcrypt
 from flask_mail import Mail
+from services.passwords import PasswordHasher
 
 bcrypt = Bcrypt()
 mail = Mail()
+password_hasher = PasswordHasher()
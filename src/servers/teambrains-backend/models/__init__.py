@@ -3,10 +3,10 @@
 from .base import db, get_uuid
 
 # Import des modèles utilisateur
-from .user import User, Skill, UserSkill, CVVisibility
+from .user import User, Skill, UserSkill, CVVisibility, user_technologies, split_technologies
 
 # Import des modèles de projet et tâches
-from .project import Project, project_members, Message, Task, CVProject, TaskValidation, SubTask, SubTaskValidation, TaskStudent
+from .project import Project, project_members, Message, Task, Sprint, SprintSnapshot, CVProject, TaskValidation, SubTask, SubTaskValidation, TaskStudent
 
 # Import des modèles de fichiers
 from .file import FileDocument
@@ -20,14 +20,22 @@ from .subscription import Subscription, Invoice
 # Import des modèles d'usage
 from .school_usage import SchoolUsage, SchoolInvoice
 
+# Import des versions de cache HTTP
+from .cache_version import CacheVersion
+
+# Import des CV pré-calculés
+from .cv_document import CVDocument
+
 
 # Export de tous les modèles pour maintenir la compatibilité
 __all__ = [
     'db', 'get_uuid',
-    'User', 'Skill', 'UserSkill', 'CVVisibility',
-    'Project', 'project_members', 'Message', 'Task', 'CVProject', 'TaskValidation', 'SubTask', 'SubTaskValidation', 'TaskStudent',
+    'User', 'Skill', 'UserSkill', 'CVVisibility', 'user_technologies', 'split_technologies',
+    'Project', 'project_members', 'Message', 'Task', 'Sprint', 'SprintSnapshot', 'CVProject', 'TaskValidation', 'SubTask', 'SubTaskValidation', 'TaskStudent',
     'FileDocument',
     'School', 'SchoolToken', 'SchoolRegistrationToken',
     'Subscription', 'Invoice',
-    'SchoolUsage', 'SchoolInvoice'
+    'SchoolUsage', 'SchoolInvoice',
+    'CacheVersion',
+    'CVDocument'
 ] 
\ No newline at end of file
@@ -1,10 +1,18 @@
 # models/base.py
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event
 from uuid import uuid4
 
 # Instance SQLAlchemy partagée
 db = SQLAlchemy()
 
+# pg_trgm est requis par les index trigrammes (suggestions de recherche)
+event.listen(
+    db.metadata,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
+
 def get_uuid():
     """Générateur d'UUID pour les clés primaires"""
     return uuid4().hex 
\ No newline at end of file
@@ -0,0 +1,22 @@
+# models/cache_version.py
+from .base import db
+from datetime import datetime
+
+class CacheVersion(db.Model):
+    """Compteur de version d'une famille de données (projets, utilisateurs...)
+
+    Incrémenté à chaque écriture sur la famille (voir services/cache_versions.py) ;
+    sert à calculer les ETag / Last-Modified des endpoints publics.
+    """
+    __tablename__ = 'cache_versions'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat()
+        }
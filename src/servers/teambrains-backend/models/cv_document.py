@@ -0,0 +1,23 @@
+# models/cv_document.py
+from .base import db
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+
+class CVDocument(db.Model):
+    """CV complet pré-calculé d'un utilisateur (voir services/cv_documents.py)
+
+    Le document est périmé lorsqu'une donnée du CV a changé après le début
+    de sa construction (invalidated_at >= built_at) ; il reste servi le
+    temps d'être reconstruit en arrière-plan.
+    """
+    __tablename__ = 'cv_documents'
+    
+    user_id = db.Column(db.String(100), db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    document = db.Column(JSONB, nullable=False)
+    version = db.Column(db.BigInteger, nullable=False, default=1)
+    built_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    invalidated_at = db.Column(db.DateTime, nullable=True)
+    
+    @property
+    def is_stale(self):
+        return self.invalidated_at is not None and self.invalidated_at >= self.built_at
@@ -1,5 +1,6 @@
 # models/project.py
 from .base import db
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from datetime import datetime
 
 class Project(db.Model):
@@ -14,6 +15,24 @@ class Project(db.Model):
     creator_id = db.Column(db.String(100), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     members = db.relationship('User', secondary='project_members', backref=db.backref('projects', lazy='dynamic'))
     progress = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Somme des pourcentages et nombre de tâches : progress = somme / nombre,
+    # mis à jour par delta à chaque écriture de tâche
+    progress_sum = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+    task_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # Document de recherche plein texte, recalculé par Postgres à chaque écriture
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(
+        "setweight(to_tsvector('french', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('french', coalesce(description, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(status, '')), 'C')",
+        persisted=True
+    )))
+    
+    __table_args__ = (
+        db.Index('ix_projects_search_vector', 'search_vector', postgresql_using='gin'),
+        db.Index('ix_projects_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        db.Index('ix_projects_creator_id', 'creator_id', 'id'),
+    )
 
     def to_dict(self):
         return {
@@ -47,6 +66,18 @@ class Message(db.Model):
     # Nouveaux champs pour les pièces jointes
     file_url = db.Column(db.Text, nullable=True)
     file_name = db.Column(db.String(255), nullable=True)
+    
+    # Document de recherche plein texte, recalculé par Postgres à chaque écriture
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(
+        "to_tsvector('french', content)",
+        persisted=True
+    )))
+
+    # Index composite pour la pagination par curseur (before_id / after_id)
+    __table_args__ = (
+        db.Index('ix_messages_project_id_id', 'project_id', 'id'),
+        db.Index('ix_messages_search_vector', 'search_vector', postgresql_using='gin'),
+    )
 
     def to_dict(self):
         return {
@@ -72,10 +103,48 @@ class Task(db.Model):
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
     priority = db.Column(db.String(20), nullable=True, default='moyenne')  
     sprint = db.Column(db.String(100), nullable=True) 
+    # Sprint référencé par son nom dans `sprint` ; renseigné automatiquement
+    # à l'écriture de la tâche (voir services/sprints.py)
+    sprint_id = db.Column(db.Integer, db.ForeignKey('sprints.id', ondelete='SET NULL'), nullable=True, index=True)
 
     # Nouveaux champs pour les pièces jointes
     file_url = db.Column(db.Text, nullable=True)
     file_name = db.Column(db.String(255), nullable=True)
+    
+    # Résumé de la dernière validation, tenu à jour à l'insertion de chaque
+    # TaskValidation (voir services/validations.py)
+    last_validation_id = db.Column(db.Integer, nullable=True)
+    last_validation_status = db.Column(db.String(50), nullable=True)
+    last_validated_at = db.Column(db.DateTime, nullable=True)
+    validation_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Passage à 100 % (remis à NULL en dessous), voir services/validations.py
+    completed_at = db.Column(db.DateTime, nullable=True)
+    # Terminée et pas encore revue depuis : à traiter par le créateur du projet
+    awaiting_review = db.Column(db.Boolean, db.Computed(
+        "completed_at IS NOT NULL AND (last_validated_at IS NULL OR last_validated_at < completed_at "
+        "OR last_validation_status = 'pending')",
+        persisted=True
+    ))
+    
+    last_validation = db.relationship(
+        'TaskValidation', primaryjoin='foreign(Task.last_validation_id) == TaskValidation.id', viewonly=True
+    )
+    
+    # Document de recherche plein texte, recalculé par Postgres à chaque écriture
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(
+        "setweight(to_tsvector('french', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('french', coalesce(description, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(sprint, '') || ' ' || coalesce(priority, '')), 'C')",
+        persisted=True
+    )))
+    
+    __table_args__ = (
+        db.Index('ix_tasks_search_vector', 'search_vector', postgresql_using='gin'),
+        db.Index('ix_tasks_project_id', 'project_id'),
+        db.Index('ix_tasks_project_validation_status', 'project_id', 'last_validation_status'),
+        # Boîte de réception des validations : tâches à revoir par projet
+        db.Index('ix_tasks_review_inbox', 'project_id', 'completed_at', 'id', postgresql_where=db.text('awaiting_review')),
+    )
 
     def to_dict(self):
         return {
@@ -88,8 +157,65 @@ class Task(db.Model):
             'project_id': self.project_id,
             'priority': self.priority,
             'sprint': self.sprint,
+            'sprint_id': self.sprint_id,
             'file_url': self.file_url,
-            'file_name': self.file_name
+            'file_name': self.file_name,
+            'last_validation_status': self.last_validation_status,
+            'last_validated_at': self.last_validated_at.isoformat() if self.last_validated_at else None,
+            'validation_count': self.validation_count,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+
+class Sprint(db.Model):
+    __tablename__ = 'sprints'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    start_date = db.Column(db.DateTime, nullable=True)
+    end_date = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    tasks = db.relationship('Task', backref=db.backref('sprint_ref', lazy=True), lazy='dynamic')
+    
+    # Un nom de sprint est unique au sein d'un projet
+    __table_args__ = (db.UniqueConstraint('project_id', 'name', name='unique_project_sprint'),)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'project_id': self.project_id,
+            'name': self.name,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'created_at': self.created_at.isoformat()
+        }
+
+
+class SprintSnapshot(db.Model):
+    """Photo quotidienne de l'avancement d'un sprint (burndown, vélocité)"""
+    __tablename__ = 'sprint_snapshots'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    sprint_id = db.Column(db.Integer, db.ForeignKey('sprints.id', ondelete='CASCADE'), nullable=False)
+    snapshot_date = db.Column(db.Date, nullable=False)
+    total_tasks = db.Column(db.Integer, nullable=False, default=0)
+    completed_tasks = db.Column(db.Integer, nullable=False, default=0)
+    # Travail restant : somme de (100 - pourcentage d'avancement) des tâches
+    remaining_work = db.Column(db.Integer, nullable=False, default=0)
+    completed_work = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (db.UniqueConstraint('sprint_id', 'snapshot_date', name='unique_sprint_snapshot'),)
+    
+    def to_dict(self):
+        return {
+            'sprint_id': self.sprint_id,
+            'date': self.snapshot_date.isoformat(),
+            'total_tasks': self.total_tasks,
+            'completed_tasks': self.completed_tasks,
+            'remaining_work': self.remaining_work,
+            'completed_work': self.completed_work
         }
 
 
@@ -161,9 +287,29 @@ class SubTask(db.Model):
     assigned_student_id = db.Column(db.String(100), db.ForeignKey('users.id'), nullable=True)
     created_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
+    # Résumé de la dernière validation (voir services/validations.py)
+    last_validation_id = db.Column(db.Integer, nullable=True)
+    last_validation_status = db.Column(db.String(50), nullable=True)
+    last_validated_at = db.Column(db.DateTime, nullable=True)
+    validation_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    completed_at = db.Column(db.DateTime, nullable=True)
+    awaiting_review = db.Column(db.Boolean, db.Computed(
+        "completed_at IS NOT NULL AND (last_validated_at IS NULL OR last_validated_at < completed_at "
+        "OR last_validation_status = 'pending')",
+        persisted=True
+    ))
+    
     # Relations
     task = db.relationship('Task', backref=db.backref('subtasks', lazy=True, cascade='all, delete-orphan'))
     assigned_student = db.relationship('User', backref=db.backref('assigned_subtasks', lazy=True))
+    last_validation = db.relationship(
+        'SubTaskValidation', primaryjoin='foreign(SubTask.last_validation_id) == SubTaskValidation.id', viewonly=True
+    )
+    
+    __table_args__ = (
+        db.Index('ix_subtasks_task_validation_status', 'task_id', 'last_validation_status'),
+        db.Index('ix_subtasks_review_inbox', 'task_id', 'completed_at', 'id', postgresql_where=db.text('awaiting_review')),
+    )
     
     def to_dict(self):
         return {
@@ -177,7 +323,11 @@ class SubTask(db.Model):
             'task_id': self.task_id,
             'assigned_student_id': self.assigned_student_id,
             'assigned_student_name': f"{self.assigned_student.prenom} {self.assigned_student.nom}" if self.assigned_student else None,
-            'created_date': self.created_date.isoformat()
+            'created_date': self.created_date.isoformat(),
+            'last_validation_status': self.last_validation_status,
+            'last_validated_at': self.last_validated_at.isoformat() if self.last_validated_at else None,
+            'validation_count': self.validation_count,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
         }
     
 class SubTaskValidation(db.Model):
@@ -194,6 +344,11 @@ class SubTaskValidation(db.Model):
     subtask = db.relationship('SubTask', backref=db.backref('validations', lazy=True, cascade='all, delete-orphan'))
     validator = db.relationship('User', backref=db.backref('subtask_validations', lazy=True))
     
+    # Dernière validation d'une sous-tâche : parcours d'index
+    __table_args__ = (
+        db.Index('ix_subtask_validations_subtask_timestamp', 'subtask_id', 'timestamp'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
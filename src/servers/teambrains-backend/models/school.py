@@ -1,5 +1,6 @@
 # models/school.py
 from .base import db
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from datetime import datetime
 import secrets
 import random
@@ -16,6 +17,18 @@ class School(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, nullable=False, default=True)
     
+    # Document de recherche plein texte, recalculé par Postgres à chaque écriture
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('french', coalesce(description, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(contact_email, '')), 'C')",
+        persisted=True
+    )))
+    
+    __table_args__ = (
+        db.Index('ix_schools_search_vector', 'search_vector', postgresql_using='gin'),
+    )
+    
     # Relations
     students = db.relationship('User', backref=db.backref('school', lazy=True))
     tokens = db.relationship('SchoolToken', backref=db.backref('school', lazy=True), cascade='all, delete-orphan')
@@ -1,7 +1,21 @@
 # models/user.py
 from .base import db, get_uuid
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from datetime import datetime
 
+
+def split_technologies(value):
+    """Noms des technologies d'une chaîne séparée par des virgules (sans vides ni doublons)"""
+    names = []
+    seen = set()
+    for name in (value or '').split(','):
+        name = name.strip()
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -15,7 +29,12 @@ class User(db.Model):
 
     # Pour les technologies, puisqu'il s'agit d'une liste, nous devons gérer cela différemment.
     # Une approche consiste à stocker les technologies comme une chaîne de texte séparée par des virgules.
+    # La chaîne reste la valeur saisie ; user_technologies en est déduite à chaque
+    # écriture (voir services/technologies.py) et sert aux filtres indexés.
     technologies = db.Column(db.String(255), nullable=True)
+    technology_skills = db.relationship(
+        'Skill', secondary='user_technologies', order_by='user_technologies.c.position', viewonly=True
+    )
     
     # Nouveaux champs pour le profil
     etudes = db.Column(db.Text, nullable=True)
@@ -26,6 +45,34 @@ class User(db.Model):
     
     # Champ pour l'école de l'étudiant
     school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=True) 
+    
+    # Dernière consultation de la boîte de réception des validations
+    inbox_seen_at = db.Column(db.DateTime, nullable=True)
+    
+    # Document de recherche plein texte, recalculé par Postgres à chaque écriture.
+    # Poids A = nom complet (utilisé seul pour chercher les projets par membre)
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(
+        "setweight(to_tsvector('simple', coalesce(prenom, '') || ' ' || coalesce(nom, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(\"typeDeveloppeur\", '') || ' ' || coalesce(technologies, '')), 'B') || "
+        "setweight(to_tsvector('french', coalesce(etudes, '') || ' ' || coalesce(ambitions, '')), 'C')",
+        persisted=True
+    )))
+    
+    __table_args__ = (
+        db.Index('ix_users_search_vector', 'search_vector', postgresql_using='gin'),
+        # Trigrammes du nom complet pour l'autocomplétion (ILIKE et similarité)
+        db.Index(
+            'ix_users_full_name_trgm',
+            (prenom + ' ' + nom).label('full_name'),
+            postgresql_using='gin',
+            postgresql_ops={'full_name': 'gin_trgm_ops'}
+        ),
+    )
+    
+    @property
+    def technology_list(self):
+        """Technologies sérialisées par l'API (liste, dans l'ordre saisi)"""
+        return split_technologies(self.technologies)
 
 class Skill(db.Model):
     __tablename__ = 'skills'
@@ -37,6 +84,12 @@ class Skill(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, nullable=False, default=True)
     
+    __table_args__ = (
+        db.Index('ix_skills_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        # Correspondance des technologies saisies, sans tenir compte de la casse
+        db.Index('ix_skills_name_lower', db.func.lower(name)),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -47,6 +100,15 @@ class Skill(db.Model):
             'is_active': self.is_active
         }
 
+# Technologies d'un utilisateur reliées au catalogue des compétences ;
+# ix_user_technologies_skill sert les filtres "utilisateurs qui connaissent X"
+user_technologies = db.Table('user_technologies',
+    db.Column('user_id', db.String(100), db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('skill_id', db.Integer, db.ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('position', db.Integer, nullable=False, default=0),
+    db.Index('ix_user_technologies_skill', 'skill_id', 'user_id')
+)
+
 class UserSkill(db.Model):
     __tablename__ = 'user_skills'
     
@@ -18,6 +18,10 @@ done
 export FLASK_APP=app.py
 export FLASK_ENV=development
 
+# Extensions requises par les index de recherche (trigrammes)
+echo "Activation des extensions Postgres..."
+PGPASSWORD=teambrains psql -h "$host" -U "teambrains" -d "teambrains" -c "CREATE EXTENSION IF NOT EXISTS pg_trgm;"
+
 # Supprimer la table des migrations si elle existe
 echo "Nettoyage de la table des migrations..."
 PGPASSWORD=teambrains psql -h "$host" -U "teambrains" -d "teambrains" -c "DROP TABLE IF EXISTS alembic_version;"
@@ -38,6 +42,25 @@ flask db migrate -m "initial migration"
 echo "Application de la migration..."
 flask db upgrade
 
+# Remplir les colonnes dérivées ajoutées par la migration (idempotent) :
+# la progression des projets est ensuite maintenue par delta à chaque écriture
+echo "Recalcul de la progression des projets..."
+flask backfill-progress
+
+echo "Création des sprints depuis les noms des tâches..."
+flask backfill-sprints
+
+# Photo du jour (remplacée si elle existe) ; les suivantes sont prises
+# chaque nuit par le service scheduler
+echo "Photo de l'avancement des sprints..."
+flask snapshot-sprints
+
+echo "Résumé des validations des tâches..."
+flask backfill-validations
+
+echo "Liaison des technologies des profils..."
+flask backfill-technologies
+
 # Vérifier l'état des migrations
 echo "Vérification de l'état des migrations..."
 flask db current
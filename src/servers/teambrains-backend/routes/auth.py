@@ -1,13 +1,20 @@
 from flask import Flask, Blueprint, request, jsonify, current_app, session
-from extensions import bcrypt
+from extensions import password_hasher
+from services import PasswordHasherBusy
 from werkzeug.security import generate_password_hash, check_password_hash
 from models import db, User 
+from decorators import role_required
 import jwt
 import datetime
 from flask_jwt_extended import create_access_token, set_access_cookies
 
 auth = Blueprint('auth', __name__)
 
+@auth.app_errorhandler(PasswordHasherBusy)
+def handle_password_hasher_busy(e):
+    current_app.logger.warning('Hachage des mots de passe saturé : %s', e)
+    return jsonify({"error": "Service momentanément surchargé, veuillez réessayer"}), 503, {'Retry-After': '2'}
+
 @auth.route('/signup', methods=['POST'])
 def register():
     data = request.json
@@ -19,7 +26,7 @@ def register():
     if user_exists:
         return jsonify({"error": "Email already exists"}), 409
 
-    hashed_password = bcrypt.generate_password_hash(user_data['password']).decode('utf-8')
+    hashed_password = password_hasher.hash(user_data['password'])
 
     technologies_str = ','.join(user_data['technologies']) if 'technologies' in user_data and user_data['technologies'] else ''
     
@@ -59,13 +66,23 @@ def login():
     if user is None:
         return jsonify({"error": "Unauthorized Access"}), 401
 
-    if not bcrypt.check_password_hash(user.password, data['password']):
+    if not password_hasher.verify_and_update(user, data['password']):
         return jsonify({"error": "Unauthorized"}), 401
 
+    # Le hash a été recalculé avec le nouveau facteur de coût
+    if user in db.session.dirty:
+        db.session.commit()
+
     additional_claims = {"role": user.role}
     # Générer le token avec les claims personnalisés
     access_token = create_access_token(identity=str(user.id), additional_claims=additional_claims, expires_delta=datetime.timedelta(minutes=120))
                                        
     return jsonify({
         "accessToken": access_token
-    }), 200
\ No newline at end of file
+    }), 200
+
+@auth.route('/metrics/password-hashing', methods=['GET'])
+@role_required('admin')
+def password_hashing_metrics():
+    """Profondeur de file et latence du hachage des mots de passe"""
+    return jsonify(password_hasher.metrics()), 200
@@ -1,10 +1,34 @@
 from flask import Blueprint, request, jsonify
 from models import db, Project, Message
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from services.events import publish_project_event
+from services.project_access import require_project_access
 
 
 chat_bp = Blueprint('chat', __name__, url_prefix='/chat')
 
+DEFAULT_MESSAGES_LIMIT = 50
+MAX_MESSAGES_LIMIT = 200
+
+def paginate_messages(project_id, before_id=None, after_id=None, limit=DEFAULT_MESSAGES_LIMIT):
+    """Page de messages par curseur sur l'index (project_id, id)
+    
+    Avec after_id : les messages suivants, du plus ancien au plus récent.
+    Sinon : les derniers messages (avant before_id si fourni).
+    Retourne (messages en ordre chronologique, has_more).
+    """
+    query = Message.query.filter(Message.project_id == project_id)
+    if before_id is not None:
+        query = query.filter(Message.id < before_id)
+    
+    if after_id is not None:
+        query = query.filter(Message.id > after_id).order_by(Message.id.asc())
+        messages = query.limit(limit + 1).all()
+        return messages[:limit], len(messages) > limit
+    
+    messages = query.order_by(Message.id.desc()).limit(limit + 1).all()
+    return list(reversed(messages[:limit])), len(messages) > limit
+
 @chat_bp.route('/<int:project_id>/send', methods=['POST'])
 @jwt_required()
 def create_message(project_id):
@@ -28,6 +52,10 @@ def create_message(project_id):
     if not project:
         return jsonify({"error": "Le projet spécifié n'existe pas"}), 404
     
+    denied = require_project_access(project_id, current_user_id, "Vous n'êtes pas autorisé à écrire dans ce projet")
+    if denied:
+        return denied
+    
     message = Message(
         content=content,
         project_id=project_id,
@@ -39,20 +67,44 @@ def create_message(project_id):
     db.session.add(message)
     db.session.commit()
     
-    return jsonify({
+    publish_project_event(project_id, 'message-created', message.to_dict())
+    
+    response = {
         "message": message.to_dict()
-    }), 201
+    }
+    
+    # Le client indique le dernier message reçu : on ne renvoie que le delta
+    last_seen_id = data.get('last_seen_id')
+    if isinstance(last_seen_id, int):
+        delta, has_more = paginate_messages(project_id, after_id=last_seen_id, limit=MAX_MESSAGES_LIMIT)
+        response["messages"] = [m.to_dict() for m in delta]
+        response["has_more"] = has_more
+    
+    return jsonify(response), 201
 
 @chat_bp.route('/<int:project_id>/messages', methods=['GET'])
 @jwt_required()
 def get_messages(project_id):
+    current_user_id = get_jwt_identity()
     project = Project.query.get(project_id)
     
     if not project:
         return jsonify({"error": "Le projet spécifié n'existe pas"}), 404
     
-    messages = Message.query.filter_by(project_id=project_id).order_by(Message.timestamp.asc()).all()
+    denied = require_project_access(project_id, current_user_id, "Vous n'êtes pas autorisé à lire les messages de ce projet")
+    if denied:
+        return denied
+    
+    before_id = request.args.get('before_id', type=int)
+    after_id = request.args.get('after_id', type=int)
+    limit = request.args.get('limit', DEFAULT_MESSAGES_LIMIT, type=int)
+    limit = max(1, min(limit, MAX_MESSAGES_LIMIT))
+    
+    messages, has_more = paginate_messages(project_id, before_id=before_id, after_id=after_id, limit=limit)
     
     return jsonify({
-        "messages": [message.to_dict() for message in messages]
+        "messages": [message.to_dict() for message in messages],
+        "has_more": has_more,
+        "oldest_id": messages[0].id if messages else None,
+        "newest_id": messages[-1].id if messages else None
     }), 200
\ No newline at end of file
@@ -1,18 +1,42 @@
-from flask import Blueprint, request, jsonify
-from models import db, User, Project, CVProject, project_members, Task
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from hashlib import sha1
+from flask import Blueprint, request, jsonify, current_app
+from models import db, Project, CVProject, project_members
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_current_user
 from datetime import datetime
 from sqlalchemy import table
+from decorators import conditional_response
+from services.cv_documents import get_cv_document
 
 cv_bp = Blueprint('cv', __name__, url_prefix='/cv')
 
+def cv_document_response(user_id, render, public=False, stamp=''):
+    """Servir une vue du CV pré-calculé de user_id, avec ETag / 304
+    
+    render(document) construit le corps JSON ; stamp complète l'ETag pour les
+    données lues hors du document (réglages de visibilité...).
+    """
+    row, _stale = get_cv_document(user_id)
+    if row is None:
+        return jsonify({"error": "Utilisateur non trouvé"}), 404
+    
+    etag = sha1(f"{request.full_path}|{user_id}:{row.version}|{stamp}".encode('utf-8')).hexdigest()
+    if public:
+        shared_max_age = current_app.config.get('HTTP_CACHE_MAX_AGE', 30)
+        cache_control = f"public, max-age=0, s-maxage={shared_max_age}, must-revalidate"
+    else:
+        cache_control = "private, no-cache"
+    
+    return conditional_response(etag, row.built_at, lambda: jsonify(render(row.document)), cache_control)
+
+def cv_project_entries(document):
+    """Projets du document issus de CVProject, sans les projets créés ajoutés d'office"""
+    # Les projets d'un créateur absents de son CV ont un id 'created_<id>'
+    return [project for project in document['projects'] if isinstance(project['id'], int)]
+
 @cv_bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_cv_profile():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"error": "Utilisateur non trouvé"}), 404
+    user = get_current_user()
 
     return jsonify({
         "etudes": user.etudes,
@@ -25,10 +49,7 @@ def get_cv_profile():
 @cv_bp.route('/profile', methods=['PUT'])
 @jwt_required()
 def update_cv_profile():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"error": "Utilisateur non trouvé"}), 404
+    user = get_current_user()
 
     data = request.get_json()
     user.etudes = data.get('etudes', user.etudes)
@@ -48,128 +69,23 @@ def update_cv_profile():
 @jwt_required()
 def get_cv_projects():
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
     
     include_hidden = request.args.get('include_hidden', 'false').lower() == 'true'
     
-    query = CVProject.query.filter_by(user_id=user_id)
-    
     # if not include_hidden:
     #     query = query.filter_by(is_visible=True) Décommenter
     
-    cv_projects = query.all()
-    cv_projects_list = []
-    
-    for cv_project in cv_projects:
-        project_dict = cv_project.to_dict()
-        
-        # Si l'utilisateur est l'entrepreneur/créateur du projet, montrer toutes les tâches
-        project = Project.query.get(cv_project.project_id)
-        if user and user.role == 'businessman' and project and project.creator_id == user_id:
-            user_tasks = Task.query.filter_by(project_id=cv_project.project_id).all()
-        else:
-            # Sinon, ne montrer que les tâches assignées à l'utilisateur
-            user_tasks = Task.query.filter_by(
-                project_id=cv_project.project_id,
-                assignee_id=user_id
-            ).all()
-        
-        project_dict['tasks'] = [task.to_dict() for task in user_tasks]
-        cv_projects_list.append(project_dict)
-    
-    if user and user.role == 'businessman':
-        created_projects = Project.query.filter_by(creator_id=user_id).all()
-        
-        existing_project_ids = {cv_proj.project_id for cv_proj in cv_projects}
-        
-        for project in created_projects:
-            if project.id not in existing_project_ids:
-                team_size = db.session.query(project_members).filter_by(project_id=project.id).count()
-                
-                # Pour les entrepreneurs/créateurs, récupérer TOUTES les tâches du projet
-                user_tasks = Task.query.filter_by(project_id=project.id).all()
-                
-                created_cv_project = {
-                    'id': f"created_{project.id}",
-                    'user_id': user_id,
-                    'project_id': project.id,
-                    'project_name': project.name,
-                    'role': 'Créateur/Entrepreneur',
-                    'start_date': project.creation_date.isoformat(),
-                    'end_date': None,
-                    'team_size': team_size,
-                    'description': project.description,
-                    # 'is_visible': True,  Décommenter
-                    'tasks': [task.to_dict() for task in user_tasks]
-                }
-                cv_projects_list.append(created_cv_project)
-    
-    return jsonify({
-        "projects": cv_projects_list
-    }), 200
+    return cv_document_response(user_id, lambda document: {
+        "projects": document['projects']
+    })
 
 @cv_bp.route('/projects/user/<string:user_id>', methods=['GET'])
 @jwt_required()
 def get_user_cv_projects(user_id):
     """Récupérer les projets CV d'un utilisateur spécifique (profil public)"""
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"error": "Utilisateur non trouvé"}), 404
-    
-    # Récupérer les projets CV existants
-    cv_projects = CVProject.query.filter_by(user_id=user_id).all()
-    cv_projects_list = []
-    
-    for cv_project in cv_projects:
-        project_dict = cv_project.to_dict()
-        
-        # Si l'utilisateur est l'entrepreneur/créateur du projet, montrer toutes les tâches
-        project = Project.query.get(cv_project.project_id)
-        if user and user.role == 'businessman' and project and project.creator_id == user_id:
-            user_tasks = Task.query.filter_by(project_id=cv_project.project_id).all()
-        else:
-            # Sinon, ne montrer que les tâches assignées à l'utilisateur
-            user_tasks = Task.query.filter_by(
-                project_id=cv_project.project_id,
-                assignee_id=user_id
-            ).all()
-        
-        project_dict['tasks'] = [task.to_dict() for task in user_tasks]
-        cv_projects_list.append(project_dict)
-    
-    # Pour les entrepreneurs, ajouter automatiquement leurs projets créés
-    if user and user.role == 'businessman':
-        created_projects = Project.query.filter_by(creator_id=user_id).all()
-        
-        # IDs des projets déjà dans le CV
-        existing_project_ids = {cv_proj.project_id for cv_proj in cv_projects}
-        
-        for project in created_projects:
-            if project.id not in existing_project_ids:
-                # Calculer la taille de l'équipe
-                team_size = db.session.query(project_members).filter_by(project_id=project.id).count()
-                
-                # Pour les entrepreneurs/créateurs, récupérer TOUTES les tâches du projet
-                user_tasks = Task.query.filter_by(project_id=project.id).all()
-                
-                # Créer l'entrée CV pour le projet créé
-                created_cv_project = {
-                    'id': f"created_{project.id}",  # ID unique pour différencier
-                    'user_id': user_id,
-                    'project_id': project.id,
-                    'project_name': project.name,
-                    'role': 'Créateur/Entrepreneur',
-                    'start_date': project.creation_date.isoformat(),
-                    'end_date': None,  # Projet en cours
-                    'team_size': team_size,
-                    'description': project.description,
-                    'tasks': [task.to_dict() for task in user_tasks]
-                }
-                cv_projects_list.append(created_cv_project)
-    
-    return jsonify({
-        "projects": cv_projects_list
-    }), 200
+    return cv_document_response(user_id, lambda document: {
+        "projects": document['projects']
+    })
 
 
 @cv_bp.route('/projects/<int:project_id>', methods=['POST'])
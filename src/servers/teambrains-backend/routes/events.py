@@ -0,0 +1,53 @@
+from flask import Blueprint, Response, jsonify
+from models import Project
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from services.events import event_broker
+from services.project_access import require_project_access
+import json
+import queue
+
+events_bp = Blueprint('events', __name__, url_prefix='/events')
+
+# Commentaire SSE envoyé régulièrement pour garder la connexion ouverte
+KEEPALIVE_SECONDS = 25
+
+def format_sse(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+# EventSource ne permet pas d'envoyer d'en-tête Authorization :
+# le token est aussi accepté dans l'URL (?jwt=...) pour ce flux uniquement
+@events_bp.route('/project/<int:project_id>/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_project_events(project_id):
+    """Flux Server-Sent Events des modifications d'un projet"""
+    current_user_id = get_jwt_identity()
+    
+    project = Project.query.get(project_id)
+    if not project:
+        return jsonify({"error": "Le projet spécifié n'existe pas"}), 404
+    
+    denied = require_project_access(project_id, current_user_id, "Vous n'êtes pas autorisé à suivre ce projet")
+    if denied:
+        return denied
+    
+    subscription = event_broker.subscribe(project_id)
+    
+    # Le générateur s'exécute après la fin de la vue : la session SQLAlchemy
+    # est déjà rendue au pool, un onglet inactif ne garde aucune connexion.
+    def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = subscription.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            event_broker.unsubscribe(project_id, subscription)
+    
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
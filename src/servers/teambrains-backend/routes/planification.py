@@ -1,27 +1,13 @@
 from flask import Blueprint, request, jsonify
 from models import db, User, Project, Task, CVProject
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from services.events import publish_project_event
 from datetime import datetime
 
 planification_bp = Blueprint('planification', __name__, url_prefix='/planification')
 
-def update_project_progress(project_id):
-    tasks = Task.query.filter_by(project_id=project_id).all()
-    
-    if not tasks:
-        return 0
-    
-    total_progress = sum(task.percent_completion for task in tasks)
-    total_tasks = len(tasks)
-    
-    project_progress = total_progress / total_tasks
-    
-    project = Project.query.get(project_id)
-    if project:
-        project.progress = project_progress
-        db.session.commit()
-    
-    return project_progress
+# La progression des projets (Project.progress) est tenue à jour à chaque
+# écriture de tâche, dans la même transaction : voir services/project_progress.py
 
 def add_project_to_cv_if_completed(project_id, user_id):
     # Vérifier si toutes les tâches du projet sont complétées
@@ -93,7 +79,7 @@ def create_task(project_id):
     db.session.add(new_task)
     db.session.commit()
     
-    update_project_progress(project_id)
+    publish_project_event(project_id, 'task-updated', new_task.to_dict())
 
     return jsonify({
         "message": "Tâche créée avec succès",
@@ -139,10 +125,10 @@ def update_task(task_id):
     
     db.session.commit()
     
-    update_project_progress(task.project_id)
-    
     if task.percent_completion == 100:
         add_project_to_cv_if_completed(task.project_id, task.assignee_id)
+    
+    publish_project_event(task.project_id, 'task-updated', task.to_dict())
 
     return jsonify({
         "message": "Tâche mise à jour avec succès",
@@ -161,8 +147,7 @@ def delete_task(task_id):
     db.session.delete(task)
     db.session.commit()
     
-    # Mettre à jour la progression du projet
-    update_project_progress(project_id)
+    publish_project_event(project_id, 'task-deleted', {'id': task_id})
 
     return jsonify({"message": "Tâche supprimée avec succès"}), 200
 
@@ -175,9 +160,7 @@ def get_project_progress(project_id):
     if not project:
         return jsonify({"error": "Le projet spécifié n'existe pas"}), 404
     
-    progress = update_project_progress(project_id)
-    
     return jsonify({
         "project_id": project_id,
-        "progress": progress
+        "progress": project.progress
     }), 200
\ No newline at end of file
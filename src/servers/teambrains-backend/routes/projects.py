@@ -1,11 +1,16 @@
 from flask import Blueprint, request, jsonify
 from models import db, User, Project, project_members, CVProject
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_current_user
+from decorators import http_cache
+from services.project_access import invalidate_project_access
+from services.cv_documents import invalidate_cv_documents
+from services.search import build_tsquery
 from datetime import datetime
 from dateutil import parser
 from dateutil.tz import UTC
 from slugify import slugify
-from sqlalchemy.orm import joinedload
+from sqlalchemy import func, exists, and_, or_, literal_column
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 
 projects = Blueprint('projects', __name__)
 
@@ -38,76 +43,134 @@ def create_project():
         "project_id": new_project.id,
         "project": new_project.to_dict()
     }), 201
+
+DEFAULT_PROJECTS_LIMIT = 50
+MAX_PROJECTS_LIMIT = 200
+
+def project_catalog_query(page, newest_first=False):
+    """Projets de la sous-requête page avec leurs membres, en une seule requête
+
+    Les membres (id, nom, rôle) sont agrégés en JSON par Postgres.
+    """
+    member = func.json_build_object(
+        'user_id', User.id,
+        'name', User.prenom + ' ' + User.nom,
+        'role', project_members.c.role
+    )
+    members = func.coalesce(
+        func.json_agg(aggregate_order_by(member, User.id)).filter(User.id.isnot(None)),
+        literal_column("'[]'::json")
+    )
+
+    return db.session.query(
+        Project.id,
+        Project.name,
+        Project.project_slug,
+        Project.status,
+        Project.description,
+        Project.creation_date,
+        Project.creator_id,
+        members.label('members')
+    ).join(
+        page, page.c.id == Project.id
+    ).outerjoin(
+        project_members, project_members.c.project_id == Project.id
+    ).outerjoin(
+        User, User.id == project_members.c.user_id
+    ).group_by(Project.id).order_by(Project.id.desc() if newest_first else Project.id)
+
+def format_catalog_project(row):
+    return {
+        'id': row.id,
+        'name': row.name,
+        'project_slug': row.project_slug,
+        'status': row.status,
+        'description': row.description,
+        'creation_date': row.creation_date.isoformat(),
+        'creator_id': row.creator_id,
+        'members': row.members
+    }
+
+def is_project_member(user_id):
+    """Condition SQL : l'utilisateur a créé le projet ou en est membre"""
+    return or_(Project.creator_id == user_id, exists().where(and_(
+        project_members.c.project_id == Project.id,
+        project_members.c.user_id == user_id
+    )))
+
 @projects.route('/list_projects', methods=['GET'])
+@http_cache('projects', 'users')
 def list_projects():
-    all_projects = Project.query.options(joinedload(Project.members)).all()
-    projects_list = []
-
-    for project in all_projects:
-        members = db.session.query(User, project_members.c.role).join(
-            project_members, (User.id == project_members.c.user_id)
-        ).filter(project_members.c.project_id == project.id).all()
-
-        members_list = [
-            {
-                'user_id': member.User.id,
-                'name': f"{member.User.prenom} {member.User.nom}",
-                'role': member.role
-            } for member in members
-        ]
-
-        project_dict = {
-            'id': project.id,
-            'name': project.name,
-            'project_slug': project.project_slug,
-            'status': project.status,
-            'description': project.description,
-            'creation_date': project.creation_date.isoformat(),
-            'creator_id': project.creator_id,
-            'members': members_list
-        }
-        projects_list.append(project_dict)
-
-    return jsonify(projects_list), 200
+    """Catalogue public des projets, paginé par curseur
+
+    order : newest (défaut, les plus récents d'abord, curseur before_id) ou
+    oldest (curseur after_id) ; l'id suit l'ordre de création.
+    Filtres : search (nom, description, statut), status, creator_id,
+    member_id (créateur ou membre), exclude_member_id (ni l'un ni l'autre),
+    missing_role (rôles séparés par des virgules : au moins un n'est pris
+    par aucun membre), id.
+    Le corps reste une liste ; le curseur de la page suivante est renvoyé
+    dans l'en-tête X-Next-Cursor (absent sur la dernière page).
+    """
+    newest_first = request.args.get('order', 'newest') != 'oldest'
+    before_id = request.args.get('before_id', type=int)
+    after_id = request.args.get('after_id', type=int)
+    project_id = request.args.get('id', type=int)
+    limit = request.args.get('limit', DEFAULT_PROJECTS_LIMIT, type=int)
+    limit = max(1, min(limit, MAX_PROJECTS_LIMIT))
+
+    # Filtrage et pagination d'abord, sur les seuls ids : l'agrégation des
+    # membres ne porte ensuite que sur la page demandée
+    page = db.session.query(Project.id)
+    if before_id is not None:
+        page = page.filter(Project.id < before_id)
+    if after_id is not None:
+        page = page.filter(Project.id > after_id)
+    if project_id is not None:
+        page = page.filter(Project.id == project_id)
+    if request.args.get('status'):
+        page = page.filter(Project.status == request.args['status'])
+    if request.args.get('creator_id'):
+        page = page.filter(Project.creator_id == request.args['creator_id'])
+    tsquery = build_tsquery(request.args.get('search', ''))
+    if tsquery is not None:
+        page = page.filter(Project.search_vector.op('@@')(tsquery))
+    if request.args.get('member_id'):
+        page = page.filter(is_project_member(request.args['member_id']))
+    if request.args.get('exclude_member_id'):
+        page = page.filter(~is_project_member(request.args['exclude_member_id']))
+    missing_roles = [role.strip() for role in request.args.get('missing_role', '').split(',') if role.strip()]
+    if missing_roles:
+        page = page.filter(or_(*(~exists().where(and_(
+            project_members.c.project_id == Project.id,
+            project_members.c.role == role
+        )) for role in missing_roles)))
+    page = page.order_by(Project.id.desc() if newest_first else Project.id).limit(limit + 1).subquery()
+
+    rows = project_catalog_query(page, newest_first).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    response = jsonify([format_catalog_project(row) for row in rows])
+    if has_more:
+        response.headers['X-Next-Cursor'] = str(rows[-1].id)
+    return response, 200
 
 @projects.route('/get_project/<slug>', methods=['GET'])
+@http_cache('projects', 'users')
 def get_project(slug):
-    project = Project.query.filter_by(project_slug=slug).first()
-    if not project:
+    page = db.session.query(Project.id).filter(Project.project_slug == slug).subquery()
+    row = project_catalog_query(page).first()
+    if not row:
         return jsonify({"error": "Projet non trouvé"}), 404
 
-    members = db.session.query(User, project_members.c.role).join(
-        project_members, (User.id == project_members.c.user_id)
-    ).filter(project_members.c.project_id == project.id).all()
-
-    members_list = [
-        {
-            'user_id': member.User.id,
-            'name': f"{member.User.prenom} {member.User.nom}",
-            'role': member.role
-        } for member in members
-    ]
-
-    project_data = {
-        'id': project.id,
-        'name': project.name,
-        'project_slug': project.project_slug,
-        'status': project.status,
-        'description': project.description,
-        'creation_date': project.creation_date.isoformat(),
-        'creator_id': project.creator_id,
-        'members': members_list
-    }
-
-    return jsonify(project_data), 200
+    return jsonify(format_catalog_project(row)), 200
 
 @projects.route('/join_project/<int:project_id>', methods=['POST'])
 @jwt_required()
 def join_project(project_id):
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"error": "Utilisateur non trouvé"}), 404
+    user = get_current_user()
 
     project = Project.query.get(project_id)
     if not project:
@@ -158,6 +221,7 @@ def join_project(project_id):
     db.session.add(new_cv_project)
     
     db.session.commit()
+    invalidate_project_access(project_id, user_id)
 
     return jsonify({
         "message": "Utilisateur ajouté au projet avec succès et projet ajouté au CV",
@@ -168,9 +232,6 @@ def join_project(project_id):
 @jwt_required()
 def leave_project(project_id):
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"error": "Utilisateur non trouvé"}), 404
 
     project = Project.query.get(project_id)
     if not project:
@@ -183,7 +244,10 @@ def leave_project(project_id):
     # Retirez l'utilisateur du projet
     stmt = project_members.delete().where(project_members.c.project_id == project_id, project_members.c.user_id == user_id)
     db.session.execute(stmt)
+    # Taille d'équipe affichée dans le CV du créateur
+    invalidate_cv_documents(db.session, creator_project_ids=[project_id])
     db.session.commit()
+    invalidate_project_access(project_id, user_id)
 
     return jsonify({"message": "Utilisateur retiré du projet avec succès"}), 200
 
@@ -1,8 +1,10 @@
 from flask import Blueprint, request, jsonify
-from models import db, User, School, SchoolRegistrationToken, Subscription, CVProject, Task, Project, project_members
-from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token
+from models import db, User, School, SchoolRegistrationToken, Subscription
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_current_user, create_access_token
 from datetime import datetime, timedelta
-from extensions import bcrypt
+from extensions import password_hasher
+from services import PasswordHasherBusy, technology_filter
+from routes.cv import cv_document_response
 import secrets
 import logging
 
@@ -32,6 +34,9 @@ def register_school():
     if existing_user:
         return jsonify({"error": "Un utilisateur avec cet email existe déjà"}), 400
     
+    # Hachage hors du try : une saturation du pool doit remonter en 503
+    admin_password_hash = password_hasher.hash(data['admin_password'])
+    
     try:
         # Créer l'école
         new_school = School(
@@ -49,7 +54,7 @@ def register_school():
             nom=data['admin_lastname'],
             prenom=data['admin_firstname'],
             email=data['admin_email'],
-            password=bcrypt.generate_password_hash(data['admin_password']).decode('utf-8'),
+            password=admin_password_hash,
             school_id=new_school.id
         )
         db.session.add(admin_user)
@@ -90,9 +95,12 @@ def school_admin_login():
         logging.info(f"Tentative de connexion pour {user.email}")
         logging.info(f"Hash du mot de passe (premiers caractères): {user.password[:50]}...")
         
-        if not bcrypt.check_password_hash(user.password, data['password']):
+        if not password_hasher.verify_and_update(user, data['password']):
             return jsonify({"error": "Identifiants invalides"}), 401
         
+        if user in db.session.dirty:
+            db.session.commit()
+        
         # Vérifier que l'école est active
         if not user.school or not user.school.is_active:
             return jsonify({"error": "École inactive"}), 403
@@ -113,6 +121,8 @@ def school_admin_login():
             }
         }), 200
         
+    except PasswordHasherBusy:
+        raise
     except Exception as e:
         logging.error(f"Erreur lors de la connexion: {str(e)}")
         return jsonify({"error": "Erreur lors de la connexion"}), 500
@@ -125,8 +135,7 @@ def school_admin_login():
 @jwt_required()
 def list_registration_tokens():
     """Lister tous les tokens d'inscription de l'école"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if not user or user.role != 'school_admin' or not user.school_id:
         return jsonify({"error": "Accès non autorisé"}), 403
@@ -143,7 +152,7 @@ def list_registration_tokens():
 def create_registration_token():
     """Créer un nouveau token d'inscription pour l'école"""
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if not user or user.role != 'school_admin' or not user.school_id:
         return jsonify({"error": "Accès non autorisé"}), 403
@@ -187,8 +196,7 @@ def create_registration_token():
 @jwt_required()
 def update_registration_token(token_id):
     """Modifier un token d'inscription"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if not user or user.role != 'school_admin' or not user.school_id:
         return jsonify({"error": "Accès non autorisé"}), 403
@@ -231,8 +239,7 @@ def update_registration_token(token_id):
 @jwt_required()
 def delete_registration_token(token_id):
     """Supprimer un token d'inscription"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if not user or user.role != 'school_admin' or not user.school_id:
         return jsonify({"error": "Accès non autorisé"}), 403
@@ -400,7 +407,7 @@ def register_student_with_token():
         logging.info(f"Tentative de liaison pour {existing_user.email}")
         logging.info(f"Hash du mot de passe (premiers caractères): {existing_user.password[:50]}...")
         
-        if not bcrypt.check_password_hash(existing_user.password, data['password']):
+        if not password_hasher.verify_and_update(existing_user, data['password']):
             return jsonify({"error": "Mot de passe incorrect"}), 401
         
         try:
@@ -465,6 +472,8 @@ def register_student_with_token():
         if data['typeDeveloppeur'] not in valid_types:
             return jsonify({"error": f"Type de développeur invalide. Valeurs autorisées: {', '.join(valid_types)}"}), 400
     
+        student_password_hash = password_hasher.hash(data['password'])
+    
         try:
             # Créer l'étudiant
             new_student = User(
@@ -472,7 +481,7 @@ def register_student_with_token():
                 nom=data['nom'],
                 prenom=data['prenom'],
                 email=data['email'],
-                password=bcrypt.generate_password_hash(data['password']).decode('utf-8'),
+                password=student_password_hash,
                 school_id=token.school_id,
                 typeDeveloppeur=data.get('typeDeveloppeur'),
                 technologies=','.join(data.get('technologies', [])) if data.get('technologies') else None,
@@ -519,8 +528,7 @@ def register_student_with_token():
 @jwt_required()
 def list_school_students():
     """Obtenir la liste des étudiants de l'école"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if not user or user.role != 'school_admin' or not user.school_id:
         return jsonify({"error": "Accès non autorisé"}), 403
@@ -529,10 +537,15 @@ def list_school_students():
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 20))
         search = request.args.get('search', '').strip()
+        technologies = request.args.getlist('technologies')
         
         # Query de base
         query = User.query.filter_by(school_id=user.school_id, role='student')
         
+        # Filtrage par technologies (toutes requises, index user_technologies)
+        if technologies:
+            query = query.filter(technology_filter(technologies))
+        
         # Filtrage par recherche
         if search:
             query = query.filter(
@@ -559,7 +572,7 @@ def list_school_students():
                 'email': student.email,
                 'formation': student.etudes,
                 'niveau_etudes': student.typeDeveloppeur,
-                'technologies': student.technologies.split(',') if student.technologies else [],
+                'technologies': student.technology_list,
                 'linkedin_url': student.linkedin_url,
                 'portfolio_url': student.portfolio_url,
                 'github_url': student.github_url,
@@ -592,8 +605,7 @@ def list_school_students():
 @jwt_required()
 def get_school_stats():
     """Obtenir les statistiques de l'école"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if not user or user.role != 'school_admin' or not user.school_id:
         return jsonify({"error": "Accès non autorisé"}), 403
@@ -628,8 +640,7 @@ def get_school_stats():
 def get_student_profile(student_id):
     """Récupérer le profil d'un étudiant pour l'école"""
     try:
-        current_user_id = get_jwt_identity()
-        admin_user = User.query.get(current_user_id)
+        admin_user = get_current_user()
         
         if not admin_user or admin_user.role != 'school_admin' or not admin_user.school_id:
             return jsonify({"error": "Accès non autorisé"}), 403
@@ -650,7 +661,7 @@ def get_student_profile(student_id):
             "role": student.role,
             "email": student.email,  # L'école peut voir l'email de ses étudiants
             "typeDeveloppeur": student.typeDeveloppeur,
-            "technologies": student.technologies.split(',') if student.technologies else [],
+            "technologies": student.technology_list,
             "etudes": student.etudes,
             "ambitions": student.ambitions,
             "linkedin_url": student.linkedin_url,
@@ -672,8 +683,7 @@ def get_student_profile(student_id):
 def get_student_cv_projects(student_id):
     """Récupérer les projets CV d'un étudiant pour l'école"""
     try:
-        current_user_id = get_jwt_identity()
-        admin_user = User.query.get(current_user_id)
+        admin_user = get_current_user()
         
         if not admin_user or admin_user.role != 'school_admin' or not admin_user.school_id:
             return jsonify({"error": "Accès non autorisé"}), 403
@@ -687,58 +697,7 @@ def get_student_cv_projects(student_id):
         if not student:
             return jsonify({"error": "Étudiant non trouvé ou n'appartient pas à cette école"}), 404
         
-        # Récupérer les projets CV
-        cv_projects = CVProject.query.filter_by(user_id=student_id).all()
-        cv_projects_list = []
-        
-        for cv_project in cv_projects:
-            project_dict = cv_project.to_dict()
-            
-            # Si l'étudiant est l'entrepreneur/créateur du projet, montrer toutes les tâches
-            project = Project.query.get(cv_project.project_id)
-            if student and student.role == 'businessman' and project and project.creator_id == student_id:
-                user_tasks = Task.query.filter_by(project_id=cv_project.project_id).all()
-            else:
-                # Sinon, ne montrer que les tâches assignées à l'étudiant
-                user_tasks = Task.query.filter_by(
-                    project_id=cv_project.project_id,
-                    assignee_id=student_id
-                ).all()
-            
-            project_dict['tasks'] = [task.to_dict() for task in user_tasks]
-            cv_projects_list.append(project_dict)
-        
-        # Pour les entrepreneurs, ajouter automatiquement leurs projets créés
-        if student.role == 'businessman':
-            created_projects = Project.query.filter_by(creator_id=student_id).all()
-            
-            # IDs des projets déjà dans le CV
-            existing_project_ids = {cv_proj.project_id for cv_proj in cv_projects}
-            
-            for project in created_projects:
-                if project.id not in existing_project_ids:
-                    # Calculer la taille de l'équipe
-                    team_size = db.session.query(project_members).filter_by(project_id=project.id).count()
-                    
-                    # Pour les entrepreneurs/créateurs, récupérer TOUTES les tâches du projet
-                    user_tasks = Task.query.filter_by(project_id=project.id).all()
-                    
-                    # Créer l'entrée CV pour le projet créé
-                    created_cv_project = {
-                        'id': f"created_{project.id}",
-                        'user_id': student_id,
-                        'project_id': project.id,
-                        'project_name': project.name,
-                        'role': 'Créateur/Entrepreneur',
-                        'start_date': project.creation_date.isoformat(),
-                        'end_date': None,
-                        'team_size': team_size,
-                        'description': project.description,
-                        'tasks': [task.to_dict() for task in user_tasks]
-                    }
-                    cv_projects_list.append(created_cv_project)
-        
-        return jsonify({"projects": cv_projects_list}), 200
+        return cv_document_response(student_id, lambda document: {"projects": document['projects']})
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500 
\ No newline at end of file
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from models import db, User, School, SchoolToken
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from decorators import http_cache
+from routes.cv import cv_document_response, cv_project_entries
 from datetime import datetime, timedelta
 import secrets
 
@@ -28,6 +30,7 @@ def verify_school_token():
         return None, jsonify({"error": "Erreur de vérification du token"}), 401
 
 @schools_bp.route('/ecoles', methods=['GET'])
+@http_cache('schools', 'users')
 def list_schools():
     """Liste toutes les écoles actives"""
     schools = School.query.filter_by(is_active=True).all()
@@ -152,7 +155,7 @@ def get_school_students():
             'nom': student.nom,
             'email': student.email,
             'typeDeveloppeur': student.typeDeveloppeur,
-            'technologies': student.technologies.split(',') if student.technologies else [],
+            'technologies': student.technology_list,
             'etudes': student.etudes,
             'ambitions': student.ambitions,
             'linkedin_url': student.linkedin_url,
@@ -184,44 +187,22 @@ def get_student_cv(student_id):
     if not student:
         return jsonify({"error": "Étudiant non trouvé dans cette école"}), 404
     
-    # Importer ici pour éviter les imports circulaires
-    from routes.cv import get_cv_projects
-    
-    # Simuler une requête pour récupérer le CV
-    # On pourrait factoriser cette logique dans une fonction séparée
-    from models import CVProject, Task
-    
-    cv_projects = CVProject.query.filter_by(user_id=student_id).all()
-    cv_projects_list = []
-    
-    for cv_project in cv_projects:
-        project_dict = cv_project.to_dict()
-        
-        # Récupérer les tâches assignées à l'étudiant
-        user_tasks = Task.query.filter_by(
-            project_id=cv_project.project_id,
-            assignee_id=student_id
-        ).all()
-        
-        project_dict['tasks'] = [task.to_dict() for task in user_tasks]
-        cv_projects_list.append(project_dict)
-    
-    return jsonify({
-        "student": {
-            'id': student.id,
-            'prenom': student.prenom,
-            'nom': student.nom,
-            'email': student.email,
-            'typeDeveloppeur': student.typeDeveloppeur,
-            'technologies': student.technologies.split(',') if student.technologies else [],
-            'etudes': student.etudes,
-            'ambitions': student.ambitions,
-            'linkedin_url': student.linkedin_url,
-            'portfolio_url': student.portfolio_url,
-            'github_url': student.github_url
-        },
-        "projects": cv_projects_list
-    }), 200
+    # Profil et projets lus dans le CV pré-calculé (cohérents avec l'ETag)
+    profile_fields = ('prenom', 'nom', 'email', 'typeDeveloppeur', 'technologies', 'etudes',
+                      'ambitions', 'linkedin_url', 'portfolio_url', 'github_url')
+    return cv_document_response(student_id, lambda document: {
+        "student": dict(
+            {'id': student.id},
+            **{field: document['profile'][field] for field in profile_fields}
+        ),
+        # Entrées CVProject et tâches assignées à l'étudiant seulement, comme
+        # avant le CV pré-calculé (qui ajoute les projets créés et toutes
+        # leurs tâches au CV d'un entrepreneur)
+        "projects": [
+            dict(project, tasks=[task for task in project['tasks'] if task['assignee_id'] == student_id])
+            for project in cv_project_entries(document)
+        ]
+    })
 
 @schools_bp.route('/ecole/token/<int:token_id>/deactivate', methods=['POST'])
 @jwt_required()
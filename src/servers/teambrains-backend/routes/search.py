@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
-from models import db, User, Project, School, project_members, Task, Message
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import or_, and_
+from models import db, User, Project, project_members
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_current_user
+from services.search import search_projects, search_users, search_tasks, search_messages, search_schools, suggest, run_searches
 
 search_bp = Blueprint('search', __name__)
 
@@ -11,96 +11,41 @@ def global_search():
     try:
         # Récupérer l'utilisateur actuel
         current_user_id = get_jwt_identity()
-        current_user = db.session.query(User).filter(User.id == current_user_id).first()
+        current_user = get_current_user()
         
         query = request.args.get('q', '').strip()
+        technologies = request.args.getlist('technologies')
         
         if not query:
             return jsonify({'results': []})
         
-        # 1. Recherche directe dans les projets
-        projects_direct = db.session.query(Project).filter(
-            or_(
-                Project.name.ilike(f'%{query}%'),
-                Project.description.ilike(f'%{query}%'),
-                Project.status.ilike(f'%{query}%')
-            )
-        ).all()
-        
-        # 2. Recherche dans les projets via les noms des membres
-        projects_via_members = db.session.query(Project).join(
-            project_members, Project.id == project_members.c.project_id
-        ).join(
-            User, User.id == project_members.c.user_id
-        ).filter(
-            or_(
-                User.nom.ilike(f'%{query}%'),
-                User.prenom.ilike(f'%{query}%'),
-                db.func.concat(User.prenom, ' ', User.nom).ilike(f'%{query}%'),
-                db.func.concat(User.nom, ' ', User.prenom).ilike(f'%{query}%')
-            )
-        ).all()
-        
-        # Combiner et dédupliquer les projets
-        all_projects = {p.id: p for p in projects_direct + projects_via_members}
-        projects = list(all_projects.values())[:10]  # Limiter à 10
-        
-        # 3. Recherche exhaustive dans les utilisateurs
-        users = db.session.query(User).filter(
-            or_(
-                User.nom.ilike(f'%{query}%'),
-                User.prenom.ilike(f'%{query}%'),
-                User.typeDeveloppeur.ilike(f'%{query}%'),
-                User.technologies.ilike(f'%{query}%'),
-                User.etudes.ilike(f'%{query}%'),
-                User.ambitions.ilike(f'%{query}%'),
-                # Recherche combinée nom + prénom dans les deux sens
-                db.func.concat(User.prenom, ' ', User.nom).ilike(f'%{query}%'),
-                db.func.concat(User.nom, ' ', User.prenom).ilike(f'%{query}%')
-            )
-        ).limit(10).all()
-        
-        # 4. Recherche dans les tâches (seulement pour les projets où l'utilisateur participe)
-        tasks = []
-        user_project_ids = []
+        # Recherche plein texte (index GIN, voir services/search.py) : chaque
+        # type d'entité est classé par pertinence et limité en SQL
+        searches = {
+            'projects': (search_projects, (query,), {'limit': 10}),
+            'users': (search_users, (query,), {'limit': 10, 'technologies': technologies})
+        }
+        
+        # Tâches et messages : seulement pour les projets où l'utilisateur participe
         if current_user:
-            # Récupérer les projets de l'utilisateur
             user_projects = db.session.query(project_members.c.project_id).filter_by(user_id=current_user_id).all()
             user_project_ids = [p[0] for p in user_projects]
             
-            if user_project_ids:
-                tasks = db.session.query(Task).filter(
-                    and_(
-                        Task.project_id.in_(user_project_ids),
-                        or_(
-                            Task.title.ilike(f'%{query}%'),
-                            Task.description.ilike(f'%{query}%'),
-                            Task.priority.ilike(f'%{query}%'),
-                            Task.sprint.ilike(f'%{query}%')
-                        )
-                    )
-                ).limit(5).all()
-
-        # 5. Recherche dans les messages (seulement pour les projets où l'utilisateur participe)
-        messages = []
-        if current_user and user_project_ids:
-            messages = db.session.query(Message).filter(
-                and_(
-                    Message.project_id.in_(user_project_ids),
-                    Message.content.ilike(f'%{query}%')
-                )
-            ).limit(5).all()
-
-        # 6. Recherche dans les écoles (si accessible)
-        schools = []
+            searches['tasks'] = (search_tasks, (query, user_project_ids), {'limit': 5})
+            searches['messages'] = (search_messages, (query, user_project_ids), {'limit': 5})
+        
+        # Écoles (admin seulement)
         if current_user and current_user.role == 'admin':
-            schools = db.session.query(School).filter(
-                or_(
-                    School.name.ilike(f'%{query}%'),
-                    School.description.ilike(f'%{query}%'),
-                    School.contact_email.ilike(f'%{query}%')
-                )
-            ).limit(5).all()
+            searches['schools'] = (search_schools, (query,), {'limit': 5})
+        
+        # Sous-recherches indépendantes, chacune sur sa connexion ; celles qui
+        # dépassent le délai sont signalées dans timed_out
+        found, timed_out = run_searches(searches)
+        projects = found['projects']
+        users = found['users']
+        tasks = found.get('tasks', [])
+        messages = found.get('messages', [])
+        schools = found.get('schools', [])
         
         # Formatage des résultats
         results = {
@@ -111,20 +56,44 @@ def global_search():
             'schools': []
         }
         
-        # Projets
-        for project in projects:
-            # Récupérer les membres du projet
-            members = db.session.query(User, project_members.c.role).join(
-                project_members, (User.id == project_members.c.user_id)
-            ).filter(project_members.c.project_id == project.id).all()
+        # Les données liées sont chargées en lot (une requête IN par type)
+        # plutôt qu'une requête par résultat
+        members_by_project = {project.id: [] for project in projects}
+        if members_by_project:
+            members = db.session.query(
+                project_members.c.project_id, project_members.c.role, User.id, User.prenom, User.nom
+            ).join(
+                User, User.id == project_members.c.user_id
+            ).filter(project_members.c.project_id.in_(members_by_project)).all()
             
-            project_members_list = []
-            for user, role in members:
-                project_members_list.append({
-                    'user_id': user.id,
-                    'name': f"{user.prenom} {user.nom}",
+            for project_id, role, user_id, prenom, nom in members:
+                members_by_project[project_id].append({
+                    'user_id': user_id,
+                    'name': f"{prenom} {nom}",
                     'role': role
                 })
+        
+        linked_project_ids = {task.project_id for task in tasks} | {message.project_id for message in messages}
+        linked_projects = {}
+        if linked_project_ids:
+            linked_projects = {
+                row.id: row for row in db.session.query(
+                    Project.id, Project.name, Project.project_slug
+                ).filter(Project.id.in_(linked_project_ids)).all()
+            }
+        
+        sender_ids = {message.sender_id for message in messages}
+        senders = {}
+        if sender_ids:
+            senders = {
+                row.id: row for row in db.session.query(
+                    User.id, User.prenom, User.nom
+                ).filter(User.id.in_(sender_ids)).all()
+            }
+        
+        # Projets
+        for project in projects:
+            project_members_list = members_by_project[project.id]
             
             results['projects'].append({
                 'id': project.id,
@@ -151,8 +120,7 @@ def global_search():
         
         # Tâches
         for task in tasks:
-            # Récupérer le projet associé
-            project = Project.query.get(task.project_id)
+            project = linked_projects.get(task.project_id)
             results['tasks'].append({
                 'id': task.id,
                 'title': task.title,
@@ -169,9 +137,8 @@ def global_search():
         
         # Messages
         for message in messages:
-            # Récupérer le projet et l'expéditeur
-            project = Project.query.get(message.project_id)
-            sender = User.query.get(message.sender_id)
+            project = linked_projects.get(message.project_id)
+            sender = senders.get(message.sender_id)
             results['messages'].append({
                 'id': message.id,
                 'content': message.content[:200] + '...' if len(message.content) > 200 else message.content,  # Tronquer le contenu
@@ -196,8 +163,33 @@ def global_search():
         return jsonify({
             'query': query,
             'results': results,
-            'total': len(projects) + len(users) + len(tasks) + len(messages) + len(schools)
+            'total': len(projects) + len(users) + len(tasks) + len(messages) + len(schools),
+            'partial': bool(timed_out),
+            'timed_out': timed_out
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500 
+
+# Nombre maximal de suggestions par type
+MAX_SUGGESTIONS = 10
+
+@search_bp.route('/suggest', methods=['GET'])
+@jwt_required()
+def search_suggest():
+    """Autocomplétion légère (trigrammes) pour la barre de recherche"""
+    try:
+        query = request.args.get('q', '').strip()
+        limit = request.args.get('limit', 5, type=int)
+        limit = max(1, min(limit, MAX_SUGGESTIONS))
+        
+        suggestions, did_you_mean = suggest(query, limit=limit)
+        
+        return jsonify({
+            'query': query,
+            'suggestions': suggestions,
+            'did_you_mean': did_you_mean
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500 
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
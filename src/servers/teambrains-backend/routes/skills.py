@@ -2,7 +2,12 @@ from flask import Blueprint, request, jsonify
 from models import db, User, Skill, UserSkill
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-from sqlalchemy import or_, and_
+from hashlib import sha1
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import joinedload
+from decorators import conditional_response
+from services.skill_catalog import CATALOG_SCOPE, get_skill_catalog, filter_skills
+from services import technology_filter, search_users_by_skill_ids, record_user_skills, invalidate_cv_documents, compute_user_skill_stats, get_global_skill_stats
 
 skills_bp = Blueprint('skills', __name__, url_prefix='/skills')
 
@@ -16,16 +21,29 @@ def create_skill():
         return jsonify({"error": "Le nom de la compétence est requis"}), 400
     
     existing_skill = Skill.query.filter_by(name=data['name']).first()
-    if existing_skill:
+    if existing_skill and existing_skill.is_active:
         return jsonify({"error": "Cette compétence existe déjà"}), 409
     
-    skill = Skill(
-        name=data['name'],
-        category=data.get('category'),
-        description=data.get('description')
-    )
+    # Technologie saisie dans un profil (compétence inactive, casse ignorée) :
+    # elle est activée plutôt que dupliquée, les profils qui la citent restent reliés
+    skill = existing_skill or Skill.query.filter(
+        db.func.lower(Skill.name) == data['name'].lower(),
+        Skill.is_active == False
+    ).order_by(Skill.id).first()
+    
+    if skill:
+        skill.name = data['name']
+        skill.category = data.get('category')
+        skill.description = data.get('description')
+        skill.is_active = True
+    else:
+        skill = Skill(
+            name=data['name'],
+            category=data.get('category'),
+            description=data.get('description')
+        )
+        db.session.add(skill)
     
-    db.session.add(skill)
     db.session.commit()
     
     return jsonify({
@@ -33,6 +51,11 @@ def create_skill():
         "skill": skill.to_dict()
     }), 201
 
+def catalog_response(catalog, render):
+    """Réponse construite depuis le catalogue, avec ETag / 304 (version du catalogue)"""
+    etag = sha1(f"{request.full_path}|{CATALOG_SCOPE}:{catalog.version}".encode('utf-8')).hexdigest()
+    return conditional_response(etag, catalog.updated_at, lambda: jsonify(render()), "private, no-cache")
+
 @skills_bp.route('/list', methods=['GET'])
 @jwt_required()
 def get_all_skills():
@@ -40,34 +63,21 @@ def get_all_skills():
     category = request.args.get('category')
     search = request.args.get('search')
     
-    query = Skill.query.filter_by(is_active=True)
-    
-    if category:
-        query = query.filter_by(category=category)
-    
-    if search:
-        query = query.filter(Skill.name.ilike(f'%{search}%'))
+    catalog = get_skill_catalog()
     
-    skills = query.order_by(Skill.name).all()
-    
-    return jsonify({
-        "skills": [skill.to_dict() for skill in skills]
-    }), 200
+    return catalog_response(catalog, lambda: {
+        "skills": filter_skills(catalog, category, search)
+    })
 
 @skills_bp.route('/categories', methods=['GET'])
 @jwt_required()
 def get_skill_categories():
     """Récupérer toutes les catégories de compétences"""
-    categories = db.session.query(Skill.category).filter(
-        Skill.category.isnot(None),
-        Skill.is_active == True
-    ).distinct().all()
+    catalog = get_skill_catalog()
     
-    category_list = [cat[0] for cat in categories if cat[0]]
-    
-    return jsonify({
-        "categories": sorted(category_list)
-    }), 200
+    return catalog_response(catalog, lambda: {
+        "categories": list(catalog.categories)
+    })
 
 @skills_bp.route('/user/add', methods=['POST'])
 @jwt_required()
@@ -222,9 +232,17 @@ def get_user_skills_by_level(level):
 @skills_bp.route('/search-users', methods=['GET'])
 @jwt_required()
 def search_users_by_skills():
-    """Rechercher des utilisateurs par compétences"""
+    """Rechercher des utilisateurs par compétences
+    
+    mode=any (défaut) : au moins une des compétences ; mode=all : toutes.
+    technologies : restreint aux utilisateurs ayant aussi ces technologies.
+    Les utilisateurs sont classés par nombre de compétences couvertes puis
+    par auto-évaluation, à partir de l'index en mémoire du worker.
+    """
     skill_names = request.args.getlist('skills')  
     level = request.args.get('level')  
+    mode = request.args.get('mode', 'any')
+    technologies = request.args.getlist('technologies')
     
     if not skill_names:
         return jsonify({"error": "Au moins une compétence doit être spécifiée"}), 400
@@ -232,46 +250,55 @@ def search_users_by_skills():
     if level and level not in ['débutant', 'intermédiaire', 'avancé']:
         return jsonify({"error": "Le niveau doit être 'débutant', 'intermédiaire' ou 'avancé'"}), 400
     
-    query = db.session.query(User).join(UserSkill).join(Skill)
+    if mode not in ['any', 'all']:
+        return jsonify({"error": "Le mode doit être 'any' ou 'all'"}), 400
     
-    skill_conditions = [Skill.name.in_(skill_names)]
-    query = query.filter(and_(*skill_conditions))
+    skill_ids = [skill_id for (skill_id,) in db.session.query(Skill.id).filter(Skill.name.in_(skill_names)).all()]
     
-    if level:
-        level_order = {'débutant': 1, 'intermédiaire': 2, 'avancé': 3}
-        min_level_value = level_order[level]
-        
-        level_conditions = []
-        for lvl, value in level_order.items():
-            if value >= min_level_value:
-                level_conditions.append(UserSkill.level == lvl)
-        
-        query = query.filter(or_(*level_conditions))
+    # Une compétence inconnue ne peut être couverte par personne
+    if mode == 'all' and len(skill_ids) < len(set(skill_names)):
+        ranked = []
+    else:
+        ranked = search_users_by_skill_ids(skill_ids, level, match_all=(mode == 'all'))
     
-    users = query.distinct().all()
+    if ranked and technologies:
+        with_technologies = {
+            user_id for (user_id,) in db.session.query(User.id).filter(
+                User.id.in_([user_id for user_id, _, _ in ranked]),
+                technology_filter(technologies)
+            ).all()
+        }
+        ranked = [entry for entry in ranked if entry[0] in with_technologies]
+    
+    user_ids = [user_id for user_id, _, _ in ranked]
+    users = {user.id: user for user in User.query.filter(User.id.in_(user_ids)).all()} if user_ids else {}
+    matching = {}
+    if user_ids:
+        matching_user_skills = UserSkill.query.options(joinedload(UserSkill.skill)).filter(
+            UserSkill.user_id.in_(user_ids),
+            UserSkill.skill_id.in_(skill_ids)
+        ).order_by(UserSkill.id).all()
+        for user_skill in matching_user_skills:
+            matching.setdefault(user_skill.user_id, []).append(user_skill.to_dict())
     
     result = []
-    for user in users:
-        user_data = {
+    for user_id, coverage, _ in ranked:
+        # Utilisateur supprimé depuis la dernière reconstruction de l'index
+        user = users.get(user_id)
+        if user is None:
+            continue
+        result.append({
             "user_id": user.id,
             "user_name": f"{user.prenom} {user.nom}",
             "user_email": user.email,
-            "matching_skills": []
-        }
-        
-        matching_user_skills = UserSkill.query.join(Skill).filter(
-            UserSkill.user_id == user.id,
-            Skill.name.in_(skill_names)
-        ).all()
-        
-        for user_skill in matching_user_skills:
-            user_data["matching_skills"].append(user_skill.to_dict())
-        
-        result.append(user_data)
+            "skills_matched": coverage,
+            "matching_skills": matching.get(user_id, [])
+        })
     
     return jsonify({
         "searched_skills": skill_names,
         "minimum_level": level,
+        "mode": mode,
         "users_found": len(result),
         "users": result
     }), 200
@@ -282,29 +309,9 @@ def get_skills_stats():
     """Obtenir des statistiques sur les compétences"""
     current_user_id = get_jwt_identity()
     
-    total_skills = Skill.query.filter_by(is_active=True).count()
-    user_skills_count = UserSkill.query.filter_by(user_id=current_user_id).count()
-    
-    level_stats = {}
-    for level in ['débutant', 'intermédiaire', 'avancé']:
-        count = UserSkill.query.filter_by(user_id=current_user_id, level=level).count()
-        level_stats[level] = count
-    
-    category_stats = db.session.query(
-        Skill.category,
-        db.func.count(UserSkill.id)
-    ).join(UserSkill).filter(
-        UserSkill.user_id == current_user_id
-    ).group_by(Skill.category).all()
-    
-    category_dict = {cat: count for cat, count in category_stats if cat}
-    
-    popular_skills = db.session.query(
-        Skill.name,
-        db.func.count(UserSkill.id).label('user_count')
-    ).join(UserSkill).group_by(Skill.id, Skill.name).order_by(
-        db.func.count(UserSkill.id).desc()
-    ).limit(10).all()
+    user_skills_count, level_stats, category_dict = compute_user_skill_stats(current_user_id)
+    global_stats = get_global_skill_stats()
+    total_skills = global_stats['total_skills']
     
     return jsonify({
         "total_available_skills": total_skills,
@@ -312,24 +319,37 @@ def get_skills_stats():
         "completion_percentage": (user_skills_count / total_skills * 100) if total_skills > 0 else 0,
         "level_distribution": level_stats,
         "category_distribution": category_dict,
-        "most_popular_skills": [
-            {"skill_name": skill, "user_count": count}
-            for skill, count in popular_skills
-        ]
+        "most_popular_skills": global_stats['popular_skills']
     }), 200
 
 @skills_bp.route('/bulk-add', methods=['POST'])
 @jwt_required()
 def bulk_add_skills():
-    """Ajouter plusieurs compétences en une fois"""
+    """Ajouter plusieurs compétences en une fois
+    
+    Les doublons sont détectés sur les compétences déjà chargées de
+    l'utilisateur, puis toutes les lignes valides sont insérées en une requête.
+    """
     current_user_id = get_jwt_identity()
     data = request.json
     
     if not data or not 'skills' in data or not isinstance(data['skills'], list):
         return jsonify({"error": "Une liste de compétences est requise"}), 400
     
-    added_skills = []
+    existing_skill_ids = {
+        skill_id for (skill_id,) in db.session.query(UserSkill.skill_id).filter_by(user_id=current_user_id).all()
+    }
+    requested_ids = [
+        skill_data['skill_id'] for skill_data in data['skills']
+        if isinstance(skill_data, dict) and isinstance(skill_data.get('skill_id'), int)
+    ]
+    known_skill_ids = {
+        skill_id for (skill_id,) in db.session.query(Skill.id).filter(Skill.id.in_(requested_ids)).all()
+    } if requested_ids else set()
+    
+    rows = []
     errors = []
+    now = datetime.utcnow()
     
     for skill_data in data['skills']:
         try:
@@ -337,40 +357,66 @@ def bulk_add_skills():
                 errors.append(f"ID de compétence manquant pour une entrée")
                 continue
             
-            existing = UserSkill.query.filter_by(
-                user_id=current_user_id,
-                skill_id=skill_data['skill_id']
-            ).first()
+            skill_id = skill_data['skill_id']
+            if skill_id in existing_skill_ids:
+                errors.append(f"Compétence avec l'ID {skill_id} déjà présente")
+                continue
             
-            if existing:
-                errors.append(f"Compétence avec l'ID {skill_data['skill_id']} déjà présente")
+            if skill_id not in known_skill_ids:
+                errors.append(f"La compétence {skill_id} n'existe pas")
                 continue
             
             level = skill_data.get('level', 'débutant')
             if level not in ['débutant', 'intermédiaire', 'avancé']:
-                errors.append(f"Niveau invalide pour la compétence {skill_data['skill_id']}")
+                errors.append(f"Niveau invalide pour la compétence {skill_id}")
                 continue
             
-            user_skill = UserSkill(
-                user_id=current_user_id,
-                skill_id=skill_data['skill_id'],
-                level=level,
-                experience_years=skill_data.get('experience_years'),
-                self_assessment=skill_data.get('self_assessment'),
-                notes=skill_data.get('notes')
-            )
+            self_assessment = skill_data.get('self_assessment')
+            if self_assessment is not None and (not isinstance(self_assessment, int) or not (1 <= self_assessment <= 10)):
+                errors.append(f"Auto-évaluation invalide pour la compétence {skill_id}")
+                continue
             
-            db.session.add(user_skill)
-            added_skills.append(skill_data['skill_id'])
+            existing_skill_ids.add(skill_id)
+            rows.append({
+                'user_id': current_user_id,
+                'skill_id': skill_id,
+                'level': level,
+                'experience_years': skill_data.get('experience_years'),
+                'self_assessment': self_assessment,
+                'acquired_date': now,
+                'last_updated': now,
+                'notes': skill_data.get('notes')
+            })
             
         except Exception as e:
-            errors.append(f"Erreur pour la compétence {skill_data.get('skill_id', 'inconnue')}: {str(e)}")
+            errors.append(f"Erreur pour la compétence {skill_data.get('skill_id', 'inconnue') if isinstance(skill_data, dict) else 'inconnue'}: {str(e)}")
     
-    try:
-        db.session.commit()
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"error": f"Erreur lors de l'enregistrement: {str(e)}"}), 500
+    added_skills = []
+    if rows:
+        table = UserSkill.__table__
+        # Un ajout concurrent de la même compétence est ignoré plutôt que
+        # d'annuler tout le lot
+        statement = pg_insert(table).values(rows).on_conflict_do_nothing(
+            index_elements=[table.c.user_id, table.c.skill_id]
+        ).returning(table.c.skill_id)
+        try:
+            inserted = {skill_id for (skill_id,) in db.session.execute(statement)}
+            added_skills = [row['skill_id'] for row in rows if row['skill_id'] in inserted]
+            for row in rows:
+                if row['skill_id'] not in inserted:
+                    errors.append(f"Compétence avec l'ID {row['skill_id']} déjà présente")
+            
+            # Insertion hors ORM : index de recherche et documents CV prévenus explicitement
+            record_user_skills(db.session, {
+                (current_user_id, row['skill_id']): (row['level'], row['self_assessment'])
+                for row in rows if row['skill_id'] in inserted
+            })
+            if added_skills:
+                invalidate_cv_documents(db.session, user_ids=[current_user_id])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({"error": f"Erreur lors de l'enregistrement: {str(e)}"}), 500
     
     return jsonify({
         "message": f"{len(added_skills)} compétences ajoutées avec succès",
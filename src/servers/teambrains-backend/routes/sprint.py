@@ -1,9 +1,38 @@
+from datetime import datetime
 from flask import Blueprint, request, jsonify
-from models import db, Project, Task
+from sqlalchemy import update
+from models import db, Project, Task, Sprint, SprintSnapshot
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from services.sprint_stats import get_sprint_stats as load_sprint_stats
+from services.sprints import resolve_sprint_id
+from services.cache_versions import schedule_version_bump, task_scope
+from services.cv_documents import invalidate_cv_documents
 
 sprint_bp = Blueprint('sprint', __name__, url_prefix='/sprint')
 
+
+def update_project_tasks(project_id, task_ids, values):
+    """Modifier en une requête les tâches du projet parmi task_ids
+
+    UPDATE ... WHERE id IN (...) AND project_id = ... RETURNING : seules les
+    lignes réellement modifiées sont retournées. L'écriture ne passe pas par
+    le flush : version des tâches du projet (après le commit) et CV
+    concernés sont donc invalidés ici.
+    """
+    if not task_ids:
+        return []
+    tasks = db.session.scalars(
+        update(Task).where(Task.id.in_(task_ids), Task.project_id == project_id).values(**values).returning(Task)
+    ).all()
+    if tasks:
+        schedule_version_bump(db.session, {task_scope(project_id)})
+        invalidate_cv_documents(
+            db.session,
+            user_ids={task.assignee_id for task in tasks if task.assignee_id},
+            creator_project_ids=[project_id]
+        )
+    return tasks
+
 @sprint_bp.route('/<int:project_id>/list', methods=['GET'])
 @jwt_required()
 def get_available_sprints(project_id):
@@ -12,11 +41,72 @@ def get_available_sprints(project_id):
     if not project:
         return jsonify({"error": "Le projet spécifié n'existe pas"}), 404
     
-    tasks = Task.query.filter_by(project_id=project_id).all()
-    available_sprints = set(task.sprint for task in tasks if task.sprint)
+    available_sprints = db.session.query(Sprint.name).filter_by(project_id=project_id).order_by(Sprint.name).all()
+    
+    return jsonify({
+        "sprints": [name for (name,) in available_sprints]
+    }), 200
+
+@sprint_bp.route('/<int:project_id>/sprints', methods=['GET'])
+@jwt_required()
+def list_sprints(project_id):
+    project = Project.query.get(project_id)
+    
+    if not project:
+        return jsonify({"error": "Le projet spécifié n'existe pas"}), 404
+    
+    sprints = Sprint.query.filter_by(project_id=project_id).order_by(Sprint.start_date, Sprint.id).all()
+    
+    return jsonify({
+        "sprints": [sprint.to_dict() for sprint in sprints]
+    }), 200
+
+@sprint_bp.route('/<int:project_id>/sprints/<int:sprint_id>/burndown', methods=['GET'])
+@jwt_required()
+def get_sprint_burndown(project_id, sprint_id):
+    sprint = Sprint.query.filter_by(id=sprint_id, project_id=project_id).first()
+    
+    if not sprint:
+        return jsonify({"error": "Le sprint spécifié n'existe pas"}), 404
+    
+    # Série pré-calculée par la commande nocturne `flask snapshot-sprints`
+    snapshots = SprintSnapshot.query.filter_by(sprint_id=sprint_id).order_by(SprintSnapshot.snapshot_date).all()
     
     return jsonify({
-        "sprints": list(available_sprints)
+        "sprint": sprint.to_dict(),
+        "snapshots": [snapshot.to_dict() for snapshot in snapshots]
+    }), 200
+
+@sprint_bp.route('/<int:project_id>/velocity', methods=['GET'])
+@jwt_required()
+def get_velocity(project_id):
+    project = Project.query.get(project_id)
+    
+    if not project:
+        return jsonify({"error": "Le projet spécifié n'existe pas"}), 404
+    
+    # Dernière photo de chaque sprint du projet (DISTINCT ON)
+    latest = db.session.query(SprintSnapshot).join(Sprint, Sprint.id == SprintSnapshot.sprint_id).filter(
+        Sprint.project_id == project_id
+    ).distinct(SprintSnapshot.sprint_id).order_by(
+        SprintSnapshot.sprint_id, SprintSnapshot.snapshot_date.desc()
+    ).subquery()
+    rows = db.session.query(
+        Sprint.id, Sprint.name, Sprint.start_date, Sprint.end_date,
+        latest.c.snapshot_date, latest.c.total_tasks, latest.c.completed_tasks, latest.c.completed_work
+    ).join(latest, latest.c.sprint_id == Sprint.id).order_by(Sprint.start_date, Sprint.id).all()
+    
+    return jsonify({
+        "velocity": [{
+            "sprint_id": row.id,
+            "name": row.name,
+            "start_date": row.start_date.isoformat() if row.start_date else None,
+            "end_date": row.end_date.isoformat() if row.end_date else None,
+            "date": row.snapshot_date.isoformat(),
+            "total_tasks": row.total_tasks,
+            "completed_tasks": row.completed_tasks,
+            "completed_work": row.completed_work
+        } for row in rows]
     }), 200
 
 @sprint_bp.route('/<int:project_id>/filter', methods=['GET'])
@@ -28,11 +118,14 @@ def filter_tasks(project_id):
         return jsonify({"error": "Le projet spécifié n'existe pas"}), 404
     
     sprint = request.args.get('sprint')
+    sprint_id = request.args.get('sprint_id', type=int)
     priority = request.args.get('priority')
     
     query = Task.query.filter_by(project_id=project_id)
     
-    if sprint:
+    if sprint_id:
+        query = query.filter_by(sprint_id=sprint_id)
+    elif sprint:
         query = query.filter_by(sprint=sprint)
     
     if priority:
@@ -52,50 +145,9 @@ def get_sprint_stats(project_id):
     if not project:
         return jsonify({"error": "Le projet spécifié n'existe pas"}), 404
     
-    tasks = Task.query.filter_by(project_id=project_id).all()
-    
-    sprint_stats = {}
-    for task in tasks:
-        if task.sprint:
-            if task.sprint not in sprint_stats:
-                sprint_stats[task.sprint] = {
-                    "total": 0,
-                    "completed": 0,
-                    "completion_percentage": 0
-                }
-            
-            sprint_stats[task.sprint]["total"] += 1
-            if task.percent_completion == 100:
-                sprint_stats[task.sprint]["completed"] += 1
-    
-    for sprint in sprint_stats:
-        if sprint_stats[sprint]["total"] > 0:
-            sprint_stats[sprint]["completion_percentage"] = (
-                sprint_stats[sprint]["completed"] / sprint_stats[sprint]["total"]) * 100
-    
-    priority_stats = {
-        "haute": {"total": 0, "completed": 0},
-        "moyenne": {"total": 0, "completed": 0},
-        "basse": {"total": 0, "completed": 0}
-    }
-    
-    for task in tasks:
-        if task.priority in priority_stats:
-            priority_stats[task.priority]["total"] += 1
-            if task.percent_completion == 100:
-                priority_stats[task.priority]["completed"] += 1
-    
-    for priority in priority_stats:
-        if priority_stats[priority]["total"] > 0:
-            priority_stats[priority]["completion_percentage"] = (
-                priority_stats[priority]["completed"] / priority_stats[priority]["total"]) * 100
-        else:
-            priority_stats[priority]["completion_percentage"] = 0
-    
-    return jsonify({
-        "sprint_stats": sprint_stats,
-        "priority_stats": priority_stats
-    }), 200
+    # Une seule requête GROUPING SETS, mise en cache par projet
+    # (voir services/sprint_stats.py)
+    return jsonify(load_sprint_stats(project_id)), 200
 
 @sprint_bp.route('/<int:project_id>/create_sprint', methods=['POST'])
 @jwt_required()
@@ -113,18 +165,27 @@ def create_sprint(project_id):
     sprint_name = data['sprint_name']
     task_ids = data.get('task_ids', [])
     
-    if task_ids:
-        tasks = Task.query.filter(Task.id.in_(task_ids)).all()
-        
-        for task in tasks:
-            if task.project_id == project_id:
-                task.sprint = sprint_name
-        
-        db.session.commit()
+    try:
+        start_date = datetime.fromisoformat(data['start_date']) if data.get('start_date') else None
+        end_date = datetime.fromisoformat(data['end_date']) if data.get('end_date') else None
+    except ValueError:
+        return jsonify({"error": "Format de date invalide"}), 400
+    
+    sprint = Sprint.query.get(resolve_sprint_id(db.session.connection(), project_id, sprint_name))
+    if start_date:
+        sprint.start_date = start_date
+    if end_date:
+        sprint.end_date = end_date
+    
+    tasks = update_project_tasks(project_id, task_ids, {'sprint': sprint_name, 'sprint_id': sprint.id})
+    sprint_data = sprint.to_dict()
+    
+    db.session.commit()
     
     return jsonify({
         "message": f"Sprint '{sprint_name}' créé avec succès",
-        "tasks_assigned": len(task_ids)
+        "sprint": sprint_data,
+        "tasks_assigned": len(tasks)
     }), 201
 
 @sprint_bp.route('/<int:task_id>/set_priority', methods=['PUT'])
@@ -189,23 +250,25 @@ def bulk_update_tasks(project_id):
     if not project:
         return jsonify({"error": "Le projet spécifié n'existe pas"}), 404
     
-    task_ids = data['task_ids']
-    tasks = Task.query.filter(Task.id.in_(task_ids), Task.project_id == project_id).all()
+    values = {}
     
-    updated_count = 0
+    if 'priority' in data:
+        if data['priority'] not in ['haute', 'moyenne', 'basse']:
+            return jsonify({"error": "La priorité doit être 'haute', 'moyenne' ou 'basse'"}), 400
+        values['priority'] = data['priority']
     
-    for task in tasks:
-        if 'priority' in data and data['priority'] in ['haute', 'moyenne', 'basse']:
-            task.priority = data['priority']
-            updated_count += 1
-        
-        if 'sprint' in data:
-            task.sprint = data['sprint']
-            updated_count += 1
+    if 'sprint' in data:
+        # Nom et référence du sprint sont modifiés ensemble
+        values['sprint'] = data['sprint']
+        values['sprint_id'] = resolve_sprint_id(db.session.connection(), project_id, data['sprint']) if data['sprint'] else None
+    
+    tasks = update_project_tasks(project_id, data['task_ids'], values)
+    # Sérialisé avant le commit, qui expire les objets retournés
+    tasks_data = [task.to_dict() for task in tasks]
     
     db.session.commit()
     
     return jsonify({
-        "message": f"{updated_count} tâches mises à jour avec succès",
-        "tasks": [task.to_dict() for task in tasks]
+        "message": f"{len(tasks_data)} tâches mises à jour avec succès",
+        "tasks": tasks_data
     }), 200
\ No newline at end of file
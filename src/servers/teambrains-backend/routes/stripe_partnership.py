@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_current_user
 from models import db, User, Subscription, School, Invoice
 import stripe
 import os
@@ -16,8 +16,7 @@ stripe_partnership_bp = Blueprint('stripe_partnership', __name__, url_prefix='/a
 def create_school_subscription():
     """Créer un abonnement école simplifié - 5€ par étudiant/mois - CORRIGÉ"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
         
         if not user or user.role != 'school_admin':
             return jsonify({'error': 'Accès non autorisé - Admin école requis'}), 403
@@ -427,8 +426,7 @@ def handle_partnership_subscription_deleted(stripe_subscription):
 def force_sync_all_partnership_subscriptions():
     """Force la synchronisation de TOUS les abonnements pour une école"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
         
         if not user or user.role != 'school_admin' or not user.school_id:
             return jsonify({'error': 'Accès non autorisé'}), 403
@@ -528,8 +526,7 @@ def force_sync_all_partnership_subscriptions():
 def update_partnership_student_count():
     """Mettre à jour le nombre d'étudiants pour l'abonnement partenariat"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
         
         if not user or user.role != 'school_admin' or not user.school_id:
             return jsonify({'error': 'Accès non autorisé'}), 403
@@ -617,8 +614,7 @@ def update_partnership_student_count():
 def get_partnership_subscription_status():
     """Obtenir le statut de l'abonnement partenariat"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
         
         if not user or user.role != 'school_admin' or not user.school_id:
             return jsonify({'error': 'Accès non autorisé'}), 403
@@ -700,8 +696,7 @@ def setup_billing_portal():
 def create_billing_portal():
     """Créer une session de portail de facturation Stripe"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = get_current_user()
         
         if not user or not user.school:
             return jsonify({'error': 'Utilisateur ou école non trouvé'}), 404
@@ -742,8 +737,7 @@ def create_billing_portal():
 def manual_sync_partnership_subscription():
     """Synchronisation manuelle de l'abonnement école depuis Stripe"""
     try:
-        current_user_id = get_jwt_identity()
-        admin_user = User.query.get(current_user_id)
+        admin_user = get_current_user()
         
         if not admin_user or admin_user.role != 'school_admin' or not admin_user.school_id:
             return jsonify({'error': 'Accès non autorisé'}), 403
@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
 from models import db, Task, SubTask, SubTaskValidation, User, Project, TaskStudent
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import selectinload
+from services.events import publish_project_event
+from services.project_access import require_project_access
 from datetime import datetime
 
 subtasks_bp = Blueprint('subtasks', __name__, url_prefix='/subtasks')
@@ -18,12 +21,9 @@ def create_subtask(task_id):
     if not task:
         return jsonify({"error": "La tâche spécifiée n'existe pas"}), 404
     
-    project = Project.query.get(task.project_id)
-    is_member = current_user_id in [member.id for member in project.members]
-    is_creator = project.creator_id == current_user_id
-    
-    if not (is_member or is_creator):
-        return jsonify({"error": "Vous n'êtes pas autorisé à créer des sous-tâches pour ce projet"}), 403
+    denied = require_project_access(task.project_id, current_user_id, "Vous n'êtes pas autorisé à créer des sous-tâches pour ce projet")
+    if denied:
+        return denied
     
     subtask = SubTask(
         title=data['title'],
@@ -102,12 +102,9 @@ def validate_subtask(subtask_id):
         return jsonify({"error": "La sous-tâche spécifiée n'existe pas"}), 404
     
     task = Task.query.get(subtask.task_id)
-    project = Project.query.get(task.project_id)
-    is_member = current_user_id in [member.id for member in project.members]
-    is_creator = project.creator_id == current_user_id
-    
-    if not (is_member or is_creator):
-        return jsonify({"error": "Vous n'êtes pas autorisé à valider cette sous-tâche"}), 403
+    denied = require_project_access(task.project_id, current_user_id, "Vous n'êtes pas autorisé à valider cette sous-tâche")
+    if denied:
+        return denied
     
     validation = SubTaskValidation(
         subtask_id=subtask_id,
@@ -125,6 +122,8 @@ def validate_subtask(subtask_id):
     db.session.add(validation)
     db.session.commit()
     
+    publish_project_event(task.project_id, 'subtask-validated', subtask.to_dict())
+    
     return jsonify({
         "message": f"Sous-tâche {status}",
         "subtask": subtask.to_dict(),
@@ -169,12 +168,9 @@ def assign_students_to_task(task_id):
     if not task:
         return jsonify({"error": "La tâche spécifiée n'existe pas"}), 404
     
-    project = Project.query.get(task.project_id)
-    is_member = current_user_id in [member.id for member in project.members]
-    is_creator = project.creator_id == current_user_id
-    
-    if not (is_member or is_creator):
-        return jsonify({"error": "Vous n'êtes pas autorisé à assigner des étudiants à cette tâche"}), 403
+    denied = require_project_access(task.project_id, current_user_id, "Vous n'êtes pas autorisé à assigner des étudiants à cette tâche")
+    if denied:
+        return denied
     
     student_ids = data['student_ids']
     students = User.query.filter(User.id.in_(student_ids)).all()
@@ -214,13 +210,17 @@ def get_project_students_tasks(project_id):
     if not project:
         return jsonify({"error": "Le projet spécifié n'existe pas"}), 404
     
-    is_member = current_user_id in [member.id for member in project.members]
-    is_creator = project.creator_id == current_user_id
+    denied = require_project_access(project_id, current_user_id, "Vous n'êtes pas autorisé à voir les informations de ce projet")
+    if denied:
+        return denied
     
-    if not (is_member or is_creator):
-        return jsonify({"error": "Vous n'êtes pas autorisé à voir les informations de ce projet"}), 403
-    
-    tasks = Task.query.filter_by(project_id=project_id).all()
+    # Tâches, étudiants et sous-tâches en requêtes groupées (selectinload)
+    tasks = Task.query.filter_by(project_id=project_id).options(
+        selectinload(Task.task_students).selectinload(TaskStudent.student),
+        selectinload(Task.subtasks).selectinload(SubTask.assigned_student),
+        # Dernière validation via le pointeur dénormalisé de la sous-tâche
+        selectinload(Task.subtasks).selectinload(SubTask.last_validation).selectinload(SubTaskValidation.validator)
+    ).order_by(Task.id).all()
     
     result = {
         "project_id": project_id,
@@ -240,13 +240,9 @@ def get_project_students_tasks(project_id):
             "subtasks": []
         }
         
-        # Récupérer les sous-tâches de la tâche
-        subtasks = SubTask.query.filter_by(task_id=task.id).all()
-        for subtask in subtasks:
+        for subtask in task.subtasks:
             subtask_data = subtask.to_dict()
-            last_validation = SubTaskValidation.query.filter_by(
-                subtask_id=subtask.id
-            ).order_by(SubTaskValidation.timestamp.desc()).first()
+            last_validation = subtask.last_validation
             
             if last_validation:
                 subtask_data['last_validation'] = last_validation.to_dict()
@@ -299,12 +295,9 @@ def update_task_student_assignment(assignment_id):
     
     # Vérifier l'autorisation
     task = assignment.task
-    project = Project.query.get(task.project_id)
-    is_member = current_user_id in [member.id for member in project.members]
-    is_creator = project.creator_id == current_user_id
-    
-    if not (is_member or is_creator):
-        return jsonify({"error": "Vous n'êtes pas autorisé à modifier cet assignement"}), 403
+    denied = require_project_access(task.project_id, current_user_id, "Vous n'êtes pas autorisé à modifier cet assignement")
+    if denied:
+        return denied
     
     if 'role' in data:
         assignment.role = data['role']
@@ -328,12 +321,9 @@ def delete_task_student_assignment(assignment_id):
     
     # Vérifier l'autorisation
     task = assignment.task
-    project = Project.query.get(task.project_id)
-    is_member = current_user_id in [member.id for member in project.members]
-    is_creator = project.creator_id == current_user_id
-    
-    if not (is_member or is_creator):
-        return jsonify({"error": "Vous n'êtes pas autorisé à supprimer cet assignement"}), 403
+    denied = require_project_access(task.project_id, current_user_id, "Vous n'êtes pas autorisé à supprimer cet assignement")
+    if denied:
+        return denied
     
     db.session.delete(assignment)
     db.session.commit()
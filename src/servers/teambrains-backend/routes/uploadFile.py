@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify, current_app, send_from_directory, url_for
 from models import db, Project, FileDocument
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from services.events import publish_project_event
+from services.project_access import require_project_access
 from werkzeug.utils import secure_filename
 import os
 import uuid
@@ -65,6 +67,9 @@ def upload_file():
         project = Project.query.get(project_id)
         if not project:
             return jsonify({"error": "Le projet spécifié n'existe pas"}), 404
+        denied = require_project_access(project.id, current_user_id, "Vous n'êtes pas autorisé à déposer des fichiers dans ce projet")
+        if denied:
+            return denied
     
     secure_name = generate_secure_filename(file.filename)
     
@@ -89,6 +94,9 @@ def upload_file():
     
     download_url = url_for('upload.download_file', file_id=file_record.id, _external=True)
     
+    if project_id:
+        publish_project_event(file_record.project_id, 'file-uploaded', file_record.to_dict())
+    
     return jsonify({
         "message": "Fichier téléchargé avec succès",
         "file": {
@@ -105,11 +113,16 @@ def upload_file():
 @upload_bp.route('/<int:project_id>/files', methods=['GET'])
 @jwt_required()
 def get_project_files(project_id):
+    current_user_id = get_jwt_identity()
     project = Project.query.get(project_id)
     
     if not project:
         return jsonify({"error": "Le projet spécifié n'existe pas"}), 404
     
+    denied = require_project_access(project_id, current_user_id, "Vous n'êtes pas autorisé à voir les fichiers de ce projet")
+    if denied:
+        return denied
+    
     files = FileDocument.query.filter_by(project_id=project_id).all()
     
     return jsonify({
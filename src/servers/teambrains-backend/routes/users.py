@@ -1,17 +1,16 @@
 from flask import Blueprint, jsonify, request
 from models import db, User, Project 
-from flask_jwt_extended import jwt_required, get_jwt_identity
+# Alias : la vue /current_user porte déjà le nom get_current_user
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_current_user as get_jwt_user
 from decorators import role_required
+from extensions import password_hasher
 
 users = Blueprint('users', __name__)
 
 @users.route('/current_user', methods=['GET'])
 @jwt_required()
 def get_current_user():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"msg": "Utilisateur non trouvé"}), 404
+    user = get_jwt_user()
 
     return jsonify({
         "id": user.id,
@@ -22,10 +21,7 @@ def get_current_user():
 @users.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"msg": "Utilisateur non trouvé"}), 404
+    user = get_jwt_user()
 
     return jsonify({
         "prenom": user.prenom,
@@ -33,7 +29,7 @@ def get_profile():
         "role": user.role,
         "email": user.email,
         "typeDeveloppeur": user.typeDeveloppeur,
-        "technologies": user.technologies.split(',') if user.technologies else []
+        "technologies": user.technology_list
     }), 200
 
 @users.route('/profile/<string:user_id>', methods=['GET'])
@@ -51,7 +47,7 @@ def get_user_profile(user_id):
         "nom": user.nom,
         "role": user.role,
         "typeDeveloppeur": user.typeDeveloppeur,
-        "technologies": user.technologies.split(',') if user.technologies else [],
+        "technologies": user.technology_list,
         "etudes": user.etudes,
         "ambitions": user.ambitions,
         "linkedin_url": user.linkedin_url,
@@ -74,17 +70,14 @@ def get_user_profile(user_id):
 @users.route('/profile', methods=['PUT'])
 @jwt_required()
 def update_profile():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"msg": "Utilisateur non trouvé"}), 404
+    user = get_jwt_user()
 
     data = request.get_json()
     user.prenom = data.get("prenom", user.prenom)
     user.nom = data.get("nom", user.nom)
     user.email = data.get("email", user.email)
     user.typeDeveloppeur = data.get("typeDeveloppeur", user.typeDeveloppeur)
-    user.technologies = ','.join(data.get("technologies", user.technologies.split(',')))
+    user.technologies = ','.join(data.get("technologies", user.technology_list))
     
     # Permettre la mise à jour du school_id pour les étudiants
     if 'school_id' in data and user.role == 'student':
@@ -98,7 +91,7 @@ def update_profile():
             "role": user.role,
             "email": user.email,
             "typeDeveloppeur": user.typeDeveloppeur,
-            "technologies": user.technologies.split(','),
+            "technologies": user.technology_list,
             "school_id": user.school_id
         }), 200
     except Exception as e:
@@ -126,9 +119,7 @@ def get_all_users():
 def delete_own_account():
     """Permet à un utilisateur de supprimer son propre compte (RGPD) avec anonymisation"""
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"message": "Utilisateur non trouvé"}), 404
+    user = get_jwt_user()
 
     # Vérifier le mot de passe pour sécuriser l'opération
     data = request.get_json()
@@ -137,9 +128,8 @@ def delete_own_account():
     if not password:
         return jsonify({"message": "Mot de passe requis pour supprimer le compte"}), 400
     
-    # Vérifier le mot de passe (utiliser bcrypt comme dans les autres routes)
-    import bcrypt
-    if not bcrypt.checkpw(password.encode('utf-8'), user.password.encode('utf-8')):
+    # Vérifier le mot de passe via le service de hachage partagé
+    if not password_hasher.verify(user.password, password):
         return jsonify({"message": "Mot de passe incorrect"}), 400
 
     try:
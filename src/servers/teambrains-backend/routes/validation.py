@@ -1,10 +1,18 @@
 from flask import Blueprint, request, jsonify
-from models import db, Task, TaskValidation, User, Project
+from models import db, Task, TaskValidation, SubTask, User, Project
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func, and_, or_, literal, select, tuple_, union_all, update
+from sqlalchemy.orm import selectinload
+from services.events import publish_project_event
+from services.project_access import require_project_access
+from services.user_cache import invalidate_user
 from datetime import datetime
 
 validation_bp = Blueprint('validation', __name__, url_prefix='/validation')
 
+DEFAULT_INBOX_LIMIT = 50
+MAX_INBOX_LIMIT = 200
+
 @validation_bp.route('/task/<int:task_id>', methods=['POST'])
 @jwt_required()
 def validate_task(task_id):
@@ -24,15 +32,9 @@ def validate_task(task_id):
     if not task:
         return jsonify({"error": "La tâche spécifiée n'existe pas"}), 404
     
-    project = Project.query.get(task.project_id)
-    if not project:
-        return jsonify({"error": "Le projet associé à cette tâche n'existe pas"}), 404
-    
-    is_member = current_user_id in [member.id for member in project.members]
-    is_creator = project.creator_id == current_user_id
-    
-    if not (is_member or is_creator):
-        return jsonify({"error": "Vous n'êtes pas autorisé à valider cette tâche"}), 403
+    denied = require_project_access(task.project_id, current_user_id, "Vous n'êtes pas autorisé à valider cette tâche")
+    if denied:
+        return denied
     
     validation = TaskValidation(
         task_id=task_id,
@@ -51,6 +53,8 @@ def validate_task(task_id):
     
     db.session.commit()
     
+    publish_project_event(task.project_id, 'task-updated', task.to_dict())
+    
     return jsonify({
         "message": f"Statut de la tâche mis à jour: {status}",
         "validation": validation.to_dict(),
@@ -67,15 +71,9 @@ def get_validation_history(task_id):
     if not task:
         return jsonify({"error": "La tâche spécifiée n'existe pas"}), 404
     
-    project = Project.query.get(task.project_id)
-    if not project:
-        return jsonify({"error": "Le projet associé à cette tâche n'existe pas"}), 404
-    
-    is_member = current_user_id in [member.id for member in project.members]
-    is_creator = project.creator_id == current_user_id
-    
-    if not (is_member or is_creator):
-        return jsonify({"error": "Vous n'êtes pas autorisé à voir l'historique de cette tâche"}), 403
+    denied = require_project_access(task.project_id, current_user_id, "Vous n'êtes pas autorisé à voir l'historique de cette tâche")
+    if denied:
+        return denied
     
     validations = TaskValidation.query.filter_by(task_id=task_id).order_by(TaskValidation.timestamp.desc()).all()
     
@@ -94,27 +92,26 @@ def get_pending_validations(project_id):
     if not project:
         return jsonify({"error": "Le projet spécifié n'existe pas"}), 404
     
-    is_member = current_user_id in [member.id for member in project.members]
-    is_creator = project.creator_id == current_user_id
-    
-    if not (is_member or is_creator):
-        return jsonify({"error": "Vous n'êtes pas autorisé à voir les validations de ce projet"}), 403
-    
-    from sqlalchemy import func, and_, or_
-    
-    tasks = Task.query.filter_by(project_id=project_id).all()
-    
-    pending_tasks = []
-    for task in tasks:
-        last_validation = TaskValidation.query.filter_by(task_id=task.id).order_by(TaskValidation.timestamp.desc()).first()
-        
-        if (task.percent_completion == 100 and not last_validation) or \
-           (last_validation and last_validation.status == 'rejected') or \
-           (last_validation and last_validation.status == 'pending'):
-            pending_tasks.append({
-                "task": task.to_dict(),
-                "last_validation": last_validation.to_dict() if last_validation else None
-            })
+    denied = require_project_access(project_id, current_user_id, "Vous n'êtes pas autorisé à voir les validations de ce projet")
+    if denied:
+        return denied
+    
+    # Une requête sur l'index (project_id, last_validation_status), puis les
+    # dernières validations et leurs validateurs par lots
+    tasks = Task.query.filter(
+        Task.project_id == project_id,
+        or_(
+            Task.last_validation_status.in_(['rejected', 'pending']),
+            and_(Task.last_validation_status.is_(None), Task.percent_completion == 100)
+        )
+    ).options(
+        selectinload(Task.last_validation).selectinload(TaskValidation.validator)
+    ).order_by(Task.id).all()
+    
+    pending_tasks = [{
+        "task": task.to_dict(),
+        "last_validation": task.last_validation.to_dict() if task.last_validation else None
+    } for task in tasks]
     
     return jsonify({
         "project_id": project_id,
@@ -131,19 +128,26 @@ def get_validation_stats(project_id):
     if not project:
         return jsonify({"error": "Le projet spécifié n'existe pas"}), 404
     
-    is_member = current_user_id in [member.id for member in project.members]
-    is_creator = project.creator_id == current_user_id
+    denied = require_project_access(project_id, current_user_id, "Vous n'êtes pas autorisé à voir les statistiques de ce projet")
+    if denied:
+        return denied
     
-    if not (is_member or is_creator):
-        return jsonify({"error": "Vous n'êtes pas autorisé à voir les statistiques de ce projet"}), 403
-    tasks = Task.query.filter_by(project_id=project_id).all()
+    # Compteurs en une seule agrégation sur les colonnes dénormalisées
+    totals = db.session.query(
+        func.count(Task.id).label('total_tasks'),
+        func.count(Task.id).filter(Task.percent_completion == 100).label('completed_tasks'),
+        func.count(Task.id).filter(Task.last_validation_status == 'validated').label('validated_tasks'),
+        func.count(Task.id).filter(Task.last_validation_status == 'rejected').label('rejected_tasks'),
+        func.count(Task.id).filter(Task.last_validation_status == 'pending').label('pending_tasks'),
+        func.coalesce(func.sum(Task.validation_count), 0).label('total_validations')
+    ).filter(Task.project_id == project_id).one()
     
     stats = {
-        "total_tasks": len(tasks),
-        "completed_tasks": 0,
-        "validated_tasks": 0,
-        "rejected_tasks": 0,
-        "pending_tasks": 0,
+        "total_tasks": totals.total_tasks,
+        "completed_tasks": totals.completed_tasks,
+        "validated_tasks": totals.validated_tasks,
+        "rejected_tasks": totals.rejected_tasks,
+        "pending_tasks": totals.pending_tasks,
         "validation_rate": 0,
         "rejection_rate": 0,
         "average_validations_per_task": 0, 
@@ -154,16 +158,18 @@ def get_validation_stats(project_id):
         }
     }
     
-    total_validations = 0
-    for task in tasks:
-        if task.percent_completion == 100:
-            stats["completed_tasks"] += 1
-        
-        last_validation = TaskValidation.query.filter_by(task_id=task.id).order_by(TaskValidation.timestamp.desc()).first()
+    reviewed_tasks = Task.query.filter(
+        Task.project_id == project_id,
+        Task.last_validation_status.in_(['validated', 'rejected', 'pending'])
+    ).options(
+        selectinload(Task.last_validation).selectinload(TaskValidation.validator)
+    ).order_by(Task.id).all()
+    
+    for task in reviewed_tasks:
+        last_validation = task.last_validation
         
         if last_validation:
             if last_validation.status == 'validated':
-                stats["validated_tasks"] += 1
                 stats["validation_history"]["validated"].append({
                     "task_id": task.id,
                     "task_title": task.title,
@@ -171,7 +177,6 @@ def get_validation_stats(project_id):
                     "validator": f"{last_validation.validator.prenom} {last_validation.validator.nom}" if last_validation.validator else "Inconnu"
                 })
             elif last_validation.status == 'rejected':
-                stats["rejected_tasks"] += 1
                 stats["validation_history"]["rejected"].append({
                     "task_id": task.id,
                     "task_title": task.title,
@@ -180,23 +185,19 @@ def get_validation_stats(project_id):
                     "comment": last_validation.comment
                 })
             elif last_validation.status == 'pending':
-                stats["pending_tasks"] += 1
                 stats["validation_history"]["pending"].append({
                     "task_id": task.id,
                     "task_title": task.title,
                     "validation_date": last_validation.timestamp.isoformat(),
                     "validator": f"{last_validation.validator.prenom} {last_validation.validator.nom}" if last_validation.validator else "Inconnu"
                 })
-        
-        total_task_validations = TaskValidation.query.filter_by(task_id=task.id).count()
-        total_validations += total_task_validations
     
     if stats["completed_tasks"] > 0:
         stats["validation_rate"] = (stats["validated_tasks"] / stats["completed_tasks"]) * 100
         stats["rejection_rate"] = (stats["rejected_tasks"] / stats["completed_tasks"]) * 100
     
-    if len(tasks) > 0:
-        stats["average_validations_per_task"] = total_validations / len(tasks)
+    if totals.total_tasks > 0:
+        stats["average_validations_per_task"] = totals.total_validations / totals.total_tasks
     
     return jsonify({
         "project_id": project_id,
@@ -214,7 +215,7 @@ def get_task_validation_status(task_id):
     if not task:
         return jsonify({"error": "La tâche spécifiée n'existe pas"}), 404
     
-    last_validation = TaskValidation.query.filter_by(task_id=task_id).order_by(TaskValidation.timestamp.desc()).first()
+    last_validation = task.last_validation
     
     validation_status = {
         "task_id": task_id,
@@ -233,4 +234,120 @@ def get_task_validation_status(task_id):
         validation_status["current_status"] = last_validation.status
         validation_status["last_validation"] = last_validation.to_dict()
     
-    return jsonify(validation_status), 200
\ No newline at end of file
+    return jsonify(validation_status), 200
+
+def review_inbox_items(creator_id):
+    """Tâches et sous-tâches à revoir dans les projets créés par creator_id
+    
+    Chaque branche parcourt l'index partiel (..., completed_at, id) WHERE
+    awaiting_review des projets du créateur.
+    """
+    tasks = select(
+        literal('task').label('kind'),
+        Task.id.label('id'),
+        Task.id.label('task_id'),
+        Task.title.label('title'),
+        Task.project_id.label('project_id'),
+        Project.name.label('project_name'),
+        Task.last_validation_status.label('last_validation_status'),
+        Task.completed_at.label('completed_at')
+    ).select_from(Task).join(Project, Project.id == Task.project_id).where(
+        Project.creator_id == creator_id, Task.awaiting_review
+    )
+    subtasks = select(
+        literal('subtask').label('kind'),
+        SubTask.id.label('id'),
+        SubTask.task_id.label('task_id'),
+        SubTask.title.label('title'),
+        Task.project_id.label('project_id'),
+        Project.name.label('project_name'),
+        SubTask.last_validation_status.label('last_validation_status'),
+        SubTask.completed_at.label('completed_at')
+    ).select_from(SubTask).join(Task, Task.id == SubTask.task_id).join(Project, Project.id == Task.project_id).where(
+        Project.creator_id == creator_id, SubTask.awaiting_review
+    )
+    return union_all(tasks, subtasks).subquery()
+
+def review_inbox_counts(creator_id, items=None):
+    """(éléments à revoir, éléments arrivés depuis la dernière consultation)"""
+    items = items if items is not None else review_inbox_items(creator_id)
+    seen_at = db.session.query(User.inbox_seen_at).filter(User.id == creator_id).scalar_subquery()
+    total, unread = db.session.query(
+        func.count(),
+        func.count().filter(or_(seen_at.is_(None), items.c.completed_at > seen_at))
+    ).select_from(items).one()
+    return total, unread
+
+def parse_inbox_cursor(cursor):
+    # Curseur "<completed_at ISO>|<kind>|<id>" du dernier élément reçu
+    completed_at, kind, item_id = cursor.split('|')
+    return datetime.fromisoformat(completed_at), kind, int(item_id)
+
+@validation_bp.route('/inbox', methods=['GET'])
+@jwt_required()
+def get_review_inbox():
+    """Éléments terminés en attente de revue, tous projets créés confondus
+    
+    Du plus récent au plus ancien, pagination par curseur (paramètre
+    `before`, valeur next_cursor de la page précédente).
+    """
+    current_user_id = get_jwt_identity()
+    
+    limit = request.args.get('limit', DEFAULT_INBOX_LIMIT, type=int)
+    limit = max(1, min(limit, MAX_INBOX_LIMIT))
+    
+    items = review_inbox_items(current_user_id)
+    query = db.session.query(items)
+    
+    before = request.args.get('before')
+    if before:
+        try:
+            cursor = parse_inbox_cursor(before)
+        except ValueError:
+            return jsonify({"error": "Curseur invalide"}), 400
+        query = query.filter(tuple_(items.c.completed_at, items.c.kind, items.c.id) < tuple_(*cursor))
+    
+    rows = query.order_by(items.c.completed_at.desc(), items.c.kind.desc(), items.c.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    total, unread = review_inbox_counts(current_user_id, items)
+    
+    return jsonify({
+        "items": [{
+            "kind": row.kind,
+            "id": row.id,
+            "task_id": row.task_id,
+            "title": row.title,
+            "project_id": row.project_id,
+            "project_name": row.project_name,
+            "last_validation_status": row.last_validation_status,
+            "completed_at": row.completed_at.isoformat()
+        } for row in rows],
+        "total": total,
+        "unread": unread,
+        "next_cursor": f"{rows[-1].completed_at.isoformat()}|{rows[-1].kind}|{rows[-1].id}" if has_more else None
+    }), 200
+
+@validation_bp.route('/inbox/count', methods=['GET'])
+@jwt_required()
+def get_review_inbox_count():
+    """Compteurs pour le badge de la barre de navigation"""
+    total, unread = review_inbox_counts(get_jwt_identity())
+    
+    return jsonify({
+        "total": total,
+        "unread": unread
+    }), 200
+
+@validation_bp.route('/inbox/seen', methods=['POST'])
+@jwt_required()
+def mark_review_inbox_seen():
+    current_user_id = get_jwt_identity()
+    
+    db.session.execute(update(User).where(User.id == current_user_id).values(inbox_seen_at=datetime.utcnow()))
+    db.session.commit()
+    # La ligne User en cache (current_user) contient l'ancienne date
+    invalidate_user(current_user_id)
+    
+    return jsonify({"message": "Boîte de réception marquée comme lue"}), 200
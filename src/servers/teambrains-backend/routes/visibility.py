@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
-from models import db, User, Project, CVProject, CVVisibility, UserSkill
+from models import db, User, Project, CVProject, CVVisibility
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from decorators import http_cache
+from routes.cv import cv_document_response, cv_project_entries
 from datetime import datetime
 
 visibility_bp = Blueprint('visibility', __name__, url_prefix='/visibility')
@@ -128,6 +130,7 @@ def toggle_cv_project_visibility(cv_project_id):
     }), 200
 
 @visibility_bp.route('/projects/public', methods=['GET'])
+@http_cache('projects', 'users')
 def get_public_projects():
     """Récupérer tous les projets publics (accessible sans authentification)"""
     page = request.args.get('page', 1, type=int)
@@ -175,62 +178,62 @@ def get_public_projects():
 @visibility_bp.route('/cv/<user_id>/public', methods=['GET'])
 def get_public_cv(user_id):
     """Récupérer le CV public d'un utilisateur (accessible sans authentification)"""
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"error": "Utilisateur non trouvé"}), 404
-    
+    # Réglages lus en base à chaque requête : un CV rendu privé ne doit pas
+    # rester servi le temps de reconstruire le document
     cv_visibility = CVVisibility.query.filter_by(user_id=user_id).first()
     
     if not cv_visibility or not cv_visibility.is_public:
+        if not User.query.get(user_id):
+            return jsonify({"error": "Utilisateur non trouvé"}), 404
         return jsonify({"error": "Ce CV n'est pas public"}), 403
     
-    cv_data = {
-        "user_id": user_id,
-        "visibility_settings": cv_visibility.to_dict()
-    }
-    
-    if cv_visibility.show_personal_info:
-        cv_data["personal_info"] = {
-            "prenom": user.prenom,
-            "nom": user.nom,
-            "role": user.role,
-            "typeDeveloppeur": user.typeDeveloppeur,
-            "etudes": user.etudes,
-            "ambitions": user.ambitions
-        }
-    
-    if cv_visibility.show_contact_info:
-        cv_data["contact_info"] = {
-            "email": user.email,
-            "linkedin_url": user.linkedin_url,
-            "portfolio_url": user.portfolio_url,
-            "github_url": user.github_url
+    def render(document):
+        profile = document['profile']
+        cv_data = {
+            "user_id": user_id,
+            "visibility_settings": cv_visibility.to_dict()
         }
-    
-    if cv_visibility.show_skills:
-        user_skills = UserSkill.query.filter_by(user_id=user_id).all()
-        cv_data["skills"] = [skill.to_dict() for skill in user_skills]
-    
-    if cv_visibility.show_projects:
-        cv_projects = CVProject.query.filter_by(user_id=user_id, is_visible=True).all()
-        projects_list = []
         
-        for cv_project in cv_projects:
-            project_data = cv_project.to_dict()
-            
-            if cv_project.project and cv_project.project.is_public:
-                project_data["project_is_public"] = True
-                project_data["project_status"] = cv_project.project.status
-            else:
+        if cv_visibility.show_personal_info:
+            cv_data["personal_info"] = {
+                "prenom": profile['prenom'],
+                "nom": profile['nom'],
+                "role": profile['role'],
+                "typeDeveloppeur": profile['typeDeveloppeur'],
+                "etudes": profile['etudes'],
+                "ambitions": profile['ambitions']
+            }
+        
+        if cv_visibility.show_contact_info:
+            cv_data["contact_info"] = {
+                "email": profile['email'],
+                "linkedin_url": profile['linkedin_url'],
+                "portfolio_url": profile['portfolio_url'],
+                "github_url": profile['github_url']
+            }
+        
+        if cv_visibility.show_skills:
+            cv_data["skills"] = document['skills']
+        
+        if cv_visibility.show_projects:
+            # Seules les entrées CVProject sont publiées : les projets créés
+            # ajoutés d'office au CV d'un entrepreneur peuvent être privés
+            projects_list = []
+            for entry in cv_project_entries(document):
+                # Les tâches détaillées restent réservées aux vues authentifiées
+                project_data = {key: value for key, value in entry.items() if key != 'tasks'}
+                # Project n'a pas de champ de visibilité : aucun projet n'est
+                # public, son statut n'est donc jamais publié
                 project_data["project_is_public"] = False
+                projects_list.append(project_data)
             
-            projects_list.append(project_data)
+            cv_data["projects"] = projects_list
         
-        cv_data["projects"] = projects_list
+        return {
+            "cv": cv_data
+        }
     
-    return jsonify({
-        "cv": cv_data
-    }), 200
+    return cv_document_response(user_id, render, public=True, stamp=cv_visibility.last_updated.isoformat())
 
 @visibility_bp.route('/stats', methods=['GET'])
 @jwt_required()
@@ -0,0 +1,14 @@
+#!/bin/sh
+# Tâches planifiées du backend (service scheduler, voir infrastructure/compose.yaml)
+
+set -e
+
+# crond ne transmet pas l'environnement du conteneur : chemins complets,
+# la configuration est lue dans /app/.env par l'application
+cat > /etc/crontabs/root <<CRON
+# Photo quotidienne de l'avancement des sprints (burndown, vélocité)
+0 2 * * * cd /app && FLASK_APP=app.py /usr/local/bin/flask snapshot-sprints >> /proc/1/fd/1 2>&1
+CRON
+
+>&2 echo "Planificateur démarré"
+exec crond -f -l 8
@@ -0,0 +1,38 @@
+# services/__init__.py
+# Services partagés entre les routes (traitements hors modèles)
+from .passwords import PasswordHasher, PasswordHasherBusy
+from .cache import TTLCache
+from .user_cache import init_user_loader, load_user, invalidate_user
+from .events import event_broker, publish_project_event
+from .cache_versions import get_versions, bump_versions, schedule_version_bump, task_scope
+from .project_progress import apply_progress_delta, recompute_progress
+from .sprint_stats import get_sprint_stats
+from .sprints import resolve_sprint_id, backfill_sprints, snapshot_sprints
+from .project_access import init_project_access, has_project_access, require_project_access, invalidate_project_access
+from .validations import backfill_validation_summaries, backfill_completion_dates
+from .cv import build_cv_projects, get_cv_projects
+from .cv_documents import build_cv_documents, refresh_cv_documents, get_cv_document, invalidate_cv_documents, rebuild_stale_cv_documents
+from .skill_index import init_skill_index, search_users_by_skill_ids, record_user_skills
+from .technologies import resolve_technology_ids, link_user_technologies, technology_filter, backfill_technologies
+from .skill_catalog import get_skill_catalog, filter_skills
+from .skill_stats import init_skill_stats, compute_user_skill_stats, get_global_skill_stats
+
+
+__all__ = [
+    'PasswordHasher', 'PasswordHasherBusy',
+    'TTLCache',
+    'init_user_loader', 'load_user', 'invalidate_user',
+    'event_broker', 'publish_project_event',
+    'get_versions', 'bump_versions', 'schedule_version_bump', 'task_scope',
+    'apply_progress_delta', 'recompute_progress',
+    'get_sprint_stats',
+    'resolve_sprint_id', 'backfill_sprints', 'snapshot_sprints',
+    'init_project_access', 'has_project_access', 'require_project_access', 'invalidate_project_access',
+    'backfill_validation_summaries', 'backfill_completion_dates',
+    'build_cv_projects', 'get_cv_projects',
+    'build_cv_documents', 'refresh_cv_documents', 'get_cv_document', 'invalidate_cv_documents', 'rebuild_stale_cv_documents',
+    'init_skill_index', 'search_users_by_skill_ids', 'record_user_skills',
+    'resolve_technology_ids', 'link_user_technologies', 'technology_filter', 'backfill_technologies',
+    'get_skill_catalog', 'filter_skills',
+    'init_skill_stats', 'compute_user_skill_stats', 'get_global_skill_stats'
+]
@@ -0,0 +1,127 @@
+# services/cache_versions.py
+import logging
+from datetime import datetime
+
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from models import db, User, Project, School, Skill, CacheVersion, Task, project_members
+
+logger = logging.getLogger(__name__)
+
+# Famille de données invalidée par l'écriture d'un modèle ORM
+MODEL_SCOPES = {
+    Project: 'projects',
+    User: 'users',
+    School: 'schools',
+    Skill: 'skills'
+}
+
+# Tables modifiées par des requêtes Core (insert/delete directs)
+TABLE_SCOPES = {
+    project_members.name: 'projects'
+}
+
+
+def task_scope(project_id):
+    """Famille des tâches d'un projet (statistiques de sprint...)"""
+    return f"tasks:{project_id}"
+
+
+def _task_project_ids(session, task):
+    # Ancien et nouveau projet ; un attribut expiré n'est rechargé que si la
+    # ligne existe encore (pas pour une tâche supprimée)
+    history = sa_inspect(task).attrs.project_id.history
+    project_ids = {project_id for project_id in history.sum() if project_id is not None}
+    if not project_ids and task not in session.deleted:
+        project_ids.add(task.project_id)
+    return project_ids
+
+
+def bump_versions(connection, scopes):
+    """Incrémenter les compteurs en une requête
+
+    Ordre fixe des lignes verrouillées pour éviter les interblocages entre
+    transactions concurrentes. Les écritures de l'application passent par
+    schedule_version_bump : les lignes ne sont verrouillées que le temps
+    d'une transaction courte, après le commit.
+    """
+    if not scopes:
+        return
+    now = datetime.utcnow()
+    table = CacheVersion.__table__
+    statement = pg_insert(table).values([
+        {'name': scope, 'version': 1, 'updated_at': now} for scope in sorted(scopes)
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.name],
+        set_={'version': table.c.version + 1, 'updated_at': statement.excluded.updated_at}
+    )
+    connection.execute(statement)
+
+
+def schedule_version_bump(session, scopes):
+    """Incrémenter les familles après le commit de la session
+
+    Verrouiller le compteur d'une famille dans la transaction de l'écriture
+    sérialiserait tous les écrivains de cette famille jusqu'à leur commit.
+    Entre le commit et l'incrément, un lecteur peut associer les nouvelles
+    données à l'ancienne version : l'incrément qui suit invalide cette entrée.
+    """
+    if scopes:
+        session.info.setdefault('bumped_scopes', set()).update(scopes)
+
+
+def get_versions(scopes):
+    """Versions et dates de modification des familles demandées (une requête)
+
+    Une famille jamais modifiée est en version 0, sans date.
+    """
+    rows = db.session.query(CacheVersion.name, CacheVersion.version, CacheVersion.updated_at).filter(
+        CacheVersion.name.in_(scopes)
+    ).all()
+    found = {row.name: (row.version, row.updated_at) for row in rows}
+    return {scope: found.get(scope, (0, None)) for scope in scopes}
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_flushed_scopes(session, flush_context):
+    scopes = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        scope = MODEL_SCOPES.get(type(obj))
+        if scope is not None:
+            scopes.add(scope)
+        elif isinstance(obj, Task):
+            scopes.update(task_scope(project_id) for project_id in _task_project_ids(session, obj))
+    schedule_version_bump(session, scopes)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bump_statement_scopes(orm_execute_state):
+    # project_members est modifiée par insert()/delete() sans passer par l'ORM
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, 'table', None)
+    scope = TABLE_SCOPES.get(getattr(table, 'name', None))
+    if scope is not None:
+        schedule_version_bump(orm_execute_state.session, {scope})
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_committed_scopes(session):
+    # Transaction dédiée et courte, une seule requête triée : pas d'attente
+    # sur les verrous d'une autre écriture en cours ni d'interblocage
+    scopes = session.info.pop('bumped_scopes', None)
+    if not scopes:
+        return
+    try:
+        with session.get_bind().begin() as connection:
+            bump_versions(connection, scopes)
+    except Exception:
+        # L'écriture est déjà validée : les caches expirent au prochain incrément
+        logger.exception("Incrément des versions de cache impossible : %s", sorted(scopes))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_bumped_scopes(session):
+    session.info.pop('bumped_scopes', None)
@@ -0,0 +1,86 @@
+# services/cv.py
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import joinedload
+from models import db, Project, CVProject, Task, project_members
+
+CREATOR_ROLE = 'Créateur/Entrepreneur'
+
+
+def build_cv_projects(users):
+    """Projets CV de plusieurs utilisateurs, en nombre constant de requêtes
+
+    Entrées CVProject de chaque utilisateur avec ses tâches assignées ; pour
+    un entrepreneur, toutes les tâches des projets qu'il a créés, et ces
+    projets sont ajoutés à son CV s'ils n'y figurent pas déjà.
+    Retourne {user_id: [projet CV, ...]}.
+    """
+    users = list(users)
+    if not users:
+        return {}
+    user_ids = [user.id for user in users]
+    businessman_ids = [user.id for user in users if user.role == 'businessman']
+
+    cv_projects = CVProject.query.options(joinedload(CVProject.project)).filter(
+        CVProject.user_id.in_(user_ids)
+    ).order_by(CVProject.id).all()
+
+    created_projects = Project.query.filter(
+        Project.creator_id.in_(businessman_ids)
+    ).order_by(Project.id).all() if businessman_ids else []
+
+    listed = {(cv_project.user_id, cv_project.project_id) for cv_project in cv_projects}
+    extra_projects = [project for project in created_projects if (project.creator_id, project.id) not in listed]
+
+    team_sizes = {}
+    if extra_projects:
+        team_sizes = dict(db.session.query(project_members.c.project_id, func.count()).filter(
+            project_members.c.project_id.in_([project.id for project in extra_projects])
+        ).group_by(project_members.c.project_id).all())
+
+    # Projets dont toutes les tâches sont montrées (créés par un entrepreneur
+    # du lot) ; pour les autres, seules les tâches assignées
+    full_project_ids = {project.id for project in created_projects}
+    assigned_project_ids = {cv_project.project_id for cv_project in cv_projects} - full_project_ids
+    conditions = []
+    if full_project_ids:
+        conditions.append(Task.project_id.in_(full_project_ids))
+    if assigned_project_ids:
+        conditions.append(and_(Task.project_id.in_(assigned_project_ids), Task.assignee_id.in_(user_ids)))
+    tasks = Task.query.filter(or_(*conditions)).order_by(Task.id).all() if conditions else []
+
+    project_tasks = {}
+    assigned_tasks = {}
+    for task in tasks:
+        project_tasks.setdefault(task.project_id, []).append(task)
+        assigned_tasks.setdefault((task.project_id, task.assignee_id), []).append(task)
+
+    creators = {project.id: project.creator_id for project in created_projects}
+    result = {user_id: [] for user_id in user_ids}
+    for cv_project in cv_projects:
+        project_dict = cv_project.to_dict()
+        if creators.get(cv_project.project_id) == cv_project.user_id:
+            user_tasks = project_tasks.get(cv_project.project_id, [])
+        else:
+            user_tasks = assigned_tasks.get((cv_project.project_id, cv_project.user_id), [])
+        project_dict['tasks'] = [task.to_dict() for task in user_tasks]
+        result[cv_project.user_id].append(project_dict)
+
+    for project in extra_projects:
+        result[project.creator_id].append({
+            'id': f"created_{project.id}",
+            'user_id': project.creator_id,
+            'project_id': project.id,
+            'project_name': project.name,
+            'role': CREATOR_ROLE,
+            'start_date': project.creation_date.isoformat(),
+            'end_date': None,
+            'team_size': team_sizes.get(project.id, 0),
+            'description': project.description,
+            'tasks': [task.to_dict() for task in project_tasks.get(project.id, [])]
+        })
+    return result
+
+
+def get_cv_projects(user):
+    """Projets CV d'un utilisateur (voir build_cv_projects)"""
+    return build_cv_projects([user])[user.id]
@@ -0,0 +1,262 @@
+# services/cv_documents.py
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect as sa_inspect, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, joinedload
+from models import db, User, UserSkill, CVVisibility, CVProject, CVDocument, Project, Task
+from .cv import build_cv_projects
+
+logger = logging.getLogger(__name__)
+
+_documents = CVDocument.__table__
+
+# Champs du profil repris dans le CV : les autres colonnes de User
+# (mot de passe, école...) n'invalident pas le document
+PROFILE_FIELDS = (
+    'prenom', 'nom', 'email', 'role', 'typeDeveloppeur', 'technologies',
+    'etudes', 'ambitions', 'linkedin_url', 'portfolio_url', 'github_url'
+)
+
+# Champs d'un projet affichés dans les CV de ses participants
+PROJECT_FIELDS = ('name', 'description', 'creation_date', 'creator_id')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Utilisateurs dont la reconstruction est en file ou en cours sur ce worker :
+# les lectures d'un document périmé n'en planifient pas une de plus
+_queued_user_ids = set()
+_queued_lock = threading.Lock()
+
+
+def _needs_rebuild():
+    # Document absent ou invalidé depuis sa dernière construction
+    return or_(CVDocument.user_id.is_(None), CVDocument.invalidated_at >= CVDocument.built_at)
+
+
+def build_cv_documents(users):
+    """Documents CV complets (profil, visibilité, compétences, projets) d'un lot
+
+    Nombre constant de requêtes quel que soit le nombre d'utilisateurs.
+    Retourne {user_id: document}.
+    """
+    users = list(users)
+    user_ids = [user.id for user in users]
+    if not user_ids:
+        return {}
+
+    skills = UserSkill.query.options(joinedload(UserSkill.skill)).filter(
+        UserSkill.user_id.in_(user_ids)
+    ).order_by(UserSkill.id).all()
+    visibilities = {
+        visibility.user_id: visibility
+        for visibility in CVVisibility.query.filter(CVVisibility.user_id.in_(user_ids)).all()
+    }
+    projects = build_cv_projects(users)
+
+    documents = {}
+    for user in users:
+        profile = {field: getattr(user, field) for field in PROFILE_FIELDS}
+        profile['technologies'] = user.technology_list
+        visibility = visibilities.get(user.id)
+        documents[user.id] = {
+            'user_id': user.id,
+            'profile': profile,
+            'visibility': visibility.to_dict() if visibility else None,
+            'skills': [],
+            'projects': projects[user.id]
+        }
+    for user_skill in skills:
+        documents[user_skill.user_id]['skills'].append(user_skill.to_dict())
+    return documents
+
+
+def refresh_cv_documents(user_ids):
+    """Reconstruire et enregistrer les documents CV (upsert, une transaction)
+
+    built_at est pris avant la lecture des données : une modification
+    concurrente laisse le document périmé pour la prochaine reconstruction.
+    Retourne le nombre de documents écrits.
+    """
+    started = datetime.utcnow()
+    users = User.query.filter(User.id.in_(list(user_ids))).all()
+    documents = build_cv_documents(users)
+    if not documents:
+        return 0
+
+    statement = pg_insert(_documents).values([
+        {'user_id': user_id, 'document': document, 'version': 1, 'built_at': started}
+        for user_id, document in sorted(documents.items())
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=[_documents.c.user_id],
+        set_={
+            'document': statement.excluded.document,
+            'version': _documents.c.version + 1,
+            'built_at': statement.excluded.built_at
+        }
+    )
+    db.session.execute(statement)
+    db.session.commit()
+    return len(documents)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='cv-documents')
+        return _executor
+
+
+def _refresh_in_background(app, user_ids):
+    with app.app_context():
+        try:
+            # Documents reconstruits entre-temps (commande, autre worker) : une
+            # reconstruction de plus changerait leur version, donc leur ETag
+            stale = select(User.id).outerjoin(CVDocument, CVDocument.user_id == User.id).where(
+                User.id.in_(list(user_ids)), _needs_rebuild()
+            )
+            stale_ids = [user_id for (user_id,) in db.session.execute(stale)]
+            if stale_ids:
+                refresh_cv_documents(stale_ids)
+        except Exception:
+            db.session.rollback()
+            logger.exception("Reconstruction des CV impossible : %s", sorted(user_ids))
+        finally:
+            with _queued_lock:
+                _queued_user_ids.difference_update(user_ids)
+
+
+def schedule_cv_refresh(user_ids):
+    """Reconstruire les documents en arrière-plan (thread du worker)
+
+    Sans contexte d'application (script), rien n'est planifié : la commande
+    `flask rebuild-cvs` rattrape les documents périmés. Un utilisateur déjà
+    en file ou en reconstruction n'est pas planifié à nouveau.
+    """
+    if not user_ids or not has_app_context():
+        return
+    with _queued_lock:
+        user_ids = set(user_ids) - _queued_user_ids
+        _queued_user_ids.update(user_ids)
+    if not user_ids:
+        return
+    app = current_app._get_current_object()
+    _get_executor().submit(_refresh_in_background, app, user_ids)
+
+
+def get_cv_document(user_id):
+    """Document CV d'un utilisateur : (CVDocument, périmé) ou (None, False)
+
+    Un document périmé est servi tel quel pendant sa reconstruction en
+    arrière-plan ; un document absent est construit immédiatement.
+    """
+    row = CVDocument.query.get(user_id)
+    if row is None:
+        if not refresh_cv_documents([user_id]):
+            return None, False
+        row = CVDocument.query.get(user_id)
+        return row, False
+    if row.is_stale:
+        schedule_cv_refresh([user_id])
+    return row, row.is_stale
+
+
+def invalidate_cv_documents(session, user_ids=(), project_ids=(), creator_project_ids=()):
+    """Marquer périmés les documents concernés par une écriture de la session
+
+    user_ids : CV modifiés directement ; project_ids : projets dont le nom ou
+    la description a changé (tous les CV qui les citent) ;
+    creator_project_ids : projets dont les tâches ou l'équipe ont changé (CV
+    de leur créateur). Les documents sont reconstruits après le commit.
+    """
+    conditions = []
+    if user_ids:
+        conditions.append(_documents.c.user_id.in_(list(user_ids)))
+    if project_ids:
+        conditions.append(_documents.c.user_id.in_(
+            select(CVProject.user_id).where(CVProject.project_id.in_(list(project_ids)))
+        ))
+        creator_project_ids = set(creator_project_ids) | set(project_ids)
+    if creator_project_ids:
+        conditions.append(_documents.c.user_id.in_(
+            select(Project.creator_id).where(Project.id.in_(list(creator_project_ids)))
+        ))
+    if not conditions:
+        return
+    result = session.connection().execute(
+        update(_documents).where(or_(*conditions)).values(invalidated_at=datetime.utcnow()).returning(_documents.c.user_id)
+    )
+    session.info.setdefault('invalidated_cv_user_ids', set()).update(user_id for (user_id,) in result)
+
+
+def _changed(obj, fields):
+    state = sa_inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+def _values(session, obj, field):
+    # Anciennes et nouvelles valeurs ; la valeur courante n'est rechargée que
+    # si la ligne existe encore
+    values = {value for value in sa_inspect(obj).attrs[field].history.sum() if value is not None}
+    if obj not in session.deleted:
+        current = getattr(obj, field)
+        if current is not None:
+            values.add(current)
+    return values
+
+
+@event.listens_for(Session, 'after_flush')
+def _invalidate_flushed_cvs(session, flush_context):
+    user_ids = set()
+    project_ids = set()
+    creator_project_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (UserSkill, CVVisibility)):
+            user_ids.update(_values(session, obj, 'user_id'))
+        elif isinstance(obj, CVProject):
+            user_ids.update(_values(session, obj, 'user_id'))
+            # Taille d'équipe des projets affichés dans le CV du créateur
+            creator_project_ids.update(_values(session, obj, 'project_id'))
+        elif isinstance(obj, User):
+            if obj in session.dirty and _changed(obj, PROFILE_FIELDS):
+                user_ids.add(obj.id)
+        elif isinstance(obj, Task):
+            user_ids.update(_values(session, obj, 'assignee_id'))
+            creator_project_ids.update(_values(session, obj, 'project_id'))
+        elif isinstance(obj, Project):
+            if obj in session.dirty and _changed(obj, PROJECT_FIELDS):
+                project_ids.add(obj.id)
+    invalidate_cv_documents(session, user_ids, project_ids, creator_project_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _refresh_committed_cvs(session):
+    schedule_cv_refresh(session.info.pop('invalidated_cv_user_ids', ()))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_invalidated_cvs(session):
+    session.info.pop('invalidated_cv_user_ids', None)
+
+
+def rebuild_stale_cv_documents(batch_size=200):
+    """Reconstruire tous les documents périmés ou manquants, par lots
+
+    Rattrape les reconstructions perdues (redémarrage d'un worker) et sert
+    de remplissage initial. Retourne le nombre de documents écrits.
+    """
+    rebuilt = 0
+    missing = select(User.id).outerjoin(CVDocument, CVDocument.user_id == User.id).where(
+        _needs_rebuild()
+    ).order_by(User.id)
+    user_ids = [user_id for (user_id,) in db.session.execute(missing)]
+    for start in range(0, len(user_ids), batch_size):
+        rebuilt += refresh_cv_documents(user_ids[start:start + batch_size])
+    return rebuilt
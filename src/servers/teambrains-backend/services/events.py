@@ -0,0 +1,140 @@
+# services/events.py
+import json
+import logging
+import queue
+import select
+import threading
+import time
+from collections import defaultdict
+from uuid import uuid4
+
+from sqlalchemy import text
+from models import db
+
+# Canal Postgres partagé par tous les workers
+NOTIFY_CHANNEL = 'project_events'
+# Limite de taille d'un payload NOTIFY (8000 octets par défaut côté Postgres)
+MAX_NOTIFY_PAYLOAD = 7900
+
+
+class ProjectEventBroker:
+    """Diffusion des événements d'un projet vers les flux SSE ouverts
+
+    Chaque worker garde ses abonnés en mémoire (une file par onglet). Avec
+    Postgres, les événements transitent par LISTEN/NOTIFY pour atteindre les
+    abonnés de tous les workers : un thread par worker écoute le canal sur
+    une connexion dédiée. Sinon (SQLite en dev), la diffusion reste locale.
+    """
+
+    def __init__(self, subscriber_queue_size=100):
+        self.subscriber_queue_size = subscriber_queue_size
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self._listener = None
+
+    def subscribe(self, project_id):
+        """Ouvrir une file d'événements pour un projet (appelé en requête)"""
+        engine = db.engine
+        if engine.dialect.name == 'postgresql':
+            self._ensure_listener(engine)
+
+        subscription = queue.Queue(maxsize=self.subscriber_queue_size)
+        with self._lock:
+            self._subscribers[project_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, project_id, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(project_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[project_id]
+
+    def publish(self, project_id, event_type, data):
+        """Publier un événement ; à appeler après le commit de la modification"""
+        event = {
+            'id': uuid4().hex,
+            'project_id': project_id,
+            'type': event_type,
+            'data': data
+        }
+        payload = json.dumps(event, default=str)
+        if len(payload.encode('utf-8')) > MAX_NOTIFY_PAYLOAD:
+            # Trop volumineux pour NOTIFY : le client recharge la ressource
+            event['data'] = {'id': data.get('id'), 'truncated': True}
+            payload = json.dumps(event, default=str)
+
+        engine = db.engine
+        if engine.dialect.name != 'postgresql':
+            self._dispatch(event)
+            return
+
+        try:
+            with engine.begin() as connection:
+                connection.execute(
+                    text('SELECT pg_notify(:channel, :payload)'),
+                    {'channel': NOTIFY_CHANNEL, 'payload': payload}
+                )
+        except Exception as e:
+            # La notification est un bonus : ne jamais faire échouer la requête
+            logging.error(f"Erreur lors de la publication de l'événement {event_type}: {str(e)}")
+
+    def _dispatch(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(event['project_id'], ()))
+        for subscription in subscribers:
+            try:
+                subscription.put_nowait(event)
+            except queue.Full:
+                # Client trop lent : il rattrapera au prochain rechargement
+                pass
+
+    def _ensure_listener(self, engine):
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(
+                target=self._listen_forever,
+                args=(engine,),
+                name='project-events-listener',
+                daemon=True
+            )
+            self._listener.start()
+
+    def _listen_forever(self, engine):
+        while True:
+            try:
+                self._listen(engine)
+            except Exception as e:
+                logging.error(f"Écoute des événements projet interrompue: {str(e)}")
+                time.sleep(1)
+
+    def _listen(self, engine):
+        # Connexion retirée du pool : elle reste ouverte pour LISTEN
+        pooled = engine.raw_connection()
+        pooled.detach()
+        connection = pooled.dbapi_connection
+        try:
+            connection.autocommit = True
+            cursor = connection.cursor()
+            cursor.execute(f'LISTEN {NOTIFY_CHANNEL}')
+            while True:
+                if select.select([connection], [], [], 30) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notification = connection.notifies.pop(0)
+                    try:
+                        self._dispatch(json.loads(notification.payload))
+                    except (ValueError, KeyError):
+                        logging.warning("Événement projet illisible ignoré")
+        finally:
+            connection.close()
+
+
+event_broker = ProjectEventBroker()
+
+
+def publish_project_event(project_id, event_type, data):
+    event_broker.publish(project_id, event_type, data)
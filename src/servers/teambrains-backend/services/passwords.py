@@ -0,0 +1,183 @@
+# services/passwords.py
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+
+import bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """Levée quand la file d'attente du hachage est pleine"""
+
+
+def _hash_password(password, rounds):
+    """Exécuté dans un processus du pool : hachage bcrypt"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check_password(stored_hash, password, rounds=None):
+    """Exécuté dans un processus du pool : vérification et re-hachage éventuel
+
+    Si rounds est fourni et diffère du coût du hash stocké, le mot de passe
+    est re-haché. Retourne (mot_de_passe_valide, nouveau_hash_ou_None).
+    """
+    try:
+        is_valid = bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+    except ValueError:
+        # Hash invalide en base (ex: compte anonymisé "COMPTE_SUPPRIME")
+        return False, None
+
+    if is_valid and rounds is not None and _hash_rounds(stored_hash) != rounds:
+        return True, _hash_password(password, rounds)
+    return is_valid, None
+
+
+def _hash_rounds(stored_hash):
+    """Extraire le facteur de coût d'un hash bcrypt ($2b$12$...)"""
+    try:
+        return int(stored_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """Service de hachage bcrypt exécuté dans un pool de processus borné
+
+    Les hachages sont coûteux en CPU : on les sort du thread de requête pour
+    que les pics de connexion ne bloquent pas les autres appels de l'API.
+    Les requêtes au-delà de la capacité de la file sont refusées
+    (PasswordHasherBusy) plutôt que mises en attente indéfiniment.
+    """
+
+    def __init__(self, app=None):
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._slots = None
+        self._queue_depth = 0
+        self._rejected = 0
+        self._latencies = deque(maxlen=1000)
+        self.rounds = 12
+        self.workers = 2
+        self.queue_size = 32
+        self.admission_timeout = 2.0
+        self.hash_timeout = 10.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.rounds = app.config.setdefault('BCRYPT_LOG_ROUNDS', 12)
+        self.workers = app.config.setdefault('PASSWORD_HASH_WORKERS', 2)
+        self.queue_size = app.config.setdefault('PASSWORD_HASH_QUEUE_SIZE', 32)
+        self.admission_timeout = app.config.setdefault('PASSWORD_HASH_ADMISSION_TIMEOUT', 2.0)
+        self.hash_timeout = app.config.setdefault('PASSWORD_HASH_TIMEOUT', 10.0)
+        self._slots = threading.BoundedSemaphore(self.queue_size)
+        app.extensions['password_hasher'] = self
+
+    def _get_executor(self):
+        # Création paresseuse : le pool ne doit pas être créé avant le fork
+        # des workers du serveur WSGI. On garde le contexte 'fork' : 'spawn'
+        # ré-importerait app.py (connexion base, données de test) dans chaque
+        # processus du pool.
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('fork')
+                )
+            return self._executor
+
+    def _reset_executor(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _submit(self, fn, *args):
+        if self.workers <= 0:
+            return self._run_inline(fn, *args)
+
+        if not self._slots.acquire(timeout=self.admission_timeout):
+            with self._metrics_lock:
+                self._rejected += 1
+            raise PasswordHasherBusy("File d'attente du hachage des mots de passe saturée")
+
+        with self._metrics_lock:
+            self._queue_depth += 1
+        start = time.perf_counter()
+        try:
+            try:
+                return self._get_executor().submit(fn, *args).result(timeout=self.hash_timeout)
+            except BrokenProcessPool:
+                # Un processus du pool est mort : on le recrée au prochain appel
+                self._reset_executor()
+                return fn(*args)
+            except FutureTimeoutError:
+                raise PasswordHasherBusy("Délai dépassé pour le hachage du mot de passe")
+        finally:
+            with self._metrics_lock:
+                self._queue_depth -= 1
+                self._latencies.append(time.perf_counter() - start)
+            self._slots.release()
+
+    def _run_inline(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            with self._metrics_lock:
+                self._latencies.append(time.perf_counter() - start)
+
+    def hash(self, password):
+        """Hacher un mot de passe avec le facteur de coût configuré"""
+        return self._submit(_hash_password, password, self.rounds)
+
+    def verify(self, stored_hash, password):
+        """Vérifier un mot de passe sans re-hachage"""
+        is_valid, _ = self._submit(_check_password, stored_hash, password)
+        return is_valid
+
+    def verify_and_update(self, user, password):
+        """Vérifier le mot de passe d'un utilisateur
+
+        Si le facteur de coût a changé depuis le hachage stocké, le nouveau
+        hash est affecté à user.password (l'appelant doit faire le commit).
+        """
+        if not user.password:
+            return False
+        is_valid, new_hash = self._submit(_check_password, user.password, password, self.rounds)
+        if is_valid and new_hash:
+            user.password = new_hash
+        return is_valid
+
+    def metrics(self):
+        """Profondeur de file et latences (en millisecondes) du hachage"""
+        with self._metrics_lock:
+            latencies = sorted(self._latencies)
+            queue_depth = self._queue_depth
+            rejected = self._rejected
+
+        def percentile(p):
+            if not latencies:
+                return None
+            index = min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))
+            return round(latencies[index] * 1000, 2)
+
+        return {
+            'rounds': self.rounds,
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+            'queue_depth': queue_depth,
+            'rejected': rejected,
+            'samples': len(latencies),
+            'latency_ms': {
+                'avg': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else None,
+                'p50': percentile(0.50),
+                'p95': percentile(0.95),
+                'p99': percentile(0.99),
+                'max': round(latencies[-1] * 1000, 2) if latencies else None
+            }
+        }
@@ -0,0 +1,47 @@
+# services/project_access.py
+from flask import jsonify
+from sqlalchemy import exists, or_
+from models import db, Project, project_members
+from .cache import TTLCache
+
+# Accès accordés (projet, utilisateur), par worker. Seuls les accès accordés
+# sont mémorisés : un nouveau membre n'attend jamais l'expiration. Un départ
+# n'est invalidé que sur le worker qui l'a traité, la durée de vie courte
+# (PROJECT_ACCESS_CACHE_TTL) borne la fenêtre sur les autres.
+_granted = TTLCache(maxsize=8192, ttl=30)
+
+
+def has_project_access(project_id, user_id):
+    """Vrai si l'utilisateur est membre ou créateur du projet
+
+    Une requête EXISTS sur la clé primaire de project_members et celle de
+    projects, sans charger le projet ni la liste de ses membres.
+    """
+    key = (int(project_id), user_id)
+    if _granted.get(key):
+        return True
+
+    is_member = exists().where(project_members.c.project_id == key[0], project_members.c.user_id == user_id)
+    is_creator = exists().where(Project.id == key[0], Project.creator_id == user_id)
+    allowed = db.session.query(or_(is_member, is_creator)).scalar()
+    if allowed:
+        _granted.set(key, True)
+    return allowed
+
+
+def require_project_access(project_id, user_id, error="Vous n'êtes pas autorisé à accéder à ce projet"):
+    """Réponse 403 si l'utilisateur n'a pas accès au projet, sinon None"""
+    if has_project_access(project_id, user_id):
+        return None
+    return jsonify({"error": error}), 403
+
+
+def invalidate_project_access(project_id, user_id):
+    _granted.pop((int(project_id), user_id))
+
+
+def init_project_access(app):
+    _granted.configure(
+        maxsize=app.config.setdefault('PROJECT_ACCESS_CACHE_SIZE', 8192),
+        ttl=app.config.setdefault('PROJECT_ACCESS_CACHE_TTL', 30)
+    )
@@ -0,0 +1,119 @@
+# services/project_progress.py
+from sqlalchemy import Numeric, case, cast, event, func, inspect as sa_inspect, select, update
+from sqlalchemy.orm import Session
+from models import Project, Task
+
+_projects = Project.__table__
+_tasks = Task.__table__
+
+
+def _progress_expression(total, count):
+    # Moyenne arrondie des pourcentages, 0 pour un projet sans tâche
+    return case((count > 0, func.round(cast(total, Numeric) / count)), else_=0)
+
+
+def apply_progress_delta(connection, project_id, sum_delta, count_delta):
+    """Répercuter sur le projet la variation de ses tâches (UPDATE atomique)
+
+    Le calcul se fait à partir des valeurs en base : deux transactions
+    concurrentes sur le même projet ne perdent pas de mise à jour.
+    """
+    if not sum_delta and not count_delta:
+        return
+    new_sum = _projects.c.progress_sum + sum_delta
+    new_count = _projects.c.task_count + count_delta
+    connection.execute(
+        update(_projects).where(_projects.c.id == project_id).values(
+            progress_sum=new_sum,
+            task_count=new_count,
+            progress=_progress_expression(new_sum, new_count)
+        )
+    )
+
+
+def recompute_progress(connection, project_ids=None):
+    """Recalculer somme, nombre et progression depuis les tâches (ensembliste)
+
+    Sans project_ids, tous les projets sont recalculés. Retourne le nombre
+    de projets mis à jour.
+    """
+    total = select(func.coalesce(func.sum(_tasks.c.percent_completion), 0)).where(
+        _tasks.c.project_id == _projects.c.id
+    ).scalar_subquery()
+    count = select(func.count(_tasks.c.id)).where(
+        _tasks.c.project_id == _projects.c.id
+    ).scalar_subquery()
+
+    statement = update(_projects).values(
+        progress_sum=total,
+        task_count=count,
+        progress=_progress_expression(total, count)
+    )
+    if project_ids is not None:
+        statement = statement.where(_projects.c.id.in_(project_ids))
+    return connection.execute(statement).rowcount
+
+
+_UNKNOWN = object()
+
+
+def _history(task, attribute):
+    """(valeur avant, valeur après) d'un attribut d'une tâche
+
+    La valeur avant est _UNKNOWN si l'attribut avait expiré (après un commit)
+    lorsqu'il a été modifié : SQLAlchemy ne l'a alors pas rechargée.
+    """
+    history = sa_inspect(task).attrs[attribute].history
+    if history.deleted:
+        before = history.deleted[0]
+    elif history.unchanged:
+        before = history.unchanged[0]
+    else:
+        before = _UNKNOWN
+    after = history.added[0] if history.added else before
+    return before, after
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_task_progress(session, flush_context):
+    # Les variations sont cumulées par projet puis appliquées dans la même
+    # transaction que l'écriture des tâches
+    deltas = {}
+    # Projets dont l'ancienne valeur est inconnue : recalcul complet
+    to_recompute = set()
+
+    def add(project_id, completion, count):
+        if project_id is None:
+            return
+        current = deltas.setdefault(project_id, [0, 0])
+        current[0] += completion or 0
+        current[1] += count
+
+    for obj in session.new:
+        if isinstance(obj, Task):
+            add(obj.project_id, obj.percent_completion, 1)
+
+    for obj in list(session.deleted) + list(session.dirty):
+        if not isinstance(obj, Task):
+            continue
+        project_before, project_after = _history(obj, 'project_id')
+        completion_before, completion_after = _history(obj, 'percent_completion')
+        if _UNKNOWN in (project_before, completion_before):
+            candidates = (project_before, project_after)
+            if obj not in session.deleted:
+                # La ligne existe encore : project_id est rechargeable
+                candidates += (obj.project_id,)
+            to_recompute.update(p for p in candidates if p is not _UNKNOWN)
+            continue
+        if obj in session.deleted:
+            add(project_before, -(completion_before or 0), -1)
+        elif project_before != project_after or completion_before != completion_after:
+            add(project_before, -(completion_before or 0), -1)
+            add(project_after, completion_after, 1)
+
+    connection = session.connection() if (deltas or to_recompute) else None
+    for project_id in sorted(deltas):
+        if project_id not in to_recompute:
+            apply_progress_delta(connection, project_id, *deltas[project_id])
+    if to_recompute:
+        recompute_progress(connection, sorted(to_recompute))
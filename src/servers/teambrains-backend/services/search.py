@@ -0,0 +1,296 @@
+# services/search.py
+import logging
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from flask import current_app
+from sqlalchemy import cast, func, literal, literal_column, or_, select, text, union, union_all
+from sqlalchemy.exc import OperationalError
+from models import db, User, Project, School, Skill, project_members, Task, Message
+from .technologies import technology_filter
+
+# Au-delà, les termes supplémentaires sont ignorés
+MAX_SEARCH_TERMS = 8
+
+# Dictionnaire français (racines) pour les textes, simple pour les noms
+# propres, technologies, statuts... Une recherche interroge les deux.
+FRENCH = literal_column("'french'::regconfig")
+SIMPLE = literal_column("'simple'::regconfig")
+
+# En dessous, une suggestion par trigrammes n'a pas de sens
+MIN_SUGGEST_LENGTH = 2
+
+# Code Postgres d'une requête annulée par statement_timeout
+QUERY_CANCELED = '57014'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def build_tsquery(text, weights=''):
+    """Construire la tsquery d'une saisie libre, ou None si elle est vide
+
+    Chaque terme est cherché par préfixe ('dév' trouve 'développeur') et tous
+    les termes doivent correspondre. weights restreint la recherche à
+    certaines parties du document (ex. 'A' : le nom d'un utilisateur).
+    """
+    terms = re.findall(r'[^\W_]+', text.lower())[:MAX_SEARCH_TERMS]
+    if not terms:
+        return None
+    expression = ' & '.join(f"{term}:*{weights}" for term in terms)
+    return func.to_tsquery(FRENCH, expression).op('||')(func.to_tsquery(SIMPLE, expression))
+
+
+def _matches(column, tsquery):
+    return column.op('@@')(tsquery)
+
+
+def _ranked(query, model, tsquery, limit):
+    # Les meilleurs résultats d'abord ; l'id départage les égalités
+    return query.order_by(
+        func.ts_rank(model.search_vector, tsquery).desc(),
+        model.id
+    ).limit(limit).all()
+
+
+def search_projects(text, limit=10):
+    """Projets dont le contenu ou le nom d'un membre correspond"""
+    tsquery = build_tsquery(text)
+    if tsquery is None:
+        return []
+    names_tsquery = build_tsquery(text, weights='A')
+
+    # UNION de deux recherches indexées plutôt qu'un OR avec EXISTS, qui
+    # empêcherait Postgres d'utiliser les index GIN
+    matching = union(
+        select(Project.id.label('project_id')).where(_matches(Project.search_vector, tsquery)),
+        select(project_members.c.project_id).join(
+            User, User.id == project_members.c.user_id
+        ).where(_matches(User.search_vector, names_tsquery))
+    ).subquery()
+
+    query = Project.query.filter(Project.id.in_(select(matching.c.project_id)))
+    return _ranked(query, Project, tsquery, limit)
+
+
+def search_users(text, limit=10, technologies=None):
+    """Utilisateurs correspondants, ayant toutes les technologies données"""
+    tsquery = build_tsquery(text)
+    if tsquery is None:
+        return []
+    query = User.query.filter(_matches(User.search_vector, tsquery))
+    if technologies:
+        query = query.filter(technology_filter(technologies))
+    return _ranked(query, User, tsquery, limit)
+
+
+def search_tasks(text, project_ids, limit=5):
+    """Tâches correspondantes, limitées aux projets donnés"""
+    tsquery = build_tsquery(text)
+    if tsquery is None or not project_ids:
+        return []
+    query = Task.query.filter(
+        Task.project_id.in_(project_ids),
+        _matches(Task.search_vector, tsquery)
+    )
+    return _ranked(query, Task, tsquery, limit)
+
+
+def search_messages(text, project_ids, limit=5):
+    """Messages correspondants, limités aux projets donnés"""
+    tsquery = build_tsquery(text)
+    if tsquery is None or not project_ids:
+        return []
+    query = Message.query.filter(
+        Message.project_id.in_(project_ids),
+        _matches(Message.search_vector, tsquery)
+    )
+    return _ranked(query, Message, tsquery, limit)
+
+
+def search_schools(text, limit=5):
+    tsquery = build_tsquery(text)
+    if tsquery is None:
+        return []
+    query = School.query.filter(_matches(School.search_vector, tsquery))
+    return _ranked(query, School, tsquery, limit)
+
+
+def _escape_like(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _suggest_select(kind, id_column, label, detail, text, limit, *criteria):
+    """Meilleures correspondances d'un type, servies par l'index trigrammes
+
+    contains : la saisie apparaît telle quelle dans le libellé ; sinon la
+    ligne n'est qu'une correspondance approchée (faute de frappe).
+    """
+    contains = label.ilike(f"%{_escape_like(text)}%", escape='\\')
+    score = func.word_similarity(text, label)
+    return select(
+        literal(kind).label('kind'),
+        cast(id_column, db.String).label('id'),
+        label.label('label'),
+        detail.label('detail'),
+        contains.label('contains'),
+        score.label('score')
+    ).where(
+        # %> : similarité par mot au-dessus de pg_trgm.word_similarity_threshold
+        or_(contains, label.op('%>')(text)),
+        *criteria
+    ).order_by(contains.desc(), score.desc(), label).limit(limit)
+
+
+def suggest(text, limit=5):
+    """Autocomplétion utilisateurs, projets et compétences en une requête
+
+    Retourne (suggestions par type, correction proposée ou None). La
+    correction n'est proposée que si rien ne contient la saisie telle quelle.
+    """
+    text = text.strip()
+    suggestions = {'users': [], 'projects': [], 'skills': []}
+    if len(text) < MIN_SUGGEST_LENGTH:
+        return suggestions, None
+
+    # Même expression que l'index ix_users_full_name_trgm
+    full_name = User.prenom + ' ' + User.nom
+    statement = union_all(
+        _suggest_select('users', User.id, full_name, User.typeDeveloppeur, text, limit),
+        _suggest_select('projects', Project.id, Project.name, Project.project_slug, text, limit),
+        _suggest_select('skills', Skill.id, Skill.name, Skill.category, text, limit, Skill.is_active.is_(True))
+    )
+    rows = db.session.execute(statement).all()
+
+    for row in rows:
+        suggestions[row.kind].append({
+            'id': int(row.id) if row.kind != 'users' else row.id,
+            'label': row.label,
+            'detail': row.detail,
+            'score': round(float(row.score or 0), 3),
+            'type': row.kind[:-1]
+        })
+
+    did_you_mean = None
+    if rows and not any(row.contains for row in rows):
+        best = max(rows, key=lambda row: row.score or 0)
+        did_you_mean = best.label
+    return suggestions, did_you_mean
+
+
+def _get_executor(workers):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='search')
+        return _executor
+
+
+def _run_isolated(app, timeout_ms, function, args, kwargs):
+    """Exécuter une sous-recherche dans son propre contexte d'application
+
+    Flask-SQLAlchemy associe une session par contexte : la sous-recherche
+    dispose ainsi de sa propre connexion du pool, rendue à la fin. Les objets
+    retournés sont détachés mais leurs colonnes restent lisibles.
+    """
+    with app.app_context():
+        if db.engine.dialect.name == 'postgresql':
+            # Limite côté serveur : une requête abandonnée ne continue pas
+            # d'occuper la base et la connexion
+            db.session.execute(
+                text("SELECT set_config('statement_timeout', :timeout, true)"),
+                {'timeout': str(timeout_ms)}
+            )
+        return function(*args, **kwargs)
+
+
+def _run_timed(started, name, app, timeout_ms, function, args, kwargs):
+    # Le délai d'une sous-recherche court à partir de son démarrage, pas de
+    # sa mise en file d'attente
+    started[name] = time.monotonic()
+    return _run_isolated(app, timeout_ms, function, args, kwargs)
+
+
+def _is_timeout(error):
+    return isinstance(error, OperationalError) and getattr(error.orig, 'pgcode', None) == QUERY_CANCELED
+
+
+def run_searches(searches):
+    """Exécuter des sous-recherches indépendantes, en parallèle si configuré
+
+    searches : {nom: (fonction, args, kwargs)}. Retourne (résultats, noms
+    interrompus) ; une sous-recherche qui dépasse SEARCH_SUBQUERY_TIMEOUT_MS
+    donne une liste vide au lieu de faire échouer toute la recherche. Les
+    résultats sont rangés dans l'ordre de searches, quel que soit l'ordre
+    d'achèvement.
+    """
+    app = current_app._get_current_object()
+    workers = app.config.get('SEARCH_WORKERS', 4)
+    timeout_ms = app.config.get('SEARCH_SUBQUERY_TIMEOUT_MS', 2000)
+
+    outcomes = {}
+    timed_out = []
+
+    if workers <= 0:
+        # Mode séquentiel : seul statement_timeout borne chaque sous-recherche
+        for name, (function, args, kwargs) in searches.items():
+            try:
+                outcomes[name] = _run_isolated(app, timeout_ms, function, args, kwargs)
+            except OperationalError as e:
+                if not _is_timeout(e):
+                    raise
+                timed_out.append(name)
+    else:
+        executor = _get_executor(workers)
+        timeout = timeout_ms / 1000
+        submitted_at = time.monotonic()
+        started = {}
+        futures = {
+            name: executor.submit(_run_timed, started, name, app, timeout_ms, function, args, kwargs)
+            for name, (function, args, kwargs) in searches.items()
+        }
+
+        # Chaque sous-recherche dispose de timeout une fois démarrée : sous
+        # charge, l'attente d'un thread libre ne consomme pas son délai. Une
+        # sous-recherche restée en file plus de timeout est abandonnée (les
+        # threads occupés se libèrent au plus tard à leur statement_timeout)
+        pending = set(futures)
+        while pending:
+            now = time.monotonic()
+            deadlines = [
+                started[name] + timeout if name in started else submitted_at + timeout
+                for name in pending
+            ]
+            wait([futures[name] for name in pending], timeout=max(0, min(deadlines) - now), return_when=FIRST_COMPLETED)
+
+            now = time.monotonic()
+            for name in list(pending):
+                if futures[name].done():
+                    pending.discard(name)
+                elif name in started:
+                    if now >= started[name] + timeout:
+                        pending.discard(name)
+                elif now >= submitted_at + timeout and futures[name].cancel():
+                    pending.discard(name)
+
+        for name, future in futures.items():
+            if not future.done():
+                timed_out.append(name)
+                continue
+            if future.cancelled():
+                timed_out.append(name)
+                continue
+            try:
+                outcomes[name] = future.result()
+            except OperationalError as e:
+                if not _is_timeout(e):
+                    raise
+                timed_out.append(name)
+
+    if timed_out:
+        logging.warning(f"Recherche partielle, sous-recherches interrompues: {', '.join(timed_out)}")
+
+    results = {name: outcomes.get(name, []) for name in searches}
+    return results, timed_out
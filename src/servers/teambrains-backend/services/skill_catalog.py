@@ -0,0 +1,58 @@
+# services/skill_catalog.py
+import threading
+from collections import namedtuple
+
+from models import Skill
+from .cache_versions import get_versions
+
+CATALOG_SCOPE = 'skills'
+
+# Instantané du catalogue : version de la famille 'skills' lors du chargement,
+# compétences actives triées par nom (dictionnaires to_dict, jamais modifiés)
+# et catégories. Remplacé d'un bloc, jamais modifié sur place.
+SkillCatalog = namedtuple('SkillCatalog', ['version', 'updated_at', 'skills', 'categories'])
+
+_catalog = None
+_lock = threading.Lock()
+
+
+def _load_catalog(version, updated_at):
+    skills = Skill.query.filter_by(is_active=True).order_by(Skill.name).all()
+    return SkillCatalog(
+        version=version,
+        updated_at=updated_at,
+        skills=tuple(skill.to_dict() for skill in skills),
+        categories=tuple(sorted({skill.category for skill in skills if skill.category}))
+    )
+
+
+def get_skill_catalog():
+    """Catalogue des compétences du worker, rechargé quand sa version change
+
+    Une seule lecture de cache_versions par appel ; toute écriture ORM sur
+    Skill (create_skill...) incrémente la version, quel que soit le worker.
+    La version est lue avant les compétences : une création concurrente
+    provoque au pire un rechargement de plus.
+    """
+    global _catalog
+    version, updated_at = get_versions([CATALOG_SCOPE])[CATALOG_SCOPE]
+    catalog = _catalog
+    if catalog is not None and catalog.version == version:
+        return catalog
+
+    catalog = _load_catalog(version, updated_at)
+    with _lock:
+        if _catalog is None or _catalog.version <= version:
+            _catalog = catalog
+    return catalog
+
+
+def filter_skills(catalog, category=None, search=None):
+    """Compétences du catalogue filtrées en mémoire (catégorie exacte, nom contenant search)"""
+    skills = catalog.skills
+    if category:
+        skills = [skill for skill in skills if skill['category'] == category]
+    if search:
+        needle = search.casefold()
+        skills = [skill for skill in skills if needle in skill['name'].casefold()]
+    return list(skills)
@@ -0,0 +1,176 @@
+# services/skill_index.py
+import threading
+import time
+from functools import reduce
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from models import db, UserSkill
+
+LEVEL_ORDER = {'débutant': 1, 'intermédiaire': 2, 'avancé': 3}
+
+
+class SkillIndex:
+    """Index inversé compétences -> utilisateurs, par worker
+
+    Chaque utilisateur reçoit un rang (bit) ; pour chaque (compétence, niveau
+    minimum) un entier Python sert de bitset des utilisateurs qui l'ont au
+    moins à ce niveau. ET / OU entre compétences sont des & / | sur ces
+    entiers. Les écritures ORM validées de ce worker sont appliquées au commit ;
+    celles des autres workers sont reprises par la reconstruction complète
+    périodique (SKILL_INDEX_TTL).
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._built_at = None
+        self._slots = {}
+        self._user_ids = []
+        self._masks = {}
+        self._entries = {}
+        # Changements validés pendant une reconstruction, rejoués ensuite
+        self._replay = None
+
+    def _ensure_fresh(self):
+        if self._built_at is not None and time.monotonic() - self._built_at < self.ttl:
+            return
+        with self._build_lock:
+            if self._built_at is not None and time.monotonic() - self._built_at < self.ttl:
+                return
+            self.rebuild()
+
+    def rebuild(self):
+        with self._lock:
+            self._replay = {}
+        rows = db.session.execute(
+            select(UserSkill.user_id, UserSkill.skill_id, UserSkill.level, UserSkill.self_assessment)
+        ).all()
+
+        slots, user_ids, masks, entries = {}, [], {}, {}
+        for user_id, skill_id, level, self_assessment in rows:
+            slot = slots.get(user_id)
+            if slot is None:
+                slot = slots[user_id] = len(user_ids)
+                user_ids.append(user_id)
+            level_value = LEVEL_ORDER.get(level, 1)
+            entries[(slot, skill_id)] = (level_value, self_assessment or 0)
+            for min_level in range(1, level_value + 1):
+                masks[(skill_id, min_level)] = masks.get((skill_id, min_level), 0) | (1 << slot)
+
+        with self._lock:
+            replay, self._replay = self._replay, None
+            self._slots, self._user_ids, self._masks, self._entries = slots, user_ids, masks, entries
+            self._apply(replay)
+            self._built_at = time.monotonic()
+
+    def apply(self, changes):
+        """Appliquer {(user_id, skill_id): (niveau, auto-évaluation) ou None}"""
+        with self._lock:
+            if self._replay is not None:
+                self._replay.update(changes)
+            if self._built_at is not None:
+                self._apply(changes)
+
+    def _apply(self, changes):
+        for (user_id, skill_id), values in changes.items():
+            slot = self._slots.get(user_id)
+            if slot is None:
+                if values is None:
+                    continue
+                slot = self._slots[user_id] = len(self._user_ids)
+                self._user_ids.append(user_id)
+            bit = 1 << slot
+            for min_level in LEVEL_ORDER.values():
+                key = (skill_id, min_level)
+                if key in self._masks:
+                    self._masks[key] &= ~bit
+            if values is None:
+                self._entries.pop((slot, skill_id), None)
+                continue
+            level, self_assessment = values
+            level_value = LEVEL_ORDER.get(level, 1)
+            self._entries[(slot, skill_id)] = (level_value, self_assessment or 0)
+            for min_level in range(1, level_value + 1):
+                key = (skill_id, min_level)
+                self._masks[key] = self._masks.get(key, 0) | bit
+
+    def search(self, skill_ids, min_level=1, match_all=False):
+        """Utilisateurs ayant les compétences au niveau minimum demandé
+
+        match_all : toutes les compétences (ET), sinon au moins une (OU).
+        Retourne [(user_id, compétences couvertes, somme des auto-évaluations)]
+        triés par couverture puis auto-évaluation décroissantes.
+        """
+        self._ensure_fresh()
+        with self._lock:
+            masks = [self._masks.get((skill_id, min_level), 0) for skill_id in skill_ids]
+            if not masks:
+                return []
+            combined = reduce(lambda left, right: left & right, masks) if match_all \
+                else reduce(lambda left, right: left | right, masks)
+
+            results = []
+            while combined:
+                low = combined & -combined
+                slot = low.bit_length() - 1
+                combined ^= low
+                coverage = 0
+                assessment = 0
+                for skill_id, mask in zip(skill_ids, masks):
+                    if mask & low:
+                        coverage += 1
+                        assessment += self._entries[(slot, skill_id)][1]
+                results.append((self._user_ids[slot], coverage, assessment))
+
+        results.sort(key=lambda item: (-item[1], -item[2], item[0]))
+        return results
+
+
+skill_index = SkillIndex()
+
+
+def search_users_by_skill_ids(skill_ids, level=None, match_all=False):
+    """Recherche dans l'index du worker (voir SkillIndex.search)"""
+    min_level = LEVEL_ORDER[level] if level else 1
+    return skill_index.search(list(dict.fromkeys(skill_ids)), min_level, match_all)
+
+
+def record_user_skills(session, changes):
+    """Signaler des compétences écrites hors ORM (insert Core...)
+
+    changes : {(user_id, skill_id): (niveau, auto-évaluation) ou None}, appliqué
+    à l'index au commit de la session.
+    """
+    session.info.setdefault('indexed_user_skills', {}).update(changes)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_flushed_user_skills(session, flush_context):
+    # Valeurs relevées au flush : aucune requête n'est possible après le commit
+    changes = {}
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, UserSkill):
+            changes[(obj.user_id, obj.skill_id)] = (obj.level, obj.self_assessment)
+    for obj in session.deleted:
+        if isinstance(obj, UserSkill):
+            changes[(obj.user_id, obj.skill_id)] = None
+    if changes:
+        record_user_skills(session, changes)
+
+
+@event.listens_for(Session, 'after_commit')
+def _index_committed_user_skills(session):
+    changes = session.info.pop('indexed_user_skills', None)
+    if changes:
+        skill_index.apply(changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_indexed_user_skills(session):
+    session.info.pop('indexed_user_skills', None)
+
+
+def init_skill_index(app):
+    skill_index.ttl = app.config.setdefault('SKILL_INDEX_TTL', 300)
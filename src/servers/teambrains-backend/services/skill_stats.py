@@ -0,0 +1,64 @@
+# services/skill_stats.py
+from sqlalchemy import func
+from models import db, Skill, UserSkill
+from .cache import TTLCache
+
+LEVELS = ['débutant', 'intermédiaire', 'avancé']
+
+# Nombre de compétences du catalogue et compétences les plus répandues :
+# identiques pour tous les utilisateurs, recalculées au plus une fois par
+# SKILL_STATS_TTL et par worker.
+_global_stats = TTLCache(maxsize=1, ttl=300)
+
+
+def compute_user_skill_stats(user_id):
+    """Compétences d'un utilisateur par catégorie et par niveau, en une requête
+
+    Retourne (total, {niveau: nombre}, {catégorie: nombre}).
+    """
+    rows = db.session.query(
+        Skill.category,
+        func.count(UserSkill.id).label('total'),
+        *[func.count(UserSkill.id).filter(UserSkill.level == level).label(f'level_{index}') for index, level in enumerate(LEVELS)]
+    ).join(UserSkill, UserSkill.skill_id == Skill.id).filter(
+        UserSkill.user_id == user_id
+    ).group_by(Skill.category).all()
+
+    total = 0
+    levels = {level: 0 for level in LEVELS}
+    categories = {}
+    for row in rows:
+        total += row.total
+        for index, level in enumerate(LEVELS):
+            levels[level] += getattr(row, f'level_{index}')
+        if row.category:
+            categories[row.category] = row.total
+    return total, levels, categories
+
+
+def compute_global_skill_stats(limit=10):
+    """Nombre de compétences actives et compétences les plus répandues"""
+    total_skills = Skill.query.filter_by(is_active=True).count()
+    popular_skills = db.session.query(
+        Skill.name,
+        func.count(UserSkill.id).label('user_count')
+    ).join(UserSkill, UserSkill.skill_id == Skill.id).group_by(Skill.id, Skill.name).order_by(
+        func.count(UserSkill.id).desc(), Skill.name
+    ).limit(limit).all()
+    return {
+        'total_skills': total_skills,
+        'popular_skills': [{"skill_name": name, "user_count": count} for name, count in popular_skills]
+    }
+
+
+def get_global_skill_stats():
+    """Statistiques globales depuis l'instantané du worker (voir compute_global_skill_stats)"""
+    stats = _global_stats.get('global')
+    if stats is None:
+        stats = compute_global_skill_stats()
+        _global_stats.set('global', stats)
+    return stats
+
+
+def init_skill_stats(app):
+    _global_stats.configure(ttl=app.config.setdefault('SKILL_STATS_TTL', 300))
@@ -0,0 +1,64 @@
+# services/sprint_stats.py
+from sqlalchemy import func
+from models import db, Task
+from .cache import TTLCache
+from .cache_versions import get_versions, task_scope
+
+PRIORITIES = ['haute', 'moyenne', 'basse']
+
+# Statistiques par projet, accompagnées de la version des tâches du projet
+# au moment du calcul : une écriture sur une tâche (n'importe quel worker)
+# change la version et rend l'entrée obsolète.
+_stats = TTLCache(maxsize=1024, ttl=3600)
+
+
+def _percentage(completed, total):
+    return (completed / total) * 100 if total > 0 else 0
+
+
+def compute_sprint_stats(project_id):
+    """Totaux et tâches terminées par sprint et par priorité, en une requête"""
+    completed = func.count(Task.id).filter(Task.percent_completion == 100)
+    rows = db.session.query(
+        Task.sprint,
+        Task.priority,
+        func.grouping(Task.sprint).label('by_priority'),
+        func.count(Task.id).label('total'),
+        completed.label('completed')
+    ).filter(
+        Task.project_id == project_id
+    ).group_by(
+        func.grouping_sets(Task.sprint, Task.priority)
+    ).all()
+
+    sprint_stats = {}
+    priority_stats = {priority: {"total": 0, "completed": 0} for priority in PRIORITIES}
+
+    for row in rows:
+        if row.by_priority:
+            if row.priority in priority_stats:
+                priority_stats[row.priority] = {"total": row.total, "completed": row.completed}
+        elif row.sprint:
+            sprint_stats[row.sprint] = {"total": row.total, "completed": row.completed}
+
+    for stats in list(sprint_stats.values()) + list(priority_stats.values()):
+        stats["completion_percentage"] = _percentage(stats["completed"], stats["total"])
+
+    return {
+        "sprint_stats": sprint_stats,
+        "priority_stats": priority_stats
+    }
+
+
+def get_sprint_stats(project_id):
+    """Statistiques de sprint d'un projet, depuis le cache si à jour"""
+    scope = task_scope(project_id)
+    version = get_versions([scope])[scope][0]
+
+    cached = _stats.get(project_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    stats = compute_sprint_stats(project_id)
+    _stats.set(project_id, (version, stats))
+    return stats
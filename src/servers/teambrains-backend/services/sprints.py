@@ -0,0 +1,99 @@
+# services/sprints.py
+from datetime import date
+
+from sqlalchemy import and_, event, func, inspect as sa_inspect, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from models import Task, Sprint, SprintSnapshot
+
+_sprints = Sprint.__table__
+_tasks = Task.__table__
+_snapshots = SprintSnapshot.__table__
+
+
+def resolve_sprint_id(connection, project_id, name):
+    """Id du sprint `name` du projet, créé au besoin (sûr en concurrence)"""
+    connection.execute(
+        pg_insert(_sprints).values(
+            project_id=project_id, name=name, created_at=func.now()
+        ).on_conflict_do_nothing(index_elements=[_sprints.c.project_id, _sprints.c.name])
+    )
+    return connection.execute(
+        select(_sprints.c.id).where(_sprints.c.project_id == project_id, _sprints.c.name == name)
+    ).scalar()
+
+
+@event.listens_for(Session, 'before_flush')
+def _link_task_sprints(session, flush_context, instances):
+    # Task.sprint reste le nom affiché par l'API : sprint_id en est déduit à
+    # chaque création ou changement de sprint
+    resolved = {}
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Task):
+            continue
+        state = sa_inspect(obj)
+        if obj not in session.new and not (state.attrs.sprint.history.has_changes() or state.attrs.project_id.history.has_changes()):
+            continue
+        if not obj.sprint:
+            obj.sprint_id = None
+            continue
+        key = (obj.project_id, obj.sprint)
+        if key not in resolved:
+            resolved[key] = resolve_sprint_id(session.connection(), *key)
+        obj.sprint_id = resolved[key]
+
+
+def backfill_sprints(connection):
+    """Créer les sprints à partir des noms existants et relier les tâches
+
+    Idempotent. Retourne le nombre de tâches reliées.
+    """
+    connection.execute(
+        pg_insert(_sprints).from_select(
+            ['project_id', 'name', 'created_at'],
+            select(_tasks.c.project_id, _tasks.c.sprint, func.now()).where(
+                _tasks.c.sprint.isnot(None), _tasks.c.sprint != ''
+            ).distinct()
+        ).on_conflict_do_nothing(index_elements=[_sprints.c.project_id, _sprints.c.name])
+    )
+    result = connection.execute(
+        update(_tasks).where(and_(
+            _sprints.c.project_id == _tasks.c.project_id,
+            _sprints.c.name == _tasks.c.sprint,
+            _tasks.c.sprint_id.is_distinct_from(_sprints.c.id)
+        )).values(sprint_id=_sprints.c.id)
+    )
+    return result.rowcount
+
+
+def snapshot_sprints(connection, day=None):
+    """Enregistrer l'avancement de chaque sprint pour la journée (job nocturne)
+
+    Une seule requête INSERT ... SELECT ... GROUP BY ; relancer la commande
+    le même jour remplace la photo du jour. Retourne le nombre de sprints.
+    """
+    day = day or date.today()
+    completion = func.least(func.coalesce(_tasks.c.percent_completion, 0), 100)
+    aggregated = select(
+        _tasks.c.sprint_id,
+        literal(day).label('snapshot_date'),
+        func.count(_tasks.c.id),
+        func.count(_tasks.c.id).filter(_tasks.c.percent_completion >= 100),
+        func.coalesce(func.sum(100 - completion), 0),
+        func.coalesce(func.sum(completion), 0)
+    ).where(_tasks.c.sprint_id.isnot(None)).group_by(_tasks.c.sprint_id)
+
+    statement = pg_insert(_snapshots).from_select(
+        ['sprint_id', 'snapshot_date', 'total_tasks', 'completed_tasks', 'remaining_work', 'completed_work'],
+        aggregated
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[_snapshots.c.sprint_id, _snapshots.c.snapshot_date],
+        set_={
+            'total_tasks': statement.excluded.total_tasks,
+            'completed_tasks': statement.excluded.completed_tasks,
+            'remaining_work': statement.excluded.remaining_work,
+            'completed_work': statement.excluded.completed_work
+        }
+    )
+    return connection.execute(statement).rowcount
@@ -0,0 +1,116 @@
+# services/technologies.py
+from datetime import datetime
+
+from sqlalchemy import delete, event, false, func, inspect as sa_inspect, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from models import db, User, Skill, user_technologies, split_technologies
+
+_skills = Skill.__table__
+
+# Au-delà, un nom saisi ne peut pas devenir une compétence (Skill.name)
+MAX_TECHNOLOGY_LENGTH = _skills.c.name.type.length
+
+
+def resolve_technology_ids(connection, names, create=False):
+    """Compétences correspondant aux technologies (casse ignorée) : {nom en minuscules: id}
+
+    create : les technologies absentes du catalogue y sont ajoutées, inactives
+    (hors de /skills/list et des statistiques tant qu'une création explicite ne
+    les active pas), sûr en concurrence ; sinon elles sont ignorées. Les noms
+    trop longs pour une compétence sont ignorés.
+    """
+    wanted = {name.lower(): name for name in names if len(name) <= MAX_TECHNOLOGY_LENGTH}
+    if not wanted:
+        return {}
+
+    def lookup(keys):
+        # La plus ancienne compétence l'emporte si deux ne diffèrent que par la casse
+        rows = connection.execute(
+            select(func.lower(_skills.c.name), _skills.c.id).where(
+                func.lower(_skills.c.name).in_(list(keys))
+            ).order_by(_skills.c.id.desc())
+        )
+        return dict(rows.all())
+
+    found = lookup(wanted)
+    missing = [wanted[key] for key in wanted if key not in found]
+    if missing and create:
+        connection.execute(
+            pg_insert(_skills).values([
+                {'name': name, 'is_active': False, 'created_at': datetime.utcnow()} for name in sorted(missing)
+            ]).on_conflict_do_nothing(index_elements=[_skills.c.name])
+        )
+        found.update(lookup(name.lower() for name in missing))
+    return found
+
+
+def link_user_technologies(connection, technologies_by_user):
+    """Remplacer les lignes user_technologies des utilisateurs donnés
+
+    technologies_by_user : {user_id: chaîne User.technologies}.
+    """
+    if not technologies_by_user:
+        return
+    names = {user_id: split_technologies(value) for user_id, value in technologies_by_user.items()}
+    skill_ids = resolve_technology_ids(
+        connection, [name for user_names in names.values() for name in user_names], create=True
+    )
+    connection.execute(delete(user_technologies).where(user_technologies.c.user_id.in_(list(names))))
+    rows = [
+        {'user_id': user_id, 'skill_id': skill_ids[name.lower()], 'position': position}
+        for user_id, user_names in sorted(names.items())
+        for position, name in enumerate(user_names)
+        if name.lower() in skill_ids
+    ]
+    if rows:
+        connection.execute(pg_insert(user_technologies).values(rows).on_conflict_do_nothing())
+
+
+@event.listens_for(Session, 'after_flush')
+def _link_flushed_technologies(session, flush_context):
+    # User.technologies reste la valeur écrite par l'API : les liens sont
+    # recalculés à la création du compte et à chaque changement de la chaîne
+    changed = {}
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, User):
+            continue
+        if obj in session.new:
+            if obj.technologies:
+                changed[obj.id] = obj.technologies
+        elif sa_inspect(obj).attrs.technologies.history.has_changes():
+            changed[obj.id] = obj.technologies
+    link_user_technologies(session.connection(), changed)
+
+
+def technology_filter(names, match_all=True):
+    """Condition SQL sur User.id : utilisateurs ayant ces technologies
+
+    Recherche indexée dans user_technologies (par compétence) plutôt qu'un
+    ILIKE sur la chaîne. match_all : toutes les technologies, sinon au moins une.
+    """
+    names = split_technologies(','.join(names))
+    skill_ids = resolve_technology_ids(db.session.connection(), names)
+    if not skill_ids or (match_all and len(skill_ids) < len(names)):
+        return false()
+    matching = select(user_technologies.c.user_id).where(
+        user_technologies.c.skill_id.in_(list(skill_ids.values()))
+    )
+    if match_all and len(skill_ids) > 1:
+        matching = matching.group_by(user_technologies.c.user_id).having(
+            func.count(user_technologies.c.skill_id) == len(skill_ids)
+        )
+    return User.id.in_(matching)
+
+
+def backfill_technologies(connection, batch_size=500):
+    """Relier les technologies déjà saisies au catalogue des compétences
+
+    Idempotent. Retourne le nombre d'utilisateurs traités.
+    """
+    users = connection.execute(
+        select(User.__table__.c.id, User.__table__.c.technologies).order_by(User.__table__.c.id)
+    ).all()
+    for start in range(0, len(users), batch_size):
+        link_user_technologies(connection, dict(users[start:start + batch_size]))
+    return len(users)
@@ -0,0 +1,82 @@
+# services/user_cache.py
+from flask import jsonify
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from models import db, User
+from .cache import TTLCache
+
+# Lignes User les plus utilisées, partagées entre les requêtes d'un worker.
+# Les autres workers ne sont pas notifiés des modifications : la durée de vie
+# courte (USER_CACHE_TTL) borne la fenêtre d'incohérence.
+_user_rows = TTLCache(maxsize=2048, ttl=30)
+
+
+def _snapshot(user):
+    """Copier les colonnes d'un User (jamais l'instance liée à la session)"""
+    # Les colonnes différées (search_vector...) ne sont pas chargées : les lire
+    # déclencherait une requête supplémentaire
+    return {attr.key: getattr(user, attr.key) for attr in sa_inspect(User).column_attrs if not attr.deferred}
+
+
+def load_user(user_id):
+    """Charger un utilisateur en passant par le cache inter-requêtes"""
+    row = _user_rows.get(user_id)
+    if row is not None:
+        cached = User(**row)
+        make_transient_to_detached(cached)
+        # merge(load=False) rattache l'objet à la session courante sans SELECT,
+        # les relations (school, projects...) restent chargeables à la demande
+        return db.session.merge(cached, load=False)
+
+    user = User.query.get(user_id)
+    if user is not None:
+        _user_rows.set(user_id, _snapshot(user))
+    return user
+
+
+def invalidate_user(user_id):
+    _user_rows.pop(user_id)
+
+
+@event.listens_for(Session, 'after_flush')
+def _invalidate_flushed_users(session, flush_context):
+    # Profil modifié, changement d'école, suppression de compte... : toute
+    # écriture ORM sur un User invalide son entrée, puis à nouveau au commit
+    # pour écarter une relecture concurrente de l'ancienne valeur.
+    pending = session.info.setdefault('invalidated_user_ids', set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            pending.add(obj.id)
+            invalidate_user(obj.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_users(session):
+    for user_id in session.info.pop('invalidated_user_ids', ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_invalidated_users(session):
+    session.info.pop('invalidated_user_ids', None)
+
+
+def init_user_loader(app, jwt):
+    """Brancher le chargement de current_user de flask_jwt_extended sur le cache
+
+    flask_jwt_extended mémorise déjà l'utilisateur pour la durée de la
+    requête ; le cache évite la requête par clé primaire d'une requête à
+    l'autre.
+    """
+    _user_rows.configure(
+        maxsize=app.config.setdefault('USER_CACHE_SIZE', 2048),
+        ttl=app.config.setdefault('USER_CACHE_TTL', 30)
+    )
+
+    @jwt.user_lookup_loader
+    def _user_lookup(_jwt_header, jwt_data):
+        return load_user(jwt_data[app.config.get('JWT_IDENTITY_CLAIM', 'sub')])
+
+    @jwt.user_lookup_error_loader
+    def _user_lookup_error(_jwt_header, jwt_data):
+        return jsonify({"msg": "Utilisateur non trouvé"}), 404
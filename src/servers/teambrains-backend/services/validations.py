@@ -0,0 +1,115 @@
+# services/validations.py
+from datetime import datetime
+
+from sqlalchemy import case, event, func, or_, select, update, inspect as sa_inspect
+from sqlalchemy.orm import Session
+from models import Task, TaskValidation, SubTask, SubTaskValidation
+
+# Validation -> (table résumée, colonne de la cible dans la validation)
+_SUMMARIES = {
+    TaskValidation: (Task.__table__, 'task_id'),
+    SubTaskValidation: (SubTask.__table__, 'subtask_id')
+}
+
+
+def _record_validations(connection, table, target_id, validations):
+    """Incrémenter le compteur et avancer le pointeur de dernière validation
+
+    Le pointeur n'avance que si la validation est plus récente que celle
+    déjà enregistrée : deux validations concurrentes ne le font pas reculer.
+    """
+    latest = max(validations, key=lambda validation: (validation.timestamp, validation.id))
+    is_newer = or_(table.c.last_validated_at.is_(None), table.c.last_validated_at <= latest.timestamp)
+    connection.execute(
+        update(table).where(table.c.id == target_id).values(
+            validation_count=table.c.validation_count + len(validations),
+            last_validation_id=case((is_newer, latest.id), else_=table.c.last_validation_id),
+            last_validation_status=case((is_newer, latest.status), else_=table.c.last_validation_status),
+            last_validated_at=case((is_newer, latest.timestamp), else_=table.c.last_validated_at)
+        )
+    )
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_validations(session, flush_context):
+    # Les validations ne sont jamais modifiées ni supprimées isolément (seulement
+    # en cascade avec leur tâche) : seules les insertions sont suivies
+    pending = {}
+    for obj in session.new:
+        summary = _SUMMARIES.get(type(obj))
+        if summary is not None:
+            table, target_column = summary
+            pending.setdefault((table, getattr(obj, target_column)), []).append(obj)
+
+    for (table, target_id), validations in sorted(pending.items(), key=lambda item: (item[0][0].name, item[0][1])):
+        _record_validations(session.connection(), table, target_id, validations)
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_completion(session, flush_context, instances):
+    # completed_at date le dernier passage à 100 % : une tâche terminée après
+    # sa dernière validation attend une revue (colonne awaiting_review)
+    now = datetime.utcnow()
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, (Task, SubTask)):
+            continue
+        if obj not in session.new and not sa_inspect(obj).attrs.percent_completion.history.has_changes():
+            continue
+        if (obj.percent_completion or 0) >= 100:
+            obj.completed_at = now
+        else:
+            obj.completed_at = None
+
+
+def _backfill(connection, table, validations, target_column):
+    target = validations.c[target_column]
+    latest = select(
+        target.label('target_id'), validations.c.id, validations.c.status, validations.c.timestamp
+    ).distinct(target).order_by(target, validations.c.timestamp.desc(), validations.c.id.desc()).subquery()
+    counts = select(target.label('target_id'), func.count().label('total')).group_by(target).subquery()
+
+    # UPDATE ... FROM : les lignes sans validation gardent les valeurs par défaut
+    result = connection.execute(
+        update(table).where(latest.c.target_id == table.c.id, counts.c.target_id == table.c.id).values(
+            validation_count=counts.c.total,
+            last_validation_id=latest.c.id,
+            last_validation_status=latest.c.status,
+            last_validated_at=latest.c.timestamp
+        )
+    )
+    return result.rowcount
+
+
+def backfill_validation_summaries(connection):
+    """Recalculer compteur et dernière validation des tâches et sous-tâches
+
+    Idempotent. Retourne (tâches, sous-tâches) mises à jour.
+    """
+    return (
+        _backfill(connection, Task.__table__, TaskValidation.__table__, 'task_id'),
+        _backfill(connection, SubTask.__table__, SubTaskValidation.__table__, 'subtask_id')
+    )
+
+
+def backfill_completion_dates(connection):
+    """Dater les tâches et sous-tâches déjà terminées (après backfill_validation_summaries)
+
+    La date réelle n'est pas connue : une tâche revue garde la date de sa
+    dernière validation, sauf si elle a été rejetée puis terminée à nouveau ;
+    les autres sont datées de maintenant et entrent dans la boîte de réception.
+    """
+    updated = 0
+    for table in (Task.__table__, SubTask.__table__):
+        # Colonnes DateTime sans fuseau, renseignées en UTC par l'application
+        now = func.timezone('utc', func.now())
+        reviewed_at = case(
+            (table.c.last_validation_status == 'rejected', now),
+            else_=func.coalesce(table.c.last_validated_at, now)
+        )
+        result = connection.execute(
+            update(table).where(table.c.percent_completion >= 100, table.c.completed_at.is_(None)).values(
+                completed_at=reviewed_at
+            )
+        )
+        updated += result.rowcount
+    return updated
@@ -0,0 +1,139 @@
+# tests/test_search_queries.py
+"""Nombre de requêtes SQL de la recherche globale
+
+Nécessite une base Postgres de test avec l'extension pg_trgm :
+
+    pip install pytest
+    TEST_DATABASE_URL=postgresql://... python -m pytest tests
+
+Sans TEST_DATABASE_URL, les tests sont ignorés.
+"""
+import os
+import random
+import string
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL')
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL non défini")
+
+
+@pytest.fixture(scope='module')
+def app():
+    # app.py lit sa configuration à l'import ; recherche séquentielle pour
+    # compter les requêtes des sous-recherches dans le même ordre à chaque fois
+    os.environ['SQLALCHEMY_DATABASE_URI'] = TEST_DATABASE_URL
+    os.environ.setdefault('JWT_SECRET_KEY', 'test-secret')
+    os.environ['SEARCH_WORKERS'] = '0'
+    os.environ['PASSWORD_HASH_WORKERS'] = '0'
+    from app import app as flask_app
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def search_data(app):
+    """Jeu de données dont chaque type de résultat contient le même mot"""
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import delete
+    from models import db, User, Project, School, Task, Message, project_members
+
+    word = ''.join(random.choice(string.ascii_lowercase) for _ in range(12))
+    created = {'users': [], 'projects': [], 'schools': []}
+
+    with app.app_context():
+        admin = User(role='admin', nom='Admin', prenom='Recherche', email=f"{word}@admin.test", password='x')
+        db.session.add(admin)
+        db.session.commit()
+        created['users'].append(admin.id)
+        token = create_access_token(identity=admin.id)
+
+    def add(count):
+        """Ajouter count éléments de chaque type (utilisateur, projet, tâche, message, école)"""
+        with app.app_context():
+            for _ in range(count):
+                index = len(created['projects'])
+                user = User(role='student', nom='Test', prenom=word, email=f"{word}{index}@user.test", password='x')
+                school = School(name=f"{word} école {index}")
+                project = Project(
+                    name=f"{word} projet {index}", project_slug=f"{word}-{index}",
+                    status='en cours', creator_id=created['users'][0]
+                )
+                db.session.add_all([user, school, project])
+                db.session.flush()
+                db.session.execute(project_members.insert().values(
+                    project_id=project.id, user_id=created['users'][0], role='Créateur'
+                ))
+                db.session.add(Task(
+                    title=f"{word} tâche {index}", due_date=datetime.utcnow() + timedelta(days=7),
+                    project_id=project.id
+                ))
+                db.session.add(Message(content=f"{word} message {index}", project_id=project.id, sender_id=user.id))
+                db.session.commit()
+                created['users'].append(user.id)
+                created['projects'].append(project.id)
+                created['schools'].append(school.id)
+
+    yield word, token, add
+
+    with app.app_context():
+        project_ids = created['projects']
+        db.session.execute(delete(Message).where(Message.project_id.in_(project_ids)))
+        db.session.execute(delete(Task).where(Task.project_id.in_(project_ids)))
+        db.session.execute(delete(project_members).where(project_members.c.project_id.in_(project_ids)))
+        db.session.execute(delete(Project).where(Project.id.in_(project_ids)))
+        db.session.execute(delete(School).where(School.id.in_(created['schools'])))
+        db.session.execute(delete(User).where(User.id.in_(created['users'])))
+        db.session.commit()
+
+
+@contextmanager
+def count_queries(app):
+    from sqlalchemy import event
+    from models import db
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def _search(app, word, token):
+    client = app.test_client()
+    with count_queries(app) as statements:
+        response = client.get('/search/global', query_string={'q': word}, headers={'Authorization': f"Bearer {token}"})
+    assert response.status_code == 200
+    return response.get_json(), len(statements)
+
+
+def test_global_search_query_count_does_not_grow_with_results(app, search_data):
+    word, token, add = search_data
+
+    add(1)
+    # Première requête : chargement de l'utilisateur connecté (mis en cache)
+    _search(app, word, token)
+    few, few_queries = _search(app, word, token)
+
+    add(2)
+    many, many_queries = _search(app, word, token)
+
+    for kind in ('projects', 'users', 'tasks', 'messages', 'schools'):
+        assert len(few['results'][kind]) == 1, kind
+        assert len(many['results'][kind]) == 3, kind
+
+    # Projets de l'utilisateur, deux requêtes par sous-recherche (délai +
+    # recherche) et trois chargements groupés (membres, projets liés,
+    # expéditeurs), quel que soit le nombre de résultats
+    assert many_queries == few_queries
+    assert many_queries <= 16
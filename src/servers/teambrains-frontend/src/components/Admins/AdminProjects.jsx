@@ -11,12 +11,20 @@ const AdminProjects = () => {
 
     const fetchProjects = async () => {
         try {
-            const response = await axios.get('http://localhost:5001/projects/list_projects', {
-                headers: {
-                    Authorization: `Bearer ${localStorage.getItem('accessToken')}`
-                }
-            });
-            setProjects(response.data);
+            // L'administration affiche tout le catalogue : on suit les pages
+            let allProjects = [];
+            let cursor = null;
+            do {
+                const response = await axios.get('http://localhost:5001/projects/list_projects', {
+                    params: cursor ? { after_id: cursor, limit: 200 } : { limit: 200 },
+                    headers: {
+                        Authorization: `Bearer ${localStorage.getItem('accessToken')}`
+                    }
+                });
+                allProjects = [...allProjects, ...response.data];
+                cursor = response.headers['x-next-cursor'] || null;
+            } while (cursor);
+            setProjects(allProjects);
         } catch (error) {
             console.error('Erreur lors de la récupération des projets:', error);
         }
@@ -8,20 +8,32 @@ const GlobalSearch = ({ isMobile = false, onClose = null }) => {
     const [results, setResults] = useState({ projects: [], users: [], tasks: [], messages: [], schools: [] });
     const [isLoading, setIsLoading] = useState(false);
     const [showResults, setShowResults] = useState(false);
+    // 'suggest' : autocomplétion pendant la frappe, 'results' : recherche complète (Entrée)
+    const [mode, setMode] = useState('suggest');
+    const [suggestions, setSuggestions] = useState({ users: [], projects: [], skills: [] });
+    const [didYouMean, setDidYouMean] = useState(null);
     const navigate = useNavigate();
     const searchRef = useRef(null);
     const dropdownRef = useRef(null);
+    // Évite de relancer l'autocomplétion quand la saisie est remplie par le code
+    const skipSuggestRef = useRef(false);
 
-    // Fonction de recherche avec debounce
+    // Autocomplétion légère avec debounce ; la recherche complète se fait sur Entrée
     useEffect(() => {
+        if (skipSuggestRef.current) {
+            skipSuggestRef.current = false;
+            return;
+        }
+
         const timeoutId = setTimeout(() => {
-            if (query.trim().length > 0) {
-                performSearch(query);
+            if (query.trim().length >= 2) {
+                performSuggest(query);
             } else {
-                setResults({ projects: [], users: [], schools: [] });
+                setSuggestions({ users: [], projects: [], skills: [] });
+                setDidYouMean(null);
                 setShowResults(false);
             }
-        }, 300);
+        }, 150);
 
         return () => clearTimeout(timeoutId);
     }, [query]);
@@ -43,8 +55,48 @@ const GlobalSearch = ({ isMobile = false, onClose = null }) => {
         return () => document.removeEventListener('mousedown', handleClickOutside);
     }, []);
 
+    const performSuggest = async (searchQuery) => {
+        try {
+            const response = await axios.get(`http://localhost:5001/search/suggest?q=${encodeURIComponent(searchQuery)}`, {
+                headers: {
+                    'Authorization': `Bearer ${localStorage.getItem('accessToken')}`,
+                },
+            });
+            setSuggestions(response.data.suggestions);
+            setDidYouMean(response.data.did_you_mean);
+            setMode('suggest');
+            setShowResults(true);
+        } catch (error) {
+            console.error('Erreur lors de l\'autocomplétion:', error);
+        }
+    };
+
+    // Remplit la saisie et lance directement la recherche complète
+    const searchFor = (searchQuery) => {
+        skipSuggestRef.current = true;
+        setQuery(searchQuery);
+        performSearch(searchQuery);
+    };
+
+    const handleSuggestionClick = (suggestion) => {
+        if (suggestion.type === 'skill') {
+            searchFor(suggestion.label);
+            return;
+        }
+        if (suggestion.type === 'project') {
+            navigate(`/projets/${suggestion.detail}`);
+        } else if (suggestion.type === 'user') {
+            navigate(`/users/profile/${suggestion.id}`);
+        }
+
+        setQuery('');
+        setShowResults(false);
+        if (onClose) onClose();
+    };
+
     const performSearch = async (searchQuery) => {
         setIsLoading(true);
+        setMode('results');
         try {
             const response = await axios.get(`http://localhost:5001/search/global?q=${encodeURIComponent(searchQuery)}`, {
                 headers: {
@@ -86,8 +138,14 @@ const GlobalSearch = ({ isMobile = false, onClose = null }) => {
         return results.projects.length + results.users.length + results.tasks.length + results.messages.length + results.schools.length;
     };
 
+    const getTotalSuggestions = () => {
+        return suggestions.users.length + suggestions.projects.length + suggestions.skills.length;
+    };
+
     const handleKeyPress = (e) => {
-        if (e.key === 'Escape') {
+        if (e.key === 'Enter' && query.trim().length > 0) {
+            performSearch(query);
+        } else if (e.key === 'Escape') {
             setQuery('');
             setShowResults(false);
             if (onClose) onClose();
@@ -121,7 +179,40 @@ const GlobalSearch = ({ isMobile = false, onClose = null }) => {
                     ref={dropdownRef}
                     className="absolute top-full left-0 right-0 mt-1 bg-white border border-gray-200 rounded-md shadow-lg z-50 max-h-96 overflow-y-auto"
                 >
-                    {getTotalResults() === 0 ? (
+                    {mode === 'suggest' ? (
+                        <div>
+                            {didYouMean && (
+                                <div
+                                    onClick={() => searchFor(didYouMean)}
+                                    className="p-2 bg-gray-50 border-b text-xs text-gray-600 cursor-pointer hover:bg-gray-100"
+                                >
+                                    Vouliez-vous dire <span className="font-medium text-gray-900">{didYouMean}</span> ?
+                                </div>
+                            )}
+                            {getTotalSuggestions() === 0 && !didYouMean && (
+                                <div className="p-4 text-gray-500 text-center text-sm">
+                                    Aucune suggestion, appuyez sur Entrée pour lancer la recherche
+                                </div>
+                            )}
+                            {['users', 'projects', 'skills'].map((kind) => (
+                                suggestions[kind].map((suggestion) => (
+                                    <div
+                                        key={`suggest-${kind}-${suggestion.id}`}
+                                        onClick={() => handleSuggestionClick(suggestion)}
+                                        className="p-2 hover:bg-gray-50 cursor-pointer border-b border-gray-100 last:border-b-0 flex items-center"
+                                    >
+                                        {kind === 'users' && <User size={14} className="mr-2 text-green-800" />}
+                                        {kind === 'projects' && <Briefcase size={14} className="mr-2 text-blue-800" />}
+                                        {kind === 'skills' && <Search size={14} className="mr-2 text-gray-500" />}
+                                        <span className="text-sm text-gray-900">{suggestion.label}</span>
+                                        {kind !== 'projects' && suggestion.detail && (
+                                            <span className="ml-2 text-xs text-gray-500">{suggestion.detail}</span>
+                                        )}
+                                    </div>
+                                ))
+                            ))}
+                        </div>
+                    ) : getTotalResults() === 0 ? (
                         <div className="p-4 text-gray-500 text-center text-sm">
                             {query.trim() ? 'Aucun résultat trouvé' : 'Commencez à taper pour rechercher...'}
                         </div>
@@ -44,6 +44,7 @@ const ProjectDetailsModal = ({ isOpen, onClose, projectId }) => {
 
             // Récupérer les détails du projet avec les membres
             const projectResponse = await axios.get(`http://localhost:5001/projects/list_projects`, {
+                params: { id: projectId },
                 headers: {
                     'Authorization': `Bearer ${localStorage.getItem('accessToken')}`
                 }
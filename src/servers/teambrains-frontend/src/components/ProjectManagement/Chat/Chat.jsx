@@ -11,18 +11,32 @@ const Chat = ({ projectId }) => {
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState(null);
     const messagesEndRef = useRef(null);
+    // Dernier message reçu : le polling ne récupère que les messages suivants
+    const lastMessageIdRef = useRef(null);
     const { currentUser } = useAuth();
 
+    // Ajoute les nouveaux messages à la liste sans doublons
+    const appendMessages = (newMessages) => {
+        if (!newMessages || newMessages.length === 0) return;
+        lastMessageIdRef.current = newMessages[newMessages.length - 1].id;
+        setMessages((previous) => {
+            const knownIds = new Set(previous.map((message) => message.id));
+            return [...previous, ...newMessages.filter((message) => !knownIds.has(message.id))];
+        });
+    };
+
     // Fonction pour récupérer les messages
     const fetchMessages = async () => {
         try {
             setLoading(true);
+            const params = lastMessageIdRef.current !== null ? { after_id: lastMessageIdRef.current } : {};
             const response = await axios.get(`http://localhost:5001/chat/${projectId}/messages`, {
+                params,
                 headers: {
                     'Authorization': `Bearer ${localStorage.getItem('accessToken')}`
                 }
             });
-            setMessages(response.data.messages);
+            appendMessages(response.data.messages);
             setError(null);
         } catch (err) {
             setError("Erreur lors du chargement des messages");
@@ -39,16 +53,17 @@ const Chat = ({ projectId }) => {
         if (!newMessage.trim()) return;
 
         try {
-            await axios.post(`http://localhost:5001/chat/${projectId}/send`, {
-                content: newMessage
+            const response = await axios.post(`http://localhost:5001/chat/${projectId}/send`, {
+                content: newMessage,
+                last_seen_id: lastMessageIdRef.current
             }, {
                 headers: {
                     'Authorization': `Bearer ${localStorage.getItem('accessToken')}`
                 }
             });
 
-            // Après avoir envoyé le message, on rafraîchit la liste des messages
-            fetchMessages();
+            // Le serveur renvoie les messages arrivés depuis le dernier reçu
+            appendMessages(response.data.messages || [response.data.message]);
             setNewMessage(''); // Réinitialise le champ de saisie
             setError(null);
         } catch (err) {
@@ -84,18 +99,19 @@ const Chat = ({ projectId }) => {
             console.log('Fichier envoyé !', fileData);
 
             // 2. Envoyer le message avec les informations du fichier au serveur
-            await axios.post(`http://localhost:5001/chat/${projectId}/send`, {
+            const messageResponse = await axios.post(`http://localhost:5001/chat/${projectId}/send`, {
                 content: '', // message vide pour les fichiers
                 file_url: downloadUrl,
-                file_name: fileName
+                file_name: fileName,
+                last_seen_id: lastMessageIdRef.current
             }, {
                 headers: {
                     'Authorization': `Bearer ${localStorage.getItem('accessToken')}`
                 }
             });
 
-            // 3. Récupérer les messages mis à jour
-            await fetchMessages();
+            // 3. Ajouter les messages arrivés depuis le dernier reçu
+            appendMessages(messageResponse.data.messages || [messageResponse.data.message]);
 
         } catch (error) {
             console.error('Erreur lors de l\'upload', error.response?.data || error);
@@ -108,20 +124,41 @@ const Chat = ({ projectId }) => {
         return format(new Date(timestamp), "d MMMM à HH:mm", { locale: fr });
     };
 
-    // Récupération initiale des messages + mise en place du polling
+    // Récupération initiale des messages + abonnement aux nouveaux messages
     useEffect(() => {
         if (projectId) {
+            lastMessageIdRef.current = null;
+            setMessages([]);
             fetchMessages();
 
-            // Polling toutes les 5 secondes pour obtenir les nouveaux messages
+            // Le serveur pousse les nouveaux messages ; EventSource se reconnecte seul
+            const token = localStorage.getItem('accessToken');
+            const source = new EventSource(`http://localhost:5001/events/project/${projectId}/stream?jwt=${token}`);
+            source.addEventListener('message-created', (event) => {
+                const message = JSON.parse(event.data);
+                if (message.truncated) {
+                    fetchMessages();
+                } else {
+                    appendMessages([message]);
+                }
+            });
+            // Après une coupure, récupérer les messages manqués
+            source.onopen = () => {
+                if (lastMessageIdRef.current !== null) {
+                    fetchMessages();
+                }
+            };
+
+            // Filet de sécurité si le flux est bloqué (proxy, etc.)
             const interval = setInterval(() => {
                 fetchMessages();
-            }, 5000);
+            }, 60000);
 
             // Stocker l'interval dans une référence globale pour le contrôle
             window.chatPollingInterval = interval;
 
             return () => {
+                source.close();
                 clearInterval(interval);
                 window.chatPollingInterval = null;
             };
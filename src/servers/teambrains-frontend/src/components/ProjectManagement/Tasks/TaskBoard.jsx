@@ -95,6 +95,38 @@ const TaskBoard = (projectId) => {
         fetchData();
     }, [project]);
 
+    // Mises à jour poussées par le serveur (autres membres du projet)
+    useEffect(() => {
+        if (!project) return;
+
+        const token = localStorage.getItem('accessToken');
+        const source = new EventSource(`http://localhost:5001/events/project/${project.id}/stream?jwt=${token}`);
+
+        const applyTasks = (update) => {
+            setTasks((previous) => {
+                const updated = update(previous);
+                organizeTasks(updated);
+                return updated;
+            });
+        };
+
+        source.addEventListener('task-updated', (event) => {
+            const task = JSON.parse(event.data);
+            if (task.truncated) return;
+            applyTasks((previous) => {
+                const exists = previous.some((t) => t.id === task.id);
+                return exists ? previous.map((t) => (t.id === task.id ? task : t)) : [...previous, task];
+            });
+        });
+
+        source.addEventListener('task-deleted', (event) => {
+            const { id } = JSON.parse(event.data);
+            applyTasks((previous) => previous.filter((t) => t.id !== id));
+        });
+
+        return () => source.close();
+    }, [project]);
+
     // Calcul de la progression du projet basée sur les tâches
     const calculateProjectProgress = (tasksList) => {
         if (tasksList.length === 0) {
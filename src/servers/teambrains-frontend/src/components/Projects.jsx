@@ -15,6 +15,8 @@ const Projects = () => {
 
     const { currentUser, logout } = useAuth();
     const [projects, setProjects] = useState([]);
+    // Curseur de la page suivante du catalogue (null : tout est chargé)
+    const [nextCursor, setNextCursor] = useState(null);
     const [isExpandedProfile, setIsExpandedProfile] = useState(true);
     const [isExpandedLangage, setIsExpandedLangage] = useState(true);
     const [sortOrder, setSortOrder] = useState('newest');
@@ -39,14 +41,6 @@ const Projects = () => {
         Ruby: false
     });
 
-    const sortedProjects = projects.sort((a, b) => {
-        if (sortOrder === 'newest') {
-            return new Date(b.creation_date) - new Date(a.creation_date);
-        } else {
-            return new Date(a.creation_date) - new Date(b.creation_date);
-        }
-    });
-
     const handleProjectClick = (slug) => {
         navigate(`/projets/${slug}`);
     };
@@ -89,110 +83,101 @@ const Projects = () => {
     useEffect(() => {
         // Gérer les paramètres de recherche depuis l'URL
         const searchParams = new URLSearchParams(location.search);
-        const searchFromUrl = searchParams.get('search');
-        if (searchFromUrl) {
-            setSearchQuery(searchFromUrl);
-        }
-
-        const fetchProjects = async () => {
-            try {
-                const response = await axios.get('http://localhost:5001/projects/list_projects', {
-                    headers: {
-                        'Authorization': `Bearer ${localStorage.getItem('accessToken')}`,
-                    },
-                });
-                setProjects(response.data);
-                console.log(response.data)
-            } catch (error) {
-                console.error("Erreur lors de la récupération des projets", error);
-            }
-        };
-
-        fetchProjects();
+        setSearchQuery(searchParams.get('search') || '');
     }, [location.search]);
 
-    const formatDate = (isoDate) => {
-        const date = parseISO(isoDate);
-        let formattedDate = format(date, "d MMMM yyyy", { locale: fr });
-        return formattedDate.replace(/^(.)|\s+(.)/g, c => c.toUpperCase());  // Capitalise chaque mot
-    };
+    // Le tri, la recherche et les filtres sont appliqués par le serveur : le
+    // catalogue est paginé, une page ne peut pas être triée ou filtrée seule
+    const buildCatalogParams = () => {
+        const params = { order: sortOrder };
 
-    const filteredProjects = sortedProjects.filter(project => {
-        // Filtre de recherche textuelle
-        if (searchQuery && searchQuery.trim()) {
-            const query = searchQuery.toLowerCase();
-            const nameMatch = project.name.toLowerCase().includes(query);
-            const descriptionMatch = project.description && project.description.toLowerCase().includes(query);
-            const statusMatch = project.status && project.status.toLowerCase().includes(query);
-            
-            if (!nameMatch && !descriptionMatch && !statusMatch) {
-                return false;
-            }
+        if (searchQuery.trim()) {
+            params.search = searchQuery.trim();
         }
 
-        // Filtre "Mes projets" - vérifie si l'utilisateur est membre du projet ou créateur
+        // Filtre "Mes projets" - l'utilisateur est membre du projet ou créateur
         if (showMyProjectsOnly) {
-            const isCreator = currentUser && project.creator_id === currentUser.id;
-            const isMember = project.members && project.members.some(member => 
-                currentUser && member.user_id === currentUser.id
-            );
-            if (!isCreator && !isMember) return false;
+            params.member_id = currentUser.id;
         }
 
-        // Filtre "Projets disponibles" - vérifie si l'utilisateur peut s'inscrire
         if (showAvailableProjectsOnly) {
-            if (!currentUser) return false;
-            
-            // Vérifier si l'utilisateur est déjà créateur ou membre
-            const isCreator = project.creator_id === currentUser.id;
-            const isMember = project.members && project.members.some(member => 
-                member.user_id === currentUser.id
-            );
-            
-            // Si déjà inscrit, ne pas afficher
-            if (isCreator || isMember) return false;
-            
+            // Filtre "Projets disponibles" - l'utilisateur n'est pas encore inscrit
+            params.exclude_member_id = currentUser.id;
+
             // Pour les entrepreneurs, ils peuvent rejoindre n'importe quel projet
-            if (currentUser.role === 'businessman') return true;
-            
-            // Pour les autres utilisateurs, vérifier s'il y a des rôles disponibles
-            const userRole = currentUser.typeDeveloppeur;
-            const members = project.members || [];
-            
-            if (userRole === "FullStack") {
+            if (currentUser.role !== 'businessman') {
                 // Un FullStack peut prendre BackEnd, FrontEnd ou FullStack si disponible
-                const backendTaken = members.some(member => member.role.replace(/['"\\]+/g, '') === "BackEnd");
-                const frontendTaken = members.some(member => member.role.replace(/['"\\]+/g, '') === "FrontEnd");
-                const fullstackTaken = members.some(member => member.role.replace(/['"\\]+/g, '') === "FullStack");
-                
-                // Si FullStack est libre, ou si seulement BackEnd ou FrontEnd est pris
-                return !fullstackTaken || (!backendTaken || !frontendTaken);
-            } else {
-                // Pour les autres rôles, vérifier si le rôle spécifique est libre
-                const roleTaken = members.some(member => 
-                    member.role.replace(/['"\\]+/g, '') === userRole
-                );
-                return !roleTaken;
+                params.missing_role = currentUser.typeDeveloppeur === 'FullStack'
+                    ? 'FullStack,BackEnd,FrontEnd'
+                    : currentUser.typeDeveloppeur;
+            }
+        } else {
+            // Au moins un des profils sélectionnés est disponible dans le projet
+            const profiles = Object.keys(selectedProfiles).filter(profile => selectedProfiles[profile]);
+            if (profiles.length > 0) {
+                params.missing_role = profiles.join(',');
             }
         }
 
-        // Si aucun profil n'est sélectionné, on montre tous les projets
-        const hasSelectedProfiles = Object.values(selectedProfiles).some(value => value);
-        if (!hasSelectedProfiles) return true;
+        return params;
+    };
 
-        // On vérifie si au moins un des profils sélectionnés est disponible dans le projet
-        return Object.entries(selectedProfiles).some(([profile, isSelected]) => {
-            if (!isSelected) return false;
+    const fetchCatalogPage = (cursor) => {
+        const params = buildCatalogParams();
+        if (cursor) {
+            params[sortOrder === 'oldest' ? 'after_id' : 'before_id'] = cursor;
+        }
+        return axios.get('http://localhost:5001/projects/list_projects', {
+            params,
+            headers: {
+                'Authorization': `Bearer ${localStorage.getItem('accessToken')}`,
+            },
+        });
+    };
 
-            // On vérifie si le profil est disponible dans le projet
-            const members = project.members || [];
-            const roleIsFree = !members.some(member =>
-                member.role.replace(/['"\\]+/g, '') === profile
-            );
+    useEffect(() => {
+        // Une réponse arrivée après un changement de filtre est ignorée
+        let cancelled = false;
+
+        // Sans utilisateur connecté, aucun projet n'est à lui ni disponible
+        if ((showMyProjectsOnly || showAvailableProjectsOnly) && !currentUser) {
+            setProjects([]);
+            setNextCursor(null);
+            return;
+        }
 
-            return roleIsFree;
-        });
-    });
+        const fetchProjects = async () => {
+            try {
+                const response = await fetchCatalogPage(null);
+                if (cancelled) return;
+                setProjects(response.data);
+                setNextCursor(response.headers['x-next-cursor'] || null);
+            } catch (error) {
+                console.error("Erreur lors de la récupération des projets", error);
+            }
+        };
+
+        fetchProjects();
+        return () => {
+            cancelled = true;
+        };
+    }, [searchQuery, sortOrder, showMyProjectsOnly, showAvailableProjectsOnly, selectedProfiles, currentUser]);
+
+    const loadMoreProjects = async () => {
+        try {
+            const response = await fetchCatalogPage(nextCursor);
+            setProjects((previous) => [...previous, ...response.data]);
+            setNextCursor(response.headers['x-next-cursor'] || null);
+        } catch (error) {
+            console.error("Erreur lors de la récupération des projets", error);
+        }
+    };
+
+    const formatDate = (isoDate) => {
+        const date = parseISO(isoDate);
+        let formattedDate = format(date, "d MMMM yyyy", { locale: fr });
+        return formattedDate.replace(/^(.)|\s+(.)/g, c => c.toUpperCase());  // Capitalise chaque mot
+    };
 
     return (
         <div className="mx-4 md:mx-8 lg:mx-12 p-4 md:p-8 lg:p-12 flex flex-col md:flex-row">
@@ -334,7 +319,7 @@ const Projects = () => {
 
                 <div className='flex flex-col sm:flex-row sm:justify-between mb-2 gap-2'>
                     <p>
-                        <span className='font-semibold text-green-tb'>{filteredProjects.length}</span>
+                        <span className='font-semibold text-green-tb'>{projects.length}{nextCursor ? '+' : ''}</span>
                         <span className='font-light'> projets</span>
                     </p>
                     <SortBy
@@ -344,7 +329,7 @@ const Projects = () => {
                 </div>
 
                 <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
-                    {filteredProjects.map((project) => {
+                    {projects.map((project) => {
                         const roles = mapRolesToMembers(project.members);
 
                         return (
@@ -375,6 +360,17 @@ const Projects = () => {
                         );
                     })}
                 </div>
+
+                {nextCursor && (
+                    <div className="flex justify-center mt-6">
+                        <button
+                            onClick={loadMoreProjects}
+                            className="px-4 py-2 text-sm font-medium text-green-tb border border-green-tb rounded hover:bg-green-50"
+                        >
+                            Charger plus de projets
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     );